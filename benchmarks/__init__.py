@@ -0,0 +1,4 @@
+"""Offline benchmark harness: synthetic corpus, stub LLM server and stage timings.
+
+Run ``python -m benchmarks.run --help`` from the repository root.
+"""
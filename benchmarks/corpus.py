@@ -0,0 +1,211 @@
+"""Generate a reproducible corpus of synthetic resumes.
+
+    python -m benchmarks.corpus --out bench_corpus --count 60 --seed 7
+
+Each resume is a PDF or DOCX of 1-20 pages and one of three kinds:
+"text" (text layer only), "scanned" (page images only) or "mixed" (text pages
+carrying an agency logo, with a scanned page every third page). Some resumes are in Hindi as well
+as English. A manifest.json describing every file is written next to them.
+"""
+import argparse
+import io
+import json
+import os
+import random
+
+from docx import Document
+from docx.shared import Cm
+from PIL import Image, ImageDraw, ImageFont
+
+from .pdfwriter import PAGE_HEIGHT, PAGE_WIDTH, write_pdf
+
+FIRST_NAMES = ["Aarav", "Priya", "Rohan", "Sneha", "Vikram", "Ananya", "Karan", "Meera", "Arjun", "Divya"]
+LAST_NAMES = ["Sharma", "Patel", "Iyer", "Gupta", "Reddy", "Nair", "Singh", "Joshi", "Kulkarni", "Das"]
+CITIES = ["Pune", "Mumbai", "Bengaluru", "Delhi", "Hyderabad", "Chennai", "Jaipur", "Indore"]
+COMPANIES = ["HDFC Bank", "Infosys", "Tata Motors", "ICICI Bank", "Wipro", "Reliance Retail", "Zomato", "Bajaj Finserv"]
+TITLES = ["Sales Executive", "Software Engineer", "Relationship Manager", "Data Analyst", "Front End Developer",
+          "Accountant", "HR Executive", "Operations Manager"]
+SKILLS = ["Python", "SQL", "Excel", "Node.js", "React", "Customer Handling", "Tally", "Power BI", "Java",
+          "Negotiation", "Machine Learning", "AWS", "Communication", "SAP"]
+DEGREES = [("B.Tech", "Computer Science"), ("B.Com", "Accounts"), ("MBA", "Marketing"), ("B.Sc", "Physics"),
+           ("12th", "CBSE"), ("10th", "State Board")]
+HINDI_LINES = ["नाम: {name}", "पता: {city}, भारत", "अनुभव: बिक्री कार्यकारी", "भाषाएँ: हिंदी, अंग्रेज़ी"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# Fonts with Devanagari glyphs, tried in order; override with BENCH_DEVANAGARI_FONT
+DEVANAGARI_FONTS = [
+    os.environ.get("BENCH_DEVANAGARI_FONT", ""),
+    "/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf",
+    "/usr/share/fonts/truetype/lohit-devanagari/Lohit-Devanagari.ttf",
+    "/usr/share/fonts/truetype/fonts-deva-extra/gargi.ttf",
+]
+
+LINES_PER_PAGE = 60
+
+
+def _devanagari_font(size):
+    for path in DEVANAGARI_FONTS:
+        if path and os.path.exists(path):
+            return ImageFont.truetype(path, size)
+    return None
+
+
+def resume_lines(rng, pages, hindi):
+    """Resume text long enough to fill `pages` pages."""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    city = rng.choice(CITIES)
+    lines = [
+        name,
+        f"Email: {name.lower().replace(' ', '.')}{rng.randint(1, 99)}@example.com",
+        f"Mobile: +91 {rng.randint(6, 9)}{rng.randint(100000000, 999999999)}",
+        f"Date of Birth: {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1975, 2002)}",
+        f"Address: {rng.randint(1, 200)} MG Road, {city}",
+        "",
+        "PROFESSIONAL SUMMARY",
+        f"{rng.choice(TITLES)} with experience across {rng.choice(COMPANIES)} and {rng.choice(COMPANIES)}.",
+        "",
+        "EXPERIENCE",
+    ]
+    if hindi:
+        lines[1:1] = [line.format(name=name, city=city) for line in HINDI_LINES]
+    year = 2024
+    jobs = max(2, pages * 3)
+    for k in range(jobs):
+        start = year - rng.randint(1, 3)
+        end = "Present" if k == 0 else f"{rng.choice(MONTHS)} {year}"
+        lines += [
+            f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)}, {rng.choice(CITIES)}   {rng.choice(MONTHS)} {start} - {end}",
+            "Responsibilities:",
+            f"- Managed a portfolio of {rng.randint(20, 400)} clients and met quarterly targets",
+            f"- Worked with {rng.choice(SKILLS)} and {rng.choice(SKILLS)} on internal projects",
+            f"- Trained {rng.randint(2, 12)} new joiners on processes and tools",
+            "",
+        ]
+        year = start
+    lines += ["EDUCATION"]
+    for degree, branch in rng.sample(DEGREES, 3):
+        lines.append(f"{degree} ({branch}), {rng.choice(CITIES)} University, {rng.choice(MONTHS)} {rng.randint(1995, 2020)}, "
+                     f"{rng.randint(55, 95)}%")
+    lines += ["", "SKILLS", ", ".join(rng.sample(SKILLS, 6)), "", "HOBBIES", "Cricket, Reading", "",
+              "DECLARATION", "I hereby declare that the information above is true to the best of my knowledge."]
+    # Pad with project write-ups until the requested page count is filled
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines += [f"Project: {rng.choice(SKILLS)} rollout at {rng.choice(COMPANIES)}",
+                  f"- Delivered the {rng.choice(SKILLS)} migration {rng.randint(1, 8)} weeks ahead of plan", ""]
+    return lines
+
+
+def paginate(lines, pages, agency):
+    """Split lines into pages with a running header and a page-number footer."""
+    per_page = max(1, -(-len(lines) // pages))
+    chunks = [lines[i:i + per_page] for i in range(0, len(lines), per_page)][:pages]
+    return [[f"{agency} - Candidate Profile"] + chunk + [f"Page {i + 1} of {len(chunks)}"]
+            for i, chunk in enumerate(chunks)]
+
+
+def render_page(lines, width=1240, height=1754):
+    """Render text lines onto a white A4 page at 150 dpi; returns a PIL image."""
+    img = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(img)
+    latin = ImageFont.load_default(size=24)
+    deva = _devanagari_font(24)
+    y = 60
+    for line in lines:
+        if y > height - 60:
+            break
+        if any("ऀ" <= ch <= "ॿ" for ch in line):
+            if deva is None:
+                continue  # no Devanagari font on this machine; leave the line out
+            font = deva
+        else:
+            font = latin
+        draw.text((80, y), line, fill=0, font=font)
+        y += 28
+    return img
+
+
+def jpeg_bytes(img, quality=70):
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def logo_image(agency):
+    img = Image.new("RGB", (400, 160), (20, 60, 140))
+    ImageDraw.Draw(img).text((20, 60), agency, fill=(255, 255, 255), font=ImageFont.load_default(size=32))
+    return img
+
+
+def make_pdf(path, page_lines, kind, agency):
+    logo = jpeg_bytes(logo_image(agency))
+    pages = []
+    for i, lines in enumerate(page_lines):
+        scanned = kind == "scanned" or (kind == "mixed" and i % 3 == 1)
+        if scanned:
+            img = render_page(lines)
+            pages.append({"image": jpeg_bytes(img), "image_size": img.size, "image_mode": "L"})
+        else:
+            page = {"lines": [line for line in lines if line.isascii()]}
+            if kind == "mixed":
+                # Agency logo on text pages: real-sized image, but not worth OCR
+                page.update(image=logo, image_size=(400, 160),
+                            image_box=(PAGE_WIDTH - 230, PAGE_HEIGHT - 130, 200, 110))
+            pages.append(page)
+    write_pdf(path, pages)
+
+
+def make_docx(path, page_lines, kind, agency):
+    doc = Document()
+    for i, lines in enumerate(page_lines):
+        scanned = kind == "scanned" or (kind == "mixed" and i % 3 == 1)
+        if scanned:
+            buf = io.BytesIO(jpeg_bytes(render_page(lines)))
+            doc.add_picture(buf, width=Cm(17))
+        else:
+            for line in lines:
+                doc.add_paragraph(line)
+            if kind == "mixed":
+                doc.add_picture(io.BytesIO(jpeg_bytes(logo_image(agency))), width=Cm(5))
+        doc.add_page_break()
+    doc.save(path)
+
+
+def generate(out_dir, count, seed=7, max_pages=20):
+    """Write `count` resumes to `out_dir` and return the manifest entries."""
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = []
+    kinds = ["text", "scanned", "mixed"]
+    for n in range(count):
+        kind = kinds[n % len(kinds)]
+        fmt = "pdf" if n % 2 == 0 else "docx"
+        hindi = n % 5 == 4
+        # Mostly short resumes, with a tail of long ones up to max_pages
+        pages = min(max_pages, 1 + int(rng.expovariate(1 / 3)))
+        agency = f"{rng.choice(['Apex', 'Nova', 'Zenith', 'Prime'])} Staffing"
+        lines = resume_lines(rng, pages, hindi)
+        page_lines = paginate(lines, pages, agency)
+        name = f"resume_{n:04d}_{kind}_{'hi' if hindi else 'en'}_{len(page_lines)}p.{fmt}"
+        path = os.path.join(out_dir, name)
+        (make_pdf if fmt == "pdf" else make_docx)(path, page_lines, kind, agency)
+        manifest.append({"file": name, "format": fmt, "kind": kind, "lang": "hi" if hindi else "en",
+                         "pages": len(page_lines)})
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"seed": seed, "count": count, "files": manifest}, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--out", default="bench_corpus", help="output directory (default: bench_corpus)")
+    parser.add_argument("--count", type=int, default=60, help="number of resumes (default: 60)")
+    parser.add_argument("--seed", type=int, default=7, help="random seed (default: 7)")
+    parser.add_argument("--max-pages", type=int, default=20, help="longest resume in pages (default: 20)")
+    args = parser.parse_args(argv)
+    manifest = generate(args.out, args.count, args.seed, args.max_pages)
+    print(f"Wrote {len(manifest)} resumes to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
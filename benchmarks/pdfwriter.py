@@ -0,0 +1,79 @@
+"""A minimal PDF writer for the synthetic corpus (text pages and JPEG images).
+
+Only what the benchmark needs: Helvetica text lines (Latin-1) and at most one
+JPEG per page, placed at a given rectangle.
+"""
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+
+def _escape(line):
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _content_stream(page):
+    ops = []
+    lines = page.get("lines") or []
+    if lines:
+        ops.append("BT /F1 10 Tf 12 TL 50 800 Td")
+        for line in lines:
+            ops.append(f"({_escape(line)}) Tj T*")
+        ops.append("ET")
+    if page.get("image"):
+        x, y, w, h = page.get("image_box") or (0, 0, PAGE_WIDTH, PAGE_HEIGHT)
+        ops.append(f"q {w} 0 0 {h} {x} {y} cm /Im1 Do Q")
+    return "\n".join(ops).encode("latin-1")
+
+
+def write_pdf(path, pages):
+    """Write `pages` to `path`.
+
+    Each page is a dict with optional "lines" (list of str), "image" (JPEG
+    bytes), "image_size" (pixel width, height), "image_mode" ("RGB" or "L")
+    and "image_box" (x, y, width, height in points; full page by default).
+    """
+    objects = []  # object number = index + 1
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    pages_obj = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    page_ids = []
+    for page in pages:
+        resources = f"/Font << /F1 {font} 0 R >>"
+        if page.get("image"):
+            width, height = page["image_size"]
+            colorspace = "/DeviceGray" if page.get("image_mode") == "L" else "/DeviceRGB"
+            image = add(
+                f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                f"/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /DCTDecode "
+                f"/Length {len(page['image'])} >>\nstream\n".encode() + page["image"] + b"\nendstream"
+            )
+            resources += f" /XObject << /Im1 {image} 0 R >>"
+        stream = _content_stream(page)
+        content = add(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_obj} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << {resources} >> /Contents {content} 0 R >>".encode()
+        ))
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_obj} 0 R >>".encode()
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[pages_obj - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
@@ -0,0 +1,408 @@
+"""Run the pipeline stage by stage over a corpus and report timings.
+
+    python -m benchmarks.run --generate 60 --latency 0.2 --output bench.json
+    python -m benchmarks.run --baseline bench_baseline.json   # exit 1 on regression
+
+Every resume in the corpus goes through load_document, count_real_images,
+extract_text, compact_text, pre_extract, build_prompt, the LLM call (against
+the local stub server), parse_llm_json and post_process_json. For each stage
+the report gives wall time, CPU time and RSS growth; overall it gives peak
+RSS and throughput in resumes per second. A separate pass times
+post_process_batch over a few thousand synthetic records to report
+post-processing throughput in records per second, and fresh interpreters
+measure the package's import time with ``-X importtime`` and the time
+`warmup()` takes to load the rest. A routing pass sends concurrent requests
+to a stub with a heavy latency tail and injected errors, first directly and
+then through a ModelRouter that can hedge to a second stub, and reports the
+latency percentiles of each.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+from resume_extractor import (
+    AsyncExtractionClient,
+    Endpoint,
+    ModelRouter,
+    build_prompt,
+    compact_text,
+    count_real_images,
+    extract_text,
+    load_document,
+    make_client,
+    parse_llm_json,
+    post_process_batch,
+    post_process_json,
+    pre_extract,
+    warmup,
+)
+from resume_extractor.llm import complete
+from resume_extractor.postprocess import cache_info
+
+from .corpus import MONTHS, generate
+from .stub_llm import REPLY_OBJECT, start_stub_server
+
+STAGES = ["load", "count_images", "extract_text", "compact", "rules", "prompt", "llm", "json_parse", "post_process"]
+
+# Differences smaller than this are timer noise, never regressions
+MIN_REGRESSION_SECONDS = 0.002
+MIN_IMPORT_REGRESSION_SECONDS = 0.02
+
+
+def _rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StageTimer:
+    """Collects wall time, CPU time and peak-RSS growth per named stage."""
+
+    def __init__(self):
+        self.samples = {name: [] for name in STAGES}
+
+    @contextmanager
+    def stage(self, name):
+        rss = _rss_mb()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.samples.setdefault(name, []).append(
+                (time.perf_counter() - wall, time.process_time() - cpu, _rss_mb() - rss)
+            )
+
+    def summary(self):
+        out = {}
+        for name, samples in self.samples.items():
+            if not samples:
+                continue
+            walls = sorted(s[0] for s in samples)
+            out[name] = {
+                "count": len(samples),
+                "wall_total": round(sum(walls), 6),
+                "wall_mean": round(sum(walls) / len(walls), 6),
+                "wall_p50": round(walls[len(walls) // 2], 6),
+                "wall_p95": round(walls[min(len(walls) - 1, int(len(walls) * 0.95))], 6),
+                "cpu_total": round(sum(s[1] for s in samples), 6),
+                "cpu_mean": round(sum(s[1] for s in samples) / len(samples), 6),
+                "rss_growth_mb": round(max(s[2] for s in samples), 2),
+            }
+        return out
+
+
+def run_file(path, client, timer):
+    with open(path, "rb") as f:
+        with timer.stage("load"):
+            document = load_document(f)
+    with timer.stage("count_images"):
+        count_real_images(document)
+    with timer.stage("extract_text"):
+        resume_text, ocr_used = extract_text(document)
+    with timer.stage("compact"):
+        prompt_text, _ = compact_text(resume_text, pages=document["pages"])
+    with timer.stage("rules"):
+        pre_extract(resume_text)
+    with timer.stage("prompt"):
+        prompt = build_prompt(prompt_text)
+    with timer.stage("llm"):
+        raw_response = complete(client, prompt)
+    with timer.stage("json_parse"):
+        parsed_json = parse_llm_json(raw_response)
+    with timer.stage("post_process"):
+        post_process_json(parsed_json, ocr_used=ocr_used)
+
+
+def _date(rng):
+    # The spread of date spellings models return, including repeats across records
+    year = rng.randint(1995, 2024)
+    return rng.choice([
+        f"{rng.choice(MONTHS)} {year}", str(year), f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{year}",
+        f"{rng.randint(1, 28)} {rng.choice(MONTHS)} {year}", f"{year}-{year + rng.randint(1, 4)}",
+    ])
+
+
+def batch_records(count, seed=7):
+    """`count` copies of the stub reply with varied dates, for post-processing throughput."""
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        record = copy.deepcopy(REPLY_OBJECT)
+        for edu in record["education"]:
+            edu["passing_year"] = _date(rng)
+        for exp in record["experience"]:
+            exp["start_date"] = _date(rng)
+            if exp["end_date"] != "current_time":
+                exp["end_date"] = _date(rng)
+        records.append(record)
+    return records
+
+
+def run_post_process_batch(count):
+    records = batch_records(count)
+    before = cache_info()["normalize_date"]
+    started = time.perf_counter()
+    for _ in post_process_batch(records):
+        pass
+    elapsed = time.perf_counter() - started
+    after = cache_info()["normalize_date"]
+    hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+    return {
+        "records": count,
+        "wall_seconds": round(elapsed, 3),
+        "per_sec": round(count / elapsed, 1) if elapsed else 0.0,
+        "date_cache_hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+    }
+
+
+def _importtime(code):
+    # {module: cumulative seconds} from one fresh interpreter running `code` under -X importtime
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times.setdefault(name.strip(), int(cumulative) / 1e6)
+    return times, proc.stdout
+
+
+def measure_startup(runs=5):
+    """Median import time of resume_extractor and of warmup(), each in fresh interpreters."""
+    imports, warmups = [], []
+    heaviest = {}
+    for _ in range(runs):
+        times, _ = _importtime("import resume_extractor")
+        imports.append(times["resume_extractor"])
+        for name, seconds in times.items():
+            if not name.startswith("resume_extractor") and "." not in name:
+                heaviest.setdefault(name, []).append(seconds)
+        _, out = _importtime("import logging, resume_extractor; logging.disable(logging.WARNING);"
+                             "print(resume_extractor.warmup()['seconds'])")
+        warmups.append(float(out.strip().splitlines()[-1]))
+    top = sorted(((name, statistics.median(s)) for name, s in heaviest.items()), key=lambda x: -x[1])[:5]
+    return {
+        "import_seconds": round(statistics.median(imports), 4),
+        "warmup_seconds": round(statistics.median(warmups), 4),
+        "heaviest_imports": [[name, round(seconds, 4)] for name, seconds in top],
+    }
+
+
+async def _timed_calls(client, count, concurrency):
+    # (latencies of successful calls, failures) for `count` completions, `concurrency` at a time
+    latencies, failures = [], 0
+    limit = asyncio.Semaphore(concurrency)
+
+    async def call():
+        nonlocal failures
+        async with limit:
+            started = time.perf_counter()
+            try:
+                reply = await client.complete("Resume Text: benchmark")
+                if isinstance(reply, str):
+                    parse_llm_json(reply)
+            except Exception:
+                failures += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    async with client:
+        await asyncio.gather(*(call() for _ in range(count)))
+    return latencies, failures
+
+
+def measure_routing(requests=200, concurrency=8, slow_rate=0.1, slow_latency=1.0, error_rate=0.02):
+    """Latency percentiles of calls to a flaky stub, directly and through a hedging ModelRouter."""
+    flaky, flaky_url = start_stub_server(latency=0.05, slow_rate=slow_rate, slow_latency=slow_latency,
+                                         error_rate=error_rate)
+    steady, steady_url = start_stub_server(latency=0.1)
+    options = {"max_in_flight": concurrency, "requests_per_second": 0, "max_retries": 2, "backoff_base": 0.1}
+    results = {}
+    try:
+        for mode in ("direct", "routed"):
+            if mode == "direct":
+                client = AsyncExtractionClient(api_key="benchmark", base_url=flaky_url, model="flaky", **options)
+            else:
+                client = ModelRouter([Endpoint("flaky", base_url=flaky_url, api_key="benchmark"),
+                                      Endpoint("steady", base_url=steady_url, api_key="benchmark", cost=2.0)],
+                                     hedge_delay=slow_latency / 2, **options)
+            started = time.perf_counter()
+            latencies, failures = asyncio.run(_timed_calls(client, requests, concurrency))
+            latencies.sort()
+            results[mode] = {
+                "wall_seconds": round(time.perf_counter() - started, 3),
+                "p50": round(latencies[len(latencies) // 2], 4) if latencies else None,
+                "p95": round(latencies[int(len(latencies) * 0.95)], 4) if latencies else None,
+                "max": round(latencies[-1], 4) if latencies else None,
+                "failures": failures,
+            }
+            if mode == "routed":
+                results[mode]["endpoints"] = client.stats()["endpoints"]
+    finally:
+        flaky.shutdown()
+        steady.shutdown()
+    results["config"] = {"requests": requests, "concurrency": concurrency, "slow_rate": slow_rate,
+                         "slow_latency": slow_latency, "error_rate": error_rate}
+    return results
+
+
+def run_benchmark(corpus_dir, latency=0.0, limit=None, batch=2000, routing=200):
+    with open(os.path.join(corpus_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    files = manifest["files"][:limit] if limit else manifest["files"]
+
+    # Dependencies load lazily; load them now so the first file's stages are not charged for it
+    warmup()
+    server, base_url = start_stub_server(latency=latency)
+    client = make_client(api_key="benchmark", base_url=base_url)
+    timer = StageTimer()
+    by_kind = {}
+    errors = []
+    started = time.perf_counter()
+    try:
+        for entry in files:
+            t = time.perf_counter()
+            try:
+                run_file(os.path.join(corpus_dir, entry["file"]), client, timer)
+            except Exception as e:
+                errors.append({"file": entry["file"], "error": f"{type(e).__name__}: {e}"})
+            kind = by_kind.setdefault(f"{entry['format']}/{entry['kind']}", {"files": 0, "wall_total": 0.0})
+            kind["files"] += 1
+            kind["wall_total"] += time.perf_counter() - t
+    finally:
+        server.shutdown()
+    elapsed = time.perf_counter() - started
+
+    for kind in by_kind.values():
+        kind["wall_mean"] = round(kind.pop("wall_total") / kind["files"], 6)
+    return {
+        "config": {
+            "corpus": os.path.abspath(corpus_dir),
+            "seed": manifest.get("seed"),
+            "files": len(files),
+            "latency": latency,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "wall_seconds": round(elapsed, 3),
+        "throughput_per_sec": round(len(files) / elapsed, 3) if elapsed else 0.0,
+        "peak_rss_mb": round(_rss_mb(), 1),
+        "errors": errors,
+        "stages": timer.summary(),
+        "by_kind": by_kind,
+        "post_process_batch": run_post_process_batch(batch) if batch else None,
+        "startup": measure_startup(),
+        "routing": measure_routing(routing) if routing else None,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regressions of `results` against `baseline`."""
+    regressions = []
+    for name, base in baseline.get("stages", {}).items():
+        current = results["stages"].get(name)
+        if not current:
+            continue
+        allowed = base["wall_mean"] * (1 + tolerance)
+        if current["wall_mean"] > allowed and current["wall_mean"] - base["wall_mean"] > MIN_REGRESSION_SECONDS:
+            regressions.append(f"{name}: mean wall {current['wall_mean']:.4f}s vs baseline {base['wall_mean']:.4f}s")
+    base_tp = baseline.get("throughput_per_sec")
+    if base_tp and results["throughput_per_sec"] < base_tp / (1 + tolerance):
+        regressions.append(f"throughput: {results['throughput_per_sec']:.3f}/s vs baseline {base_tp:.3f}/s")
+    base_batch = (baseline.get("post_process_batch") or {}).get("per_sec")
+    batch = results.get("post_process_batch") or {}
+    if base_batch and batch and batch["per_sec"] < base_batch / (1 + tolerance):
+        regressions.append(f"post_process_batch: {batch['per_sec']:.0f} records/s vs baseline {base_batch:.0f}/s")
+    base_import = (baseline.get("startup") or {}).get("import_seconds")
+    current_import = (results.get("startup") or {}).get("import_seconds")
+    if base_import and current_import and current_import > base_import * (1 + tolerance) \
+            and current_import - base_import > MIN_IMPORT_REGRESSION_SECONDS:
+        regressions.append(f"import: {current_import:.3f}s vs baseline {base_import:.3f}s")
+    return regressions
+
+
+def print_report(results, out=sys.stdout):
+    print(f"{'stage':<14}{'n':>6}{'wall mean':>12}{'wall p95':>12}{'cpu mean':>12}{'rss +MB':>10}", file=out)
+    for name, s in results["stages"].items():
+        print(f"{name:<14}{s['count']:>6}{s['wall_mean']:>12.4f}{s['wall_p95']:>12.4f}{s['cpu_mean']:>12.4f}"
+              f"{s['rss_growth_mb']:>10.1f}", file=out)
+    print(f"\n{results['config']['files']} resumes in {results['wall_seconds']}s: "
+          f"{results['throughput_per_sec']} resumes/s, peak RSS {results['peak_rss_mb']} MB, "
+          f"{len(results['errors'])} error(s)", file=out)
+    batch = results.get("post_process_batch")
+    if batch:
+        print(f"post_process_batch: {batch['records']} records in {batch['wall_seconds']}s: {batch['per_sec']} records/s, "
+              f"date cache hit rate {batch['date_cache_hit_rate']:.0%}", file=out)
+    startup = results.get("startup")
+    if startup:
+        heaviest = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in startup["heaviest_imports"])
+        print(f"startup: import resume_extractor {startup['import_seconds']:.3f}s, "
+              f"warmup() {startup['warmup_seconds']:.3f}s; heaviest imports: {heaviest}", file=out)
+    routing = results.get("routing")
+    if routing:
+        for mode in ("direct", "routed"):
+            r = routing[mode]
+            print(f"routing ({mode}): p50 {r['p50']}s, p95 {r['p95']}s, max {r['max']}s, "
+                  f"{r['failures']} failure(s) in {r['wall_seconds']}s", file=out)
+        hedges = sum(e["hedges"] for e in routing["routed"]["endpoints"])
+        wins = ", ".join(f"{e['name']} {e['wins']}" for e in routing["routed"]["endpoints"])
+        print(f"routing: {hedges} hedged request(s); wins {wins}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of the resume pipeline")
+    parser.add_argument("--corpus", default="bench_corpus", help="corpus directory (default: bench_corpus)")
+    parser.add_argument("--generate", type=int, metavar="N", help="(re)generate a corpus of N resumes first")
+    parser.add_argument("--seed", type=int, default=7, help="corpus seed when generating (default: 7)")
+    parser.add_argument("--limit", type=int, help="only run the first N resumes")
+    parser.add_argument("--latency", type=float, default=0.0, help="stub LLM latency in seconds (default: 0)")
+    parser.add_argument("--batch", type=int, default=2000,
+                        help="records for the post-processing throughput pass, 0 to skip (default: 2000)")
+    parser.add_argument("--routing", type=int, default=200,
+                        help="requests for the routing/hedging pass, 0 to skip (default: 200)")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline, as a fraction (default: 0.25)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results as a new baseline")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        generate(args.corpus, args.generate, seed=args.seed)
+
+    results = run_benchmark(args.corpus, latency=args.latency, limit=args.limit, batch=args.batch,
+                            routing=args.routing)
+    print_report(results)
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config", {}).get("latency") != args.latency:
+            print("warning: baseline was recorded with a different stub latency", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nREGRESSIONS:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,162 @@
+"""A local OpenAI-compatible chat-completions server for offline runs.
+
+    python -m benchmarks.stub_llm --port 8901 --latency 0.5
+
+Answers every POST to /v1/chat/completions with a fixed resume JSON (with
+chatter and trailing commas around it, to exercise the JSON repair path)
+after `latency` seconds, plus up to `jitter` seconds. Streaming requests get
+the same reply as server-sent events.
+
+Failures can be injected to exercise retries and routing: a `slow_rate`
+share of requests waits `slow_latency` seconds more (a heavy tail), an
+`error_rate` share is answered with HTTP `error_status`, and a
+`bad_json_rate` share gets a reply with no JSON object in it.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY_OBJECT = {
+    "full_name": "Aarav Sharma", "email": "aarav.sharma@example.com", "mobile_no": "9876543210",
+    "date_of_birth": "12-03-1994", "father_name": "", "gender": "Male", "address": "12 MG Road, Pune",
+    "city": "Pune", "latest_company_name": "HDFC Bank", "industry": "Banking", "department": "Sales, Operations",
+    "key_responsibilities": ["Managed a portfolio of clients", "Trained new joiners on processes and"],
+    "profile_title": "Sales Executive",
+    "education": [
+        {"degree": "B.Com", "branch_or_board": "Accounts", "school_or_institute": "Pune University",
+         "passing_year": "May 2015", "grade_type": "", "grade_value": "67%"},
+        {"degree": "12th", "branch_or_board": "CBSE", "school_or_institute": "DPS Pune",
+         "passing_year": "2012", "grade_type": "", "grade_value": "81%"},
+    ],
+    "total_work_experience": 0.0, "current_ctc": "",
+    "experience": [
+        {"job_title": "Sales Executive", "company": "HDFC Bank", "start_date": "Jul 2020", "end_date": "current_time",
+         "is_current": "true", "location": "Pune", "total_experience": 0.0},
+        {"job_title": "Sales Officer", "company": "ICICI Bank", "start_date": "2016", "end_date": "June 2020",
+         "is_current": "false", "location": "Mumbai", "total_experience": 0.0},
+    ],
+    "skills": ["Customer Handling", "node js", "SQL queries and", "Excel"], "languages": ["Hindi", "English"],
+    "hobbies": ["Cricket"], "role": "Sales Executive", "role_category": "Sales", "ocr_used": "false",
+}
+
+
+def reply_text():
+    # Chatter before and after, and trailing commas inside, like a sloppy model
+    body = json.dumps(REPLY_OBJECT, ensure_ascii=False)
+    body = body.replace("}]", "},]").replace('"]', '",]', 1)
+    return f"Here is the extracted JSON:\n{body}\nLet me know if you need anything else."
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "StubLLM/1.0"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            request = {}
+        settings = self.server.settings
+        settings["requests"] += 1
+        delay = settings["latency"] + random.uniform(0, settings["jitter"])
+        if random.random() < settings["slow_rate"]:
+            delay += settings["slow_latency"]
+        time.sleep(delay)
+
+        if random.random() < settings["error_rate"]:
+            settings["errors"] += 1
+            self._send_json(settings["error_status"],
+                            {"error": {"message": "injected failure", "code": settings["error_status"]}})
+            return
+        if random.random() < settings["bad_json_rate"]:
+            settings["bad_json"] += 1
+            content = "Sorry, I could not read that resume."
+        else:
+            content = reply_text()
+        prompt = "".join(m.get("content", "") for m in request.get("messages", []))
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        model = request.get("model", "stub")
+        if request.get("stream"):
+            self._stream(content, model)
+            return
+        self._send_json(200, {
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": usage,
+        })
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up, e.g. a hedged request that lost
+
+    def _stream(self, content, model):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        try:
+            for i in range(0, len(content), 16):
+                chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": model, "choices": [{"index": 0, "delta": {"content": content[i:i + 16]},
+                                                      "finish_reason": None}]}
+                self.wfile.write(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+                self.wfile.flush()
+                time.sleep(self.server.settings["chunk_delay"])
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading once it had the JSON
+
+
+def start_stub_server(port=0, latency=0.0, jitter=0.0, chunk_delay=0.0, slow_rate=0.0, slow_latency=0.0,
+                      error_rate=0.0, error_status=500, bad_json_rate=0.0):
+    """Start the stub in a daemon thread; returns (server, base_url).
+
+    `server.settings` holds the settings, which may be changed while it runs,
+    and the counts of requests, injected errors and bad JSON replies.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.settings = {"latency": latency, "jitter": jitter, "chunk_delay": chunk_delay, "slow_rate": slow_rate,
+                       "slow_latency": slow_latency, "error_rate": error_rate, "error_status": error_status,
+                       "bad_json_rate": bad_json_rate, "requests": 0, "errors": 0, "bad_json": 0}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub server")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each reply")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of requests given --slow-latency more")
+    parser.add_argument("--slow-latency", type=float, default=0.0, help="extra seconds for slow requests")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected errors (default: 500)")
+    parser.add_argument("--bad-json-rate", type=float, default=0.0, help="share of replies with no JSON object")
+    args = parser.parse_args(argv)
+    server, url = start_stub_server(args.port, args.latency, args.jitter, args.chunk_delay, args.slow_rate,
+                                    args.slow_latency, args.error_rate, args.error_status, args.bad_json_rate)
+    print(f"Stub LLM listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,47 @@
+"""Resume extraction pipeline: document loading, OCR, LLM parsing and post-processing.
+
+Importing the package has no side effects; the HTTP service and batch CLI
+(``python -m resume_extractor serve|extract``) are thin layers on top of it,
+and the Streamlit app (Resume.py) is a client of the service. Heavy
+dependencies (pdfplumber, python-docx, Pillow, pytesseract, openai, dateutil)
+are imported on first use; long-lived workers call `warmup()` to load them
+up front.
+"""
+from .async_llm import AsyncExtractionClient, TokenBucket
+from .cache import ResultCache, result_cache_key
+from .chunked import build_section_prompts, merge_sections, complete_sections, acomplete_sections
+from .compact import compact_text, estimate_tokens, split_sections
+from .dedupe import NearDuplicateIndex, get_dedupe_index, minhash, similarity
+from .extraction import extract_text, images_to_ocr
+from .llm import make_client, complete
+from .llm_cache import LLMResponseCache, CacheMissError, get_llm_cache, normalize_prompt, response_cache_key
+from .loader import load_document, count_real_images, iter_pdf_pages
+from .metrics import Tracer, tracer, configure, span, traced
+from .ocr import ocr_images, OCRCache, get_ocr_cache
+from .parsing import extract_json_block, strip_trailing_commas, parse_llm_json, ResponseParseError
+from .pipeline import (
+    parse_resume,
+    aparse_resume,
+    parse_response,
+    prepare_resume,
+    finish_resume,
+    call_llm,
+    acall_llm,
+)
+from .postprocess import (
+    normalize_date,
+    calculate_duration,
+    format_experience,
+    refine_skills,
+    post_process_json,
+    post_process_batch,
+    canonical_skills,
+)
+from .prompt import build_prompt, build_section_prompt
+from .router import Endpoint, ModelRouter, load_endpoints, make_async_client
+from .rules import pre_extract, confident_fields, apply_rule_fields, rules_record
+from .service import ExtractionService, ServiceClient, QueueFullError, serve
+from .skills import SkillMatcher, get_skill_matcher, load_dictionary
+from .store import CandidateStore
+from .warmup import warmup, check_tesseract
+from .streaming import IncrementalJSONScanner
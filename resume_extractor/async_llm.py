@@ -0,0 +1,289 @@
+"""Asyncio LLM client with concurrency limits, rate limiting and retries."""
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import time
+
+
+from .config import (
+    LLM_BASE_URL,
+    MODEL,
+    TEMPERATURE,
+    LLM_MAX_IN_FLIGHT,
+    LLM_REQUESTS_PER_SECOND,
+    LLM_BURST,
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+    LLM_DEADLINE,
+)
+from .llm import EXTRA_HEADERS, record_usage
+from .llm_cache import get_llm_cache
+from .metrics import span
+from .parsing import parse_llm_json, ResponseParseError
+from .streaming import IncrementalJSONScanner
+
+log = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class TokenBucket:
+    """Allow `rate` acquisitions per second on average, in bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def retry_after_seconds(error):
+    """Return the server-requested delay from a failed response, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def is_retryable(error):
+    import openai
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+def _decode(scanner, text):
+    # The scanner's object when it closed and decodes, else whatever parse_llm_json makes of the whole reply
+    if scanner.done:
+        try:
+            return scanner.result()
+        except ResponseParseError:
+            pass
+    return parse_llm_json(text)
+
+
+class AsyncExtractionClient:
+    """Chat-completions client for running many extractions concurrently.
+
+    At most `max_in_flight` requests are outstanding at once and new requests
+    start at no more than `requests_per_second` (bursting to `burst`).
+    Timeouts, connection errors, 408/409/429 and 5xx responses are retried
+    with jittered exponential backoff; a Retry-After header overrides the
+    computed delay and holds back every request on this client, since the
+    limit applies to the whole API key. Each call gives up once `deadline`
+    seconds have passed since it was made, retries included.
+
+    With an LLMResponseCache as `response_cache` (default: `get_llm_cache()`),
+    `complete` and `stream_json` reuse stored replies; in replay mode no API
+    key is needed and nothing goes over the network.
+
+    Calls take an optional `on_latency(seconds)` callback, given the network
+    time of the request that succeeded: the time waiting for an in-flight
+    slot, the rate limiter or a retry is left out, and a reply served from
+    the cache does not call it.
+    """
+
+    def __init__(self, api_key=None, base_url=LLM_BASE_URL, model=MODEL, temperature=TEMPERATURE,
+                 max_in_flight=LLM_MAX_IN_FLIGHT, requests_per_second=LLM_REQUESTS_PER_SECOND,
+                 burst=LLM_BURST, max_retries=LLM_MAX_RETRIES, backoff_base=LLM_BACKOFF_BASE,
+                 backoff_max=LLM_BACKOFF_MAX, deadline=LLM_DEADLINE, response_cache=None):
+        self.response_cache = response_cache if response_cache is not None else get_llm_cache()
+        if self.response_cache is not None and self.response_cache.mode == "replay":
+            self._client = None
+        else:
+            api_key = api_key or os.environ.get("API_KEY")
+            if not api_key:
+                raise ValueError("API key is missing. Set API_KEY or pass api_key.")
+            from openai import AsyncOpenAI
+            # Retries are handled here so they share the deadline and rate limiter
+            self._client = AsyncOpenAI(base_url=base_url, api_key=api_key, max_retries=0)
+        self.model = model
+        self.temperature = temperature
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._bucket = TokenBucket(requests_per_second, burst)
+        self._resume_at = 0.0
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _backoff(self, attempt):
+        # "Full jitter": spreads retries from many callers instead of bunching them
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _wait_for_slot(self, deadline):
+        pause = self._resume_at - time.monotonic()
+        if pause > 0:
+            if time.monotonic() + pause >= deadline:
+                raise TimeoutError("LLM request deadline would pass while rate limited")
+            await asyncio.sleep(pause)
+        await self._bucket.acquire()
+
+    async def create(self, messages, model=None, deadline=None, on_latency=None, **kwargs):
+        """Call chat.completions.create with limits and retries; returns the completion."""
+        return await self._call(messages, model, deadline, None, on_latency, **kwargs)
+
+    async def _call(self, messages, model, deadline, consume, on_latency=None, **kwargs):
+        # `consume(response, deadline, span)` runs while the in-flight slot is
+        # still held, so a streamed body counts against the limit until it is read
+        deadline = time.monotonic() + (deadline or self.deadline)
+        kwargs.setdefault("temperature", self.temperature)
+        with span("llm", model=model or self.model, stream=bool(kwargs.get("stream"))) as s:
+            attempt = 0
+            while True:
+                async with self._in_flight:
+                    await self._wait_for_slot(deadline)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("LLM request deadline exceeded")
+                    started = time.monotonic()
+                    try:
+                        response = await asyncio.wait_for(
+                            self._client.chat.completions.create(
+                                extra_headers=EXTRA_HEADERS,
+                                model=model or self.model,
+                                messages=messages,
+                                timeout=remaining,
+                                **kwargs,
+                            ),
+                            remaining,
+                        )
+                    except Exception as e:
+                        if not is_retryable(e) or attempt >= self.max_retries:
+                            raise
+                        error = e
+                    else:
+                        s.set(attempts=attempt + 1)
+                        if consume is None:
+                            record_usage(s, response)
+                        else:
+                            response = await consume(response, deadline, s)
+                        if on_latency is not None:
+                            on_latency(time.monotonic() - started)
+                        return response
+
+                delay = self._backoff(attempt)
+                requested = retry_after_seconds(error)
+                if requested is not None:
+                    delay = max(delay, requested)
+                    self._resume_at = max(self._resume_at, time.monotonic() + requested)
+                if time.monotonic() + delay >= deadline:
+                    raise TimeoutError(f"LLM request deadline exceeded after {attempt + 1} attempt(s)") from error
+                attempt += 1
+                log.warning("LLM request failed (%s); retry %d in %.1fs", error, attempt, delay)
+                await asyncio.sleep(delay)
+
+    def _cached(self, model, prompt):
+        if self.response_cache is None or not self.response_cache.reads:
+            return None
+        return self.response_cache.get(model or self.model, self.temperature, prompt)
+
+    def _store(self, model, prompt, reply):
+        if self.response_cache is not None:
+            self.response_cache.put(model or self.model, self.temperature, prompt, reply)
+
+    async def complete(self, prompt, model=None, deadline=None, on_latency=None):
+        """Send `prompt` as a single user message and return the reply text."""
+        reply = self._cached(model, prompt)
+        if reply is not None:
+            return reply
+        completion = await self.create([{"role": "user", "content": prompt}], model=model, deadline=deadline,
+                                       on_latency=on_latency)
+        reply = completion.choices[0].message.content
+        self._store(model, prompt, reply)
+        return reply
+
+    async def stream_json(self, prompt, on_event=None, model=None, deadline=None, on_latency=None):
+        """Stream a completion for `prompt` and return the decoded JSON object.
+
+        Chunks go through an IncrementalJSONScanner; `on_event` is called
+        with each field or array item as it completes, and the stream is
+        closed as soon as the top-level object does, so the model stops
+        generating instead of rambling on after the JSON. If the reply has
+        no well-formed object, or the object it closed does not decode, falls
+        back to `parse_llm_json` on the full text, which raises
+        ResponseParseError carrying that text. A cached reply is fed through
+        the same scanner, so `on_event` sees the same events.
+        """
+        scanner = IncrementalJSONScanner()
+        cached = self._cached(model, prompt)
+        if cached is not None:
+            for event in scanner.feed(cached):
+                if on_event is not None:
+                    on_event(event)
+            return _decode(scanner, cached)
+        raw = []
+
+        async def consume(stream, deadline, s):
+            async def read():
+                async for chunk in stream:
+                    record_usage(s, chunk)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content or ""
+                    raw.append(delta)
+                    for event in scanner.feed(delta):
+                        if on_event is not None:
+                            on_event(event)
+                    if scanner.done:
+                        break
+
+            try:
+                await asyncio.wait_for(read(), max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                raise TimeoutError("LLM stream deadline exceeded") from None
+            finally:
+                s.set(completion_chars=sum(map(len, raw)))
+                await stream.close()
+
+        await self._call([{"role": "user", "content": prompt}], model, deadline, consume, on_latency, stream=True)
+        # The raw text, so a replayed reply that needed repair goes through the same repair
+        self._store(model, prompt, "".join(raw))
+        return _decode(scanner, "".join(raw))
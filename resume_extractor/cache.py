@@ -0,0 +1,134 @@
+"""Content-addressed cache of final parsed resumes."""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from .config import MODEL, PROMPT_VERSION, RULES_MODE, RESULT_CACHE_ENTRIES, RESULT_CACHE_MAX_BYTES, CHUNKED_EXTRACTION
+from .skills import get_skill_matcher
+
+log = logging.getLogger(__name__)
+
+
+def result_cache_key(file_bytes, model=MODEL, prompt_version=PROMPT_VERSION, rules_mode=RULES_MODE,
+                     chunked=CHUNKED_EXTRACTION):
+    """SHA-256 of the upload bytes, salted with the model, prompt version, rules mode, chunking and skills dictionary."""
+    matcher = get_skill_matcher()
+    h = hashlib.sha256(file_bytes)
+    h.update(f"\0{model}\0{prompt_version}\0{rules_mode}".encode())
+    if chunked != "off":
+        h.update(f"\0chunked={chunked}".encode())
+    if matcher is not None:
+        h.update(f"\0{matcher.digest}".encode())
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Two-tier cache of final parsed resumes keyed by `result_cache_key`.
+
+    The memory tier is an LRU of up to `max_entries` records. When
+    `directory` is given, records are also written there as JSON files and the
+    least recently used files are evicted once they exceed `max_bytes`. The
+    directory is scanned at start and on eviction only; in between, a running
+    byte count decides when to evict.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_ENTRIES, directory=None, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()  # shared by every Streamlit session thread
+        self._evict_lock = threading.Lock()
+        self._bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._bytes = sum(size for _, size, _ in self._scan())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        with self._lock:
+            raw = self._memory.get(key)
+            if raw is not None:
+                self._memory.move_to_end(key)
+        if raw is None and self.directory:
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    raw = f.read()
+                os.utime(self._path(key))  # mark as recently used
+            except OSError:
+                return None
+            self._remember(key, raw)
+        elif raw is None:
+            return None
+        # Hand out a fresh copy so callers can't mutate the cached record
+        return json.loads(raw)
+
+    def put(self, key, value):
+        raw = json.dumps(value, ensure_ascii=False)
+        self._remember(key, raw)
+        if self.directory:
+            path = self._path(key)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            data = raw.encode("utf-8")
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                try:
+                    replaced = os.stat(path).st_size
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp, path)
+                with self._lock:
+                    self._bytes += len(data) - replaced
+                    over = self._bytes > self.max_bytes
+                if over:
+                    self._evict()
+            except OSError as e:
+                log.warning("Could not write result cache entry %s: %s", key, e)
+
+    def _remember(self, key, raw):
+        with self._lock:
+            self._memory[key] = raw
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _scan(self):
+        # (mtime, size, path) of every cached file
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        # Least recently used files go first, down to 90% of max_bytes so the next
+        # few writes do not trigger another scan; the scan also resyncs the count
+        # with files written or removed by other processes
+        if not self._evict_lock.acquire(blocking=False):
+            return  # another thread is already evicting
+        try:
+            entries = sorted(self._scan())
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+            with self._lock:
+                self._bytes = total
+        finally:
+            self._evict_lock.release()
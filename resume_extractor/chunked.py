@@ -0,0 +1,146 @@
+"""Section-chunked extraction: several small prompts instead of one long one.
+
+A long resume asked for the whole schema in one reply produces one long
+generation, and with many jobs the model may stop before the JSON is
+complete. In chunked mode the resume text is split into section groups
+(profile, experience, education, skills) with `compact.split_sections`, each
+group gets a prompt asking only for its own fields, the prompts run
+concurrently, and the partial objects are merged back into the full schema.
+Latency then follows the longest section rather than the whole resume.
+
+Merging is deterministic: each field is taken from the group that owns it,
+and when the owner left it empty, from the first other group (in GROUP_ORDER)
+that returned it non-empty.
+"""
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .compact import split_sections, estimate_tokens
+from .config import CHUNKED_MIN_TOKENS, MODEL
+from .llm import complete
+from .metrics import span
+from .parsing import parse_llm_json, ResponseParseError
+from .prompt import build_section_prompt
+from .rules import empty_record
+
+log = logging.getLogger(__name__)
+
+GROUP_ORDER = ("profile", "experience", "education", "skills")
+
+# compact.split_sections names -> prompt group; anything else (header, summary, OCR, ...) is profile text
+SECTION_GROUPS = {
+    "experience": "experience",
+    "education": "education",
+    "skills": "skills",
+    "certifications": "skills",
+    "projects": "skills",
+}
+
+GROUP_FIELDS = {
+    "profile": ("full_name", "email", "mobile_no", "date_of_birth", "father_name", "gender", "address", "city",
+                "profile_title", "current_ctc", "languages", "hobbies"),
+    "experience": ("latest_company_name", "industry", "department", "key_responsibilities", "experience",
+                   "role", "role_category"),
+    "education": ("education",),
+    "skills": ("skills",),
+}
+FIELD_OWNER = {field: group for group, fields in GROUP_FIELDS.items() for field in fields}
+
+
+def plan_sections(resume_text):
+    """{group: text} for the groups found in `resume_text`, or None if it has no recognised sections."""
+    parts = {}
+    for name, lines in split_sections(resume_text):
+        parts.setdefault(SECTION_GROUPS.get(name, "profile"), []).extend(lines)
+    if set(parts) <= {"profile"}:
+        return None
+    texts = {group: "\n".join(parts[group]).strip() for group in GROUP_ORDER if group in parts}
+    if "experience" in texts and "skills" in texts:
+        # role and role_category are inferred from skills as well as job titles
+        texts["experience"] += "\n\nSkills (for context only):\n" + texts["skills"]
+    return {group: text for group, text in texts.items() if text}
+
+
+def should_chunk(resume_text, mode, min_tokens=CHUNKED_MIN_TOKENS):
+    """Whether `mode` ("off", "auto" or "on") calls for chunked extraction of `resume_text`."""
+    if mode == "on":
+        return True
+    return mode == "auto" and estimate_tokens(resume_text) >= min_tokens
+
+
+def build_section_prompts(resume_text, skip_fields=()):
+    """[(group, prompt)] for `resume_text`, or None when it cannot be split into sections."""
+    plan = plan_sections(resume_text)
+    if plan is None:
+        return None
+    prompts = []
+    for group, text in plan.items():
+        skip = [field for field in skip_fields if FIELD_OWNER.get(field) == group]
+        prompts.append((group, build_section_prompt(group, text, skip_fields=skip)))
+    return prompts
+
+
+def _empty(value):
+    return value in ("", None, [], {}, 0, 0.0)
+
+
+def merge_sections(partials):
+    """Merge {group: partial object} into one record in the full schema."""
+    record = empty_record()
+    groups = [g for g in GROUP_ORDER if isinstance(partials.get(g), dict)]
+    for field in record:
+        owner = FIELD_OWNER.get(field)
+        candidates = ([owner] if owner in groups else []) + [g for g in groups if g != owner]
+        for group in candidates:
+            value = partials[group].get(field)
+            if not _empty(value):
+                record[field] = value
+                break
+    ocr_used = any(str(partials[g].get("ocr_used", "")).lower() == "true" for g in groups)
+    record["ocr_used"] = "true" if ocr_used else "false"
+    return record
+
+
+def _merge_replies(prompts, replies):
+    # Replies are raw text, decoded objects or the ResponseParseError a stream ended in. A section
+    # that cannot be parsed is left empty; only when none can is the error raised
+    partials, errors = {}, []
+    for (group, _), reply in zip(prompts, replies):
+        try:
+            if isinstance(reply, Exception):
+                raise reply
+            partials[group] = reply if isinstance(reply, dict) else parse_llm_json(reply)
+        except ResponseParseError as e:
+            log.warning("Could not parse the %s section reply: %s", group, e)
+            errors.append(e)
+    if not partials:
+        raise errors[0]
+    return merge_sections(partials)
+
+
+def complete_sections(client, prompts, model=MODEL):
+    """Send section prompts concurrently with the synchronous client and return the merged record."""
+    with span("sections", groups=len(prompts)):
+        with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+            # One context copy per call, so each section's llm span lands in the current trace
+            futures = [pool.submit(contextvars.copy_context().run, complete, client, prompt, model=model)
+                       for _, prompt in prompts]
+            replies = [future.result() for future in futures]
+    return _merge_replies(prompts, replies)
+
+
+async def acomplete_sections(client, prompts, stream=False, on_event=None):
+    """`complete_sections` for an `AsyncExtractionClient`; with `stream`, fields reach `on_event` as they complete."""
+    async def call(prompt):
+        if not stream:
+            return await client.complete(prompt)
+        try:
+            return await client.stream_json(prompt, on_event=on_event)
+        except ResponseParseError as e:
+            return e
+
+    with span("sections", groups=len(prompts)):
+        replies = await asyncio.gather(*(call(prompt) for _, prompt in prompts))
+    return _merge_replies(prompts, replies)
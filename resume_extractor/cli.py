@@ -0,0 +1,449 @@
+"""Command-line entry point: ``python -m resume_extractor <command>``."""
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import ResultCache
+from .config import (
+    MODEL, RESULT_CACHE_DIR, LLM_MAX_IN_FLIGHT, LLM_REQUESTS_PER_SECOND, RULES_MODE, STORE_PATH,
+    DEDUPE_INDEX_PATH, DEDUPE_THRESHOLD, SERVICE_HOST, SERVICE_PORT, SERVICE_CPU_WORKERS, SERVICE_LLM_WORKERS,
+    SERVICE_QUEUE_SIZE, CHUNKED_EXTRACTION, LLM_CACHE_PATH, LLM_CACHE_MODE, LLM_ENDPOINTS, ROUTER_HEDGE,
+)
+from .dedupe import NearDuplicateIndex
+from .llm_cache import LLMResponseCache, MODES as LLM_CACHE_MODES
+from .metrics import configure, tracer
+from .pipeline import aparse_resume
+from .postprocess import post_process_batch, cache_info
+from .router import ModelRouter, make_async_client
+from .service import ExtractionService, serve
+from .skills import SkillMatcher
+from .store import CandidateStore
+from .warmup import warmup
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+
+
+def find_resumes(inputs):
+    """Expand directories and glob patterns into a sorted list of resume files."""
+    found = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                for name in files:
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        found.add(os.path.join(root, name))
+        elif any(ch in item for ch in "*?["):
+            for path in glob.glob(item, recursive=True):
+                if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS):
+                    found.add(path)
+        elif os.path.isfile(item):
+            found.add(item)
+        else:
+            logging.warning("No such file or directory: %s", item)
+    return sorted(found)
+
+
+def read_checkpoint(output_path):
+    """Return the files already recorded as successfully parsed in `output_path`."""
+    done = set()
+    try:
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by an interrupted run
+                if record.get("status") == "ok":
+                    done.add(record["file"])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+async def process_file(path, client, cache, executor, stream=False, rules_mode=RULES_MODE, store=None,
+                       dedupe=None, chunked=CHUNKED_EXTRACTION):
+    """Parse one file into an output record; failures become error records.
+
+    With a CandidateStore as `store`, successful records are queued into it.
+    With a NearDuplicateIndex as `dedupe`, near-duplicates skip the LLM.
+    """
+    try:
+        with open(path, "rb") as f:
+            result = await aparse_resume(f, client, cache=cache, executor=executor, stream=stream,
+                                         rules_mode=rules_mode, dedupe=dedupe, chunked=chunked)
+        if store is not None:
+            store.add(result["data"], sha256=result["sha256"], file=path, text=result.get("text", ""))
+        return {
+            "file": path,
+            "status": "ok",
+            "sha256": result["sha256"],
+            "cached": result["cached"],
+            "ocr_used": result.get("ocr_used"),
+            "compaction": result.get("compaction"),
+            "near_duplicate": result.get("near_duplicate"),
+            "sections": result.get("sections"),
+            "data": result["data"],
+        }
+    except Exception as e:
+        return {
+            "file": path,
+            "status": "error",
+            "error_type": type(e).__name__,
+            "error": str(e),
+        }
+
+
+async def extract_files(files, args, cache, emit, store=None, dedupe=None, response_cache=None):
+    """Parse `files`, calling `emit` with each record as soon as it is ready.
+
+    Extraction and OCR run on `args.workers` threads while LLM calls are
+    limited by the client, so enough files are kept in flight to keep both
+    busy. Returns the number of failed files.
+    """
+    paths = iter(files)
+    failures = 0
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+
+    async def worker(client):
+        nonlocal failures
+        for path in paths:  # shared iterator: each worker pulls the next file
+            record = await process_file(path, client, cache, executor, stream=args.stream, rules_mode=args.rules,
+                                        store=store, dedupe=dedupe, chunked=args.chunked)
+            failures += record["status"] != "ok"
+            emit(record)
+
+    try:
+        if args.rules == "only":
+            # Offline run: no API key needed and nothing goes over the network
+            await asyncio.gather(*(worker(None) for _ in range(args.workers)))
+        else:
+            async with make_async_client(endpoints=args.endpoints, hedge=not args.no_hedge, api_key=args.api_key,
+                                         model=args.model, max_in_flight=args.llm_concurrency,
+                                         requests_per_second=args.rps, response_cache=response_cache) as client:
+                await asyncio.gather(*(worker(client) for _ in range(args.workers + args.llm_concurrency)))
+                if isinstance(client, ModelRouter):
+                    _log_router(client)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return failures
+
+
+def run_extract(args):
+    files = find_resumes(args.inputs)
+    if args.output and args.resume:
+        done = read_checkpoint(args.output)
+        files = [path for path in files if path not in done]
+        logging.info("Resuming: %d file(s) already done", len(done))
+    logging.info("Processing %d file(s) with %d worker(s)", len(files), args.workers)
+
+    cache = ResultCache(directory=args.cache_dir) if args.cache_dir else None
+    if args.metrics or args.trace:
+        configure(enabled=True, trace_file=args.trace)
+
+    if args.output:
+        mode = "a" if args.resume else "w"
+        # Never glue a new record onto a half-written last line
+        if mode == "a" and os.path.exists(args.output) and os.path.getsize(args.output):
+            with open(args.output, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        else:
+            needs_newline = False
+        out = open(args.output, mode, encoding="utf-8")
+        if needs_newline:
+            out.write("\n")
+    else:
+        out = sys.stdout
+
+    def emit(record):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    store = CandidateStore(args.store) if args.store else None
+    dedupe = NearDuplicateIndex(args.dedupe, threshold=args.dedupe_threshold) if args.dedupe else None
+    response_cache = LLMResponseCache(args.llm_cache, mode=args.llm_cache_mode) if args.llm_cache else None
+    try:
+        failures = asyncio.run(extract_files(files, args, cache, emit, store=store, dedupe=dedupe,
+                                             response_cache=response_cache))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if store is not None:
+            store.close()
+        if dedupe is not None:
+            stats = dedupe.stats()
+            logging.info("Near-duplicates: %d of %d lookup(s) (hit rate %.1f%%, %d contact update(s));"
+                         " best similarity per bucket %s", stats["hits"], stats["lookups"], 100 * stats["hit_rate"],
+                         stats["contact_updates"], json.dumps(stats["best_similarity"]))
+            dedupe.close()
+        if response_cache is not None:
+            _log_llm_cache(response_cache)
+            response_cache.close()
+        if args.metrics:
+            with open(args.metrics, "w", encoding="utf-8") as f:
+                f.write(tracer.prometheus_text())
+
+    logging.info("Finished: %d ok, %d failed", len(files) - failures, failures)
+    return 1 if failures else 0
+
+
+def _log_llm_cache(response_cache):
+    stats = response_cache.stats()
+    logging.info("LLM cache (%s): %d hit(s), %d miss(es) (hit rate %.1f%%), %d write(s), %d eviction(s);"
+                 " %d entries, %.1f MB", stats["mode"], stats["hits"], stats["misses"], 100 * stats["hit_rate"],
+                 stats["writes"], stats["evictions"], stats["entries"], stats["bytes"] / 1024 / 1024)
+
+
+def _log_router(router):
+    for s in router.stats()["endpoints"]:
+        logging.info("Endpoint %s: %d request(s), %d win(s), %d hedge(s), error rate %.1f%%, p50 %ss, p95 %ss",
+                     s["name"], s["requests"], s["wins"], s["hedges"], 100 * s["error_rate"], s["p50"], s["p95"])
+
+
+def _records_to_renormalize(lines, skipped):
+    # Yields the record inside each line: "data" of an ok extract record, or the line itself
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            skipped.append(line)
+            continue
+        if "status" in entry:
+            if entry["status"] == "ok":
+                yield entry["data"]
+        else:
+            yield entry
+
+
+def run_postprocess(args):
+    skipped = []
+    count = 0
+    started = time.perf_counter()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        with open(args.input, encoding="utf-8") as f:
+            for record in post_process_batch(_records_to_renormalize(f, skipped)):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+    hits = cache_info()["normalize_date"]
+    logging.info("Re-normalised %d record(s) in %.1fs (%.0f/s); date cache %d hits, %d misses",
+                 count, elapsed, count / elapsed if elapsed else 0, hits["hits"], hits["misses"])
+    if skipped:
+        logging.warning("Skipped %d line(s) that are not JSON", len(skipped))
+    return 0
+
+
+def run_compile_skills(args):
+    started = time.perf_counter()
+    matcher = SkillMatcher.from_file(args.dictionary, use_cache=False)
+    logging.info("Compiled %d skill(s) in %.2fs to %s.compiled", len(matcher), time.perf_counter() - started,
+                 args.dictionary)
+    for text in args.text:
+        print(json.dumps({"text": text, "skill_ids": matcher.find(text)}, ensure_ascii=False))
+    return 0
+
+
+def _stored_entries(paths):
+    # (record, sha256, file, text) for each ok record in extract output files
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("status") == "ok":
+                    yield entry["data"], entry.get("sha256"), entry.get("file"), ""
+
+
+def run_store_import(args):
+    started = time.perf_counter()
+    store = CandidateStore(args.db)
+    try:
+        count = store.add_many(_stored_entries(args.inputs))
+    finally:
+        store.close()
+    logging.info("Stored %d record(s) in %.1fs", count, time.perf_counter() - started)
+    return 0
+
+
+def run_search(args):
+    store = CandidateStore(args.db)
+    try:
+        query = " + ".join(args.query)
+        filters = store.parse_query(query)
+        logging.info("Query %r -> %s", query, filters)
+        for row in store.search(limit=args.limit, **filters):
+            print(json.dumps(row, ensure_ascii=False))
+    finally:
+        store.close()
+    return 0
+
+
+def run_serve(args):
+    configure(enabled=True)  # /metrics serves the stage histograms
+    warmup(llm=args.rules != "only")
+    cache = ResultCache(directory=args.cache_dir)
+    store = CandidateStore(args.store, batch_size=1) if args.store else None
+    dedupe = NearDuplicateIndex(args.dedupe) if args.dedupe else None
+    response_cache = LLMResponseCache(args.llm_cache, mode=args.llm_cache_mode) if args.llm_cache else None
+    service = ExtractionService(cpu_workers=args.cpu_workers, llm_workers=args.llm_workers,
+                                queue_size=args.queue_size, cache=cache, store=store, dedupe=dedupe,
+                                model=args.model, rules_mode=args.rules, stream=not args.no_stream,
+                                chunked=args.chunked,
+                                api_key=args.api_key, max_in_flight=args.llm_workers, requests_per_second=args.rps,
+                                response_cache=response_cache, endpoints=args.endpoints, hedge=not args.no_hedge)
+    try:
+        serve(service, host=args.host, port=args.port)
+    finally:
+        if store is not None:
+            store.close()
+        if dedupe is not None:
+            dedupe.close()
+        if response_cache is not None:
+            _log_llm_cache(response_cache)
+            response_cache.close()
+    return 0
+
+
+def run_warmup(args):
+    try:
+        report = warmup(ocr=not args.no_ocr, llm=not args.no_llm, strict=True)
+    except RuntimeError as e:
+        logging.error("%s", e)
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="resume_extractor", description="Resume extraction tools")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress to stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    extract = commands.add_parser("extract", help="parse resumes into JSON lines")
+    extract.add_argument("inputs", nargs="+", help="files, directories or glob patterns of PDF/DOCX resumes")
+    extract.add_argument("-o", "--output", help="JSONL file to write (default: stdout)")
+    extract.add_argument("-j", "--workers", type=int, default=4, help="text extraction/OCR threads (default: 4)")
+    extract.add_argument("--llm-concurrency", type=int, default=LLM_MAX_IN_FLIGHT,
+                         help=f"LLM requests in flight (default: {LLM_MAX_IN_FLIGHT})")
+    extract.add_argument("--rps", type=float, default=LLM_REQUESTS_PER_SECOND,
+                         help=f"LLM requests started per second, 0 for no limit (default: {LLM_REQUESTS_PER_SECOND:g})")
+    extract.add_argument("--resume", action="store_true",
+                         help="append to --output and skip files it already holds a successful record for")
+    extract.add_argument("--stream", action="store_true",
+                         help="stream replies and stop reading once the JSON object is complete")
+    extract.add_argument("--rules", choices=["off", "hybrid", "only"], default=RULES_MODE,
+                         help="rule-based extraction: off, hybrid (rules fill confident fields) "
+                              f"or only (no LLM call) (default: {RULES_MODE})")
+    extract.add_argument("--chunked", choices=["off", "auto", "on"], default=CHUNKED_EXTRACTION,
+                         help="send one prompt per resume section concurrently: off, auto (long resumes only) "
+                              f"or on (default: {CHUNKED_EXTRACTION})")
+    extract.add_argument("--cache-dir", default=RESULT_CACHE_DIR or None, help="on-disk result cache directory")
+    extract.add_argument("--model", default=MODEL, help=f"model name (default: {MODEL})")
+    extract.add_argument("--api-key", help="API key (default: $API_KEY)")
+    extract.add_argument("--store", metavar="DB", default=STORE_PATH or None,
+                         help="also write records (with resume text) to this SQLite candidate store")
+    extract.add_argument("--dedupe", metavar="DB", default=DEDUPE_INDEX_PATH or None,
+                         help="near-duplicate index; resumes similar to an earlier one reuse its record")
+    extract.add_argument("--dedupe-threshold", type=float, default=DEDUPE_THRESHOLD,
+                         help=f"estimated Jaccard similarity counted as a duplicate (default: {DEDUPE_THRESHOLD})")
+    extract.add_argument("--endpoints", metavar="JSON", default=LLM_ENDPOINTS or None,
+                         help="route LLM calls across these endpoints: a JSON list of "
+                              '{"model", "base_url", "api_key_env", "cost"} objects, or a file holding one')
+    extract.add_argument("--no-hedge", action="store_true", default=not ROUTER_HEDGE,
+                         help="with --endpoints, fail over but never send hedged requests")
+    extract.add_argument("--llm-cache", metavar="DB", default=LLM_CACHE_PATH or None,
+                         help="persistent cache of raw LLM replies keyed by model, temperature and prompt")
+    extract.add_argument("--llm-cache-mode", choices=LLM_CACHE_MODES, default=LLM_CACHE_MODE,
+                         help="cache (reuse, call on a miss), record (always call and store) or replay "
+                              f"(no network calls; a miss fails the file) (default: {LLM_CACHE_MODE})")
+    extract.add_argument("--metrics", metavar="PATH", help="write per-stage histograms here in Prometheus text format")
+    extract.add_argument("--trace", metavar="PATH", help="append one JSON trace of stage spans per resume to this file")
+    extract.set_defaults(func=run_extract)
+
+    postprocess = commands.add_parser("postprocess",
+                                      help="re-run post-processing over stored records (e.g. a backfill)")
+    postprocess.add_argument("input", help="JSONL of extract output or of bare records")
+    postprocess.add_argument("-o", "--output", help="JSONL file to write (default: stdout)")
+    postprocess.set_defaults(func=run_postprocess)
+
+    store_import = commands.add_parser("store-import", help="load extract output into a candidate store")
+    store_import.add_argument("inputs", nargs="+", help="JSONL files written by extract")
+    store_import.add_argument("--db", default=STORE_PATH or None, required=not STORE_PATH,
+                              help="SQLite candidate store (default: $STORE_PATH)")
+    store_import.set_defaults(func=run_store_import)
+
+    search = commands.add_parser("search", help='search a candidate store, e.g. "Python + 3-5 years + Pune"')
+    search.add_argument("query", nargs="+", help="terms separated by + or commas; several arguments are joined with +")
+    search.add_argument("--db", default=STORE_PATH or None, required=not STORE_PATH,
+                        help="SQLite candidate store (default: $STORE_PATH)")
+    search.add_argument("-n", "--limit", type=int, default=20, help="maximum results (default: 20)")
+    search.set_defaults(func=run_search)
+
+    service = commands.add_parser("serve", help="run the extraction HTTP service (job queue and worker pools)")
+    service.add_argument("--host", default=SERVICE_HOST, help=f"address to listen on (default: {SERVICE_HOST})")
+    service.add_argument("--port", type=int, default=SERVICE_PORT, help=f"port (default: {SERVICE_PORT})")
+    service.add_argument("--cpu-workers", type=int, default=SERVICE_CPU_WORKERS,
+                         help="text extraction/OCR threads; OCR runs in parallel, but PDF/DOCX parsing holds "
+                              f"the GIL, so run more processes to scale it (default: {SERVICE_CPU_WORKERS})")
+    service.add_argument("--llm-workers", type=int, default=SERVICE_LLM_WORKERS,
+                         help=f"LLM requests in flight (default: {SERVICE_LLM_WORKERS})")
+    service.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE,
+                         help=f"jobs waiting per queue before uploads get 429 (default: {SERVICE_QUEUE_SIZE})")
+    service.add_argument("--rps", type=float, default=LLM_REQUESTS_PER_SECOND,
+                         help=f"LLM requests started per second, 0 for no limit (default: {LLM_REQUESTS_PER_SECOND:g})")
+    service.add_argument("--no-stream", action="store_true", help="do not stream replies (no partial results)")
+    service.add_argument("--rules", choices=["off", "hybrid", "only"], default=RULES_MODE,
+                         help=f"rule-based extraction mode (default: {RULES_MODE})")
+    service.add_argument("--chunked", choices=["off", "auto", "on"], default=CHUNKED_EXTRACTION,
+                         help=f"section-chunked extraction mode (default: {CHUNKED_EXTRACTION})")
+    service.add_argument("--cache-dir", default=RESULT_CACHE_DIR or None, help="on-disk result cache directory")
+    service.add_argument("--model", default=MODEL, help=f"model name (default: {MODEL})")
+    service.add_argument("--api-key", help="API key (default: $API_KEY)")
+    service.add_argument("--store", metavar="DB", default=STORE_PATH or None,
+                         help="also write records to this SQLite candidate store")
+    service.add_argument("--dedupe", metavar="DB", default=DEDUPE_INDEX_PATH or None,
+                         help="near-duplicate index; resumes similar to an earlier one reuse its record")
+    service.add_argument("--endpoints", metavar="JSON", default=LLM_ENDPOINTS or None,
+                         help="route LLM calls across these endpoints (JSON list or file)")
+    service.add_argument("--no-hedge", action="store_true", default=not ROUTER_HEDGE,
+                         help="with --endpoints, fail over but never send hedged requests")
+    service.add_argument("--llm-cache", metavar="DB", default=LLM_CACHE_PATH or None,
+                         help="persistent cache of raw LLM replies")
+    service.add_argument("--llm-cache-mode", choices=LLM_CACHE_MODES, default=LLM_CACHE_MODE,
+                         help=f"LLM cache mode: cache, record or replay (default: {LLM_CACHE_MODE})")
+    service.set_defaults(func=run_serve)
+
+    warm = commands.add_parser("warmup", help="preload dependencies and check Tesseract language packs")
+    warm.add_argument("--no-ocr", action="store_true", help="skip OCR dependencies and the Tesseract check")
+    warm.add_argument("--no-llm", action="store_true", help="skip the LLM client dependencies")
+    warm.set_defaults(func=run_warmup)
+
+    skills = commands.add_parser("compile-skills", help="compile a skills dictionary and cache it beside the file")
+    skills.add_argument("dictionary", help="JSON or CSV skills/synonyms dictionary")
+    skills.add_argument("text", nargs="*", help="sample text to match against the compiled dictionary")
+    skills.set_defaults(func=run_compile_skills)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(message)s")
+    if getattr(args, "resume", False) and not args.output:
+        build_parser().error("--resume needs --output")
+    return args.func(args)
@@ -0,0 +1,168 @@
+"""Shrinking resume text before it is embedded in the prompt."""
+import logging
+import re
+import unicodedata
+from collections import Counter
+
+from .config import PROMPT_TOKEN_BUDGET
+from .metrics import traced
+
+log = logging.getLogger(__name__)
+
+# Headings we recognise, mapped to a section name, in the order they are tried
+SECTION_HEADINGS = [
+    ("experience", r"(work|professional|employment|job)?\s*(experience|history)|employment|career\s+history|work\s+profile"),
+    ("education", r"(education(al)?|academic)\s*(qualifications?|details|background|profile)?|qualifications?"),
+    ("skills", r"(technical|key|core|it|computer|professional)?\s*(skills?|skill\s*set|competenc(y|ies)|expertise|proficiency)"),
+    ("projects", r"(academic|key)?\s*projects?"),
+    ("certifications", r"certifications?|trainings?|courses?|achievements?|awards?"),
+    ("summary", r"(professional|career)?\s*(summary|profile|objective)|about\s+me"),
+    ("personal", r"personal\s*(details|information|profile|data)|contact(\s+details)?"),
+    ("languages", r"languages?(\s+known)?"),
+    ("hobbies", r"hobbies|interests|extra[\s-]*curricular(\s+activities)?"),
+    ("declaration", r"declaration|references?"),
+]
+_HEADING_RES = [(name, re.compile(rf"^\W*(?:{pattern})\W*$", re.IGNORECASE)) for name, pattern in SECTION_HEADINGS]
+
+# Sections dropped first when over budget; the rest are trimmed, never dropped
+DROP_ORDER = ["declaration", "hobbies", "languages", "summary", "certifications", "projects"]
+KEEP_SECTIONS = {"header", "experience", "education", "skills", "personal"}
+
+OCR_MARKER_RE = re.compile(r"^(Page \d+ )?Image \d+ Text:")
+PAGE_NUMBER_RE = re.compile(r"^\W*(page\s*)?\d{1,3}(\s*(/|of)\s*\d{1,3})?\W*$", re.IGNORECASE)
+SPACES_RE = re.compile(r"[ \t\u00a0]+")
+
+# Only lines at least this long are dropped as duplicates; short labels such
+# as "Responsibilities:" legitimately repeat under every job
+MIN_DUPLICATE_LEN = 25
+
+
+def estimate_tokens(text):
+    """Rough token count: about four UTF-8 bytes per token.
+
+    Counting bytes rather than characters keeps Devanagari (three bytes per
+    character) from being badly underestimated.
+    """
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+def section_of(line):
+    """Return the section name if `line` is a section heading, else None."""
+    if len(line) > 40:
+        return None
+    for name, heading_re in _HEADING_RES:
+        if heading_re.match(line):
+            return name
+    return None
+
+
+def split_sections(text):
+    """Split resume text into [(section, lines)] in document order.
+
+    Lines before the first recognised heading (usually name and contact
+    details) form the "header" section; OCR output appended after the text
+    layer forms an "ocr" section.
+    """
+    sections = [("header", [])]
+    for line in text.split("\n"):
+        name = "ocr" if OCR_MARKER_RE.match(line) and sections[-1][0] != "ocr" else section_of(line.strip())
+        if name:
+            sections.append((name, []))
+        sections[-1][1].append(line)
+    return [(name, lines) for name, lines in sections if lines]
+
+
+def is_ocr_noise(line):
+    """Heuristic for OCR garbage: fewer than half the characters are letters or digits.
+
+    Letters are counted by Unicode category, with combining marks included,
+    so Devanagari vowel signs count as part of their word.
+    """
+    if OCR_MARKER_RE.match(line):
+        return False
+    stripped = line.replace(" ", "")
+    if not stripped:
+        return False
+    wordlike = sum(unicodedata.category(ch)[0] in "LMN" for ch in stripped)
+    return wordlike / len(stripped) < 0.5
+
+
+def repeated_page_lines(pages):
+    """Lines found at the top or bottom of at least half the pages (min. two)."""
+    if len(pages) < 2:
+        return set()
+    counts = Counter()
+    for page in pages:
+        lines = [SPACES_RE.sub(" ", l).strip() for l in page.split("\n") if l.strip()]
+        counts.update(set(lines[:2] + lines[-2:]))
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {line for line, n in counts.items() if n >= threshold}
+
+
+def _fit_budget(sections, budget, stats):
+    total = sum(estimate_tokens("\n".join(lines)) for _, lines in sections)
+    for name in DROP_ORDER:
+        if total <= budget:
+            return sections
+        for section in [s for s in sections if s[0] == name]:
+            total -= estimate_tokens("\n".join(section[1]))
+            sections.remove(section)
+            stats["sections_dropped"].append(name)
+
+    # Still too long: trim the tails of the longest sections, keeping headings. When the
+    # resume starts with OCR output it had no text layer, so the OCR text is kept like the rest
+    keep = KEEP_SECTIONS | {"ocr"} if sections and sections[0][0] == "ocr" else KEEP_SECTIONS
+    while total > budget:
+        trimmable = [s for s in sections if len(s[1]) > 1]
+        if not trimmable:
+            break
+        name, lines = max(trimmable, key=lambda s: (s[0] not in keep, len(s[1])))
+        total -= estimate_tokens(lines.pop()) + 1
+        stats["truncated"] = True
+    return sections
+
+
+@traced("compact")
+def compact_text(text, pages=None, budget=PROMPT_TOKEN_BUDGET):
+    """Normalise and shrink `text` to fit `budget` tokens.
+
+    `pages` is the per-page text layer from `load_document`; when given,
+    lines repeated at the top or bottom of the pages are treated as running
+    headers/footers and dropped. Returns (compacted_text, stats) where stats
+    holds the before/after token estimates and what was removed.
+    """
+    stats = {
+        "tokens_before": estimate_tokens(text),
+        "lines_dropped": 0,
+        "sections_dropped": [],
+        "truncated": False,
+    }
+    running = repeated_page_lines(pages or [])
+    seen = set()
+    kept = []
+    in_ocr = False
+    for raw in text.split("\n"):
+        line = SPACES_RE.sub(" ", raw).strip()
+        if OCR_MARKER_RE.match(line):
+            in_ocr = True
+        if not line:
+            if kept and kept[-1]:
+                kept.append("")
+            continue
+        key = line.lower()
+        if (line in running or PAGE_NUMBER_RE.match(line)
+                or (len(line) >= MIN_DUPLICATE_LEN and key in seen)
+                or (in_ocr and is_ocr_noise(line))):
+            stats["lines_dropped"] += 1
+            continue
+        seen.add(key)
+        kept.append(line)
+
+    compacted = "\n".join(kept).strip()
+    if budget and estimate_tokens(compacted) > budget:
+        sections = _fit_budget(split_sections(compacted), budget, stats)
+        compacted = "\n".join("\n".join(lines) for _, lines in sections).strip()
+
+    stats["tokens_after"] = estimate_tokens(compacted)
+    log.info("Compacted resume text from %d to %d tokens", stats["tokens_before"], stats["tokens_after"])
+    return compacted, stats
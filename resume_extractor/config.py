@@ -0,0 +1,121 @@
+"""Runtime settings, read from the environment so the UI and batch jobs share them."""
+import os
+
+# OCR settings
+OCR_LANG = os.environ.get("OCR_LANG", "eng+hin")
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", os.cpu_count() or 1))
+OCR_IMAGE_TIMEOUT = float(os.environ.get("OCR_IMAGE_TIMEOUT", 30))
+OCR_TOTAL_TIMEOUT = float(os.environ.get("OCR_TOTAL_TIMEOUT", 120))
+# OpenMP threads per tesseract process, passed to tesseract as OMP_THREAD_LIMIT;
+# each OCR worker already runs its own tesseract, so more would oversubscribe
+OCR_THREADS = int(os.environ.get("OCR_THREADS", 1))
+# A page's images are OCR'd only if its text layer is shorter than this many
+# characters, or an image covers at least this share of the page
+OCR_PAGE_MIN_CHARS = int(os.environ.get("OCR_PAGE_MIN_CHARS", 100))
+OCR_MIN_COVERAGE = float(os.environ.get("OCR_MIN_COVERAGE", 0.5))
+# SQLite file caching OCR text by image hash; empty disables the cache
+OCR_CACHE_PATH = os.environ.get("OCR_CACHE_PATH", "")
+
+# Upload limits, so one pathological file cannot exhaust a shared worker:
+# larger files are refused; pages past MAX_PAGES, images over
+# MAX_IMAGE_PIXELS and images past MAX_IMAGE_BYTES (per document) are skipped
+MAX_FILE_BYTES = int(os.environ.get("MAX_FILE_MB", 25)) * 1024 * 1024
+MAX_PAGES = int(os.environ.get("MAX_PAGES", 60))
+MAX_IMAGE_PIXELS = int(os.environ.get("MAX_IMAGE_PIXELS", 40_000_000))
+MAX_IMAGE_BYTES = int(os.environ.get("MAX_IMAGE_MB", 64)) * 1024 * 1024
+
+# Model settings; bump PROMPT_VERSION whenever the prompt or post-processing changes
+LLM_BASE_URL = os.environ.get("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+MODEL = os.environ.get("LLM_MODEL", "qwen/qwen-2.5-72b-instruct:free")
+TEMPERATURE = 0.05
+PROMPT_VERSION = "3"
+
+# Result cache settings; the disk tier is enabled by setting RESULT_CACHE_DIR
+RESULT_CACHE_ENTRIES = int(os.environ.get("RESULT_CACHE_ENTRIES", 256))
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", "")
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Async LLM client limits
+LLM_MAX_IN_FLIGHT = int(os.environ.get("LLM_MAX_IN_FLIGHT", 4))
+LLM_REQUESTS_PER_SECOND = float(os.environ.get("LLM_REQUESTS_PER_SECOND", 1))
+LLM_BURST = int(os.environ.get("LLM_BURST", 4))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 5))
+LLM_BACKOFF_BASE = float(os.environ.get("LLM_BACKOFF_BASE", 1))
+LLM_BACKOFF_MAX = float(os.environ.get("LLM_BACKOFF_MAX", 30))
+LLM_DEADLINE = float(os.environ.get("LLM_DEADLINE", 120))
+
+# Prompt compaction: resume text is cut down to roughly this many tokens
+PROMPT_COMPACTION = os.environ.get("PROMPT_COMPACTION", "1") != "0"
+PROMPT_TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", 6000))
+
+# Rule-based pre-extraction: "off", "hybrid" (rules fill confident fields and
+# the LLM is not asked for them) or "only" (no LLM call at all)
+RULES_MODE = os.environ.get("RULES_MODE", "hybrid")
+RULES_MIN_CONFIDENCE = float(os.environ.get("RULES_MIN_CONFIDENCE", 0.9))
+
+# Per-stage tracing (see metrics.py): off unless METRICS_ENABLED=1 or a
+# JSONL trace file is given
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "0") == "1"
+TRACE_FILE = os.environ.get("TRACE_FILE", "")
+
+# Entries kept in each memo table of postprocess.py (normalised dates, durations)
+DATE_CACHE_SIZE = int(os.environ.get("DATE_CACHE_SIZE", 65536))
+
+# Skills/synonyms dictionary (JSON or CSV, see skills.py) for canonical skill
+# IDs; empty leaves skills as refine_skills cleans them
+SKILLS_DICTIONARY = os.environ.get("SKILLS_DICTIONARY", "")
+
+# SQLite candidate store (see store.py); empty disables it. Rows are written
+# in transactions of STORE_BATCH_SIZE
+STORE_PATH = os.environ.get("STORE_PATH", "")
+STORE_BATCH_SIZE = int(os.environ.get("STORE_BATCH_SIZE", 500))
+
+# Near-duplicate detection (see dedupe.py): SQLite index path, empty disables
+# it. Resumes at least DEDUPE_THRESHOLD similar to an earlier one reuse its
+# record; with DEDUPE_RECHECK_CONTACT the contact fields are re-read by rules
+DEDUPE_INDEX_PATH = os.environ.get("DEDUPE_INDEX_PATH", "")
+DEDUPE_THRESHOLD = float(os.environ.get("DEDUPE_THRESHOLD", 0.9))
+DEDUPE_NUM_PERM = int(os.environ.get("DEDUPE_NUM_PERM", 128))
+DEDUPE_BANDS = int(os.environ.get("DEDUPE_BANDS", 16))
+DEDUPE_RECHECK_CONTACT = os.environ.get("DEDUPE_RECHECK_CONTACT", "1") != "0"
+
+# Extraction HTTP service (see service.py). CPU workers run loading, text
+# extraction and OCR; LLM workers make the model calls. At most
+# SERVICE_QUEUE_SIZE jobs wait in each queue before uploads get HTTP 429.
+# Finished jobs are kept for SERVICE_JOB_TTL seconds. The Streamlit app
+# talks to the service at SERVICE_URL.
+SERVICE_HOST = os.environ.get("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("SERVICE_PORT", 8765))
+SERVICE_URL = os.environ.get("SERVICE_URL", f"http://{SERVICE_HOST}:{SERVICE_PORT}")
+SERVICE_CPU_WORKERS = int(os.environ.get("SERVICE_CPU_WORKERS", os.cpu_count() or 1))
+SERVICE_LLM_WORKERS = int(os.environ.get("SERVICE_LLM_WORKERS", LLM_MAX_IN_FLIGHT))
+SERVICE_QUEUE_SIZE = int(os.environ.get("SERVICE_QUEUE_SIZE", 32))
+SERVICE_MAX_UPLOAD_BYTES = int(os.environ.get("SERVICE_MAX_UPLOAD_MB", 20)) * 1024 * 1024
+SERVICE_JOB_TTL = float(os.environ.get("SERVICE_JOB_TTL", 3600))
+
+# Section-chunked extraction (see chunked.py): "off", "auto" (resumes of at
+# least CHUNKED_MIN_TOKENS estimated tokens) or "on". Section prompts run
+# concurrently and their replies are merged into the full schema
+CHUNKED_EXTRACTION = os.environ.get("CHUNKED_EXTRACTION", "off")
+CHUNKED_MIN_TOKENS = int(os.environ.get("CHUNKED_MIN_TOKENS", 1500))
+
+# Persistent LLM reply cache (see llm_cache.py): SQLite path, empty disables
+# it. LLM_CACHE_MODE is "cache", "record" or "replay" (no network calls).
+# Entries expire after LLM_CACHE_TTL seconds (0 never) and the least recently
+# used are evicted past LLM_CACHE_MAX_MB of compressed replies
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "")
+LLM_CACHE_MODE = os.environ.get("LLM_CACHE_MODE", "cache")
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", 90 * 24 * 3600))
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_MB", 1024)) * 1024 * 1024
+
+# Multi-model routing (see router.py): LLM_ENDPOINTS is a JSON list of
+# {"model", "base_url", "api_key_env", "cost"} objects, or the path of a file
+# holding one; empty sends every request to LLM_MODEL. Latency and errors are
+# tracked over each endpoint's last ROUTER_WINDOW calls. A request still
+# running after its endpoint's p95 latency (ROUTER_HEDGE_DELAY until
+# ROUTER_MIN_SAMPLES calls are seen) is hedged to the next endpoint
+LLM_ENDPOINTS = os.environ.get("LLM_ENDPOINTS", "")
+ROUTER_WINDOW = int(os.environ.get("ROUTER_WINDOW", 200))
+ROUTER_MIN_SAMPLES = int(os.environ.get("ROUTER_MIN_SAMPLES", 20))
+ROUTER_HEDGE_DELAY = float(os.environ.get("ROUTER_HEDGE_DELAY", 10))
+ROUTER_HEDGE = os.environ.get("ROUTER_HEDGE", "1") != "0"
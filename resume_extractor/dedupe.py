@@ -0,0 +1,181 @@
+"""Near-duplicate resume detection with MinHash signatures and LSH banding.
+
+The same candidate often arrives through several portals as slightly
+different exports of one resume. Each resume's extracted text is reduced to
+a MinHash signature over word 3-shingles, computed with one-permutation
+hashing (each shingle hashed once into one of `num_perm` bins, empty bins
+filled by rotation) so it costs a single hash per shingle rather than one
+per permutation. Signatures are split into bands, and resumes sharing any
+band bucket are compared in full. A resume whose
+estimated Jaccard similarity to an earlier one reaches the threshold reuses
+that resume's parsed record instead of another LLM call.
+"""
+import array
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from .config import DEDUPE_INDEX_PATH, DEDUPE_THRESHOLD, DEDUPE_NUM_PERM, DEDUPE_BANDS
+
+SHINGLE_SIZE = 3
+
+OCR_LABEL_RE = re.compile(r"(?:page \d+ )?image \d+ text:")
+WORD_RE = re.compile(r"\w+")
+
+# Best-match similarities are counted in these buckets to help tune the threshold
+SIMILARITY_BUCKETS = (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 1.0)
+
+
+def shingles(text):
+    """Hashes of the word 3-shingles of `text`, ignoring case, spacing and OCR labels."""
+    words = WORD_RE.findall(OCR_LABEL_RE.sub(" ", text.lower()))
+    if len(words) < SHINGLE_SIZE:
+        grams = words
+    else:
+        grams = (" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+    return {int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), "little") for g in grams}
+
+
+def minhash(text, num_perm=DEDUPE_NUM_PERM):
+    """MinHash signature of `text` as a list of `num_perm` ints, or None for empty text."""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    signature = [None] * num_perm
+    for h in hashes:
+        bin_, value = h % num_perm, h // num_perm
+        if signature[bin_] is None or value < signature[bin_]:
+            signature[bin_] = value
+    # Rotation densification: an empty bin borrows the next filled bin's value,
+    # offset by the distance so borrowed values never collide with real ones
+    offset = (1 << 64) // num_perm + 1
+    filled = [i for i, v in enumerate(signature) if v is not None]
+    for i, v in enumerate(signature):
+        if v is None:
+            j = next((k for k in filled if k > i), filled[0] + num_perm)
+            signature[i] = signature[j % num_perm] + (j - i) * offset
+    return signature
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """MinHash signatures and parsed records of earlier resumes, in SQLite.
+
+    `path` of None keeps the index in memory for the life of the process.
+    Safe to share between threads. `stats()` reports lookups, hits and the
+    distribution of best-match similarities.
+    """
+
+    def __init__(self, path=None, threshold=DEDUPE_THRESHOLD, num_perm=DEDUPE_NUM_PERM, bands=DEDUPE_BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self._rows = num_perm // bands
+        self._conn = sqlite3.connect(path or ":memory:", timeout=30, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "hits": 0, "contact_updates": 0,
+                       "best_similarity": {str(b): 0 for b in SIMILARITY_BUCKETS}}
+        with self._lock:
+            if path:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " doc_id TEXT PRIMARY KEY, num_perm INTEGER NOT NULL, signature BLOB NOT NULL,"
+                " record TEXT NOT NULL, added_at REAL NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS lsh (band INTEGER NOT NULL, bucket INTEGER NOT NULL, doc_id TEXT NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS lsh_bucket ON lsh (band, bucket);"
+            )
+
+    def signature(self, text):
+        return minhash(text, self.num_perm)
+
+    def _buckets(self, signature):
+        rows = self._rows
+        for band in range(self.bands):
+            chunk = array.array("Q", signature[band * rows:(band + 1) * rows]).tobytes()
+            yield band, int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True)
+
+    def find(self, signature):
+        """(doc_id, similarity, record) of the most similar earlier resume at or above the threshold, or None."""
+        buckets = list(self._buckets(signature))
+        with self._lock:
+            self._stats["lookups"] += 1
+            rows = self._conn.execute(
+                "SELECT DISTINCT d.doc_id, d.signature, d.record FROM lsh l JOIN documents d ON d.doc_id = l.doc_id"
+                f" WHERE d.num_perm = ? AND (l.band, l.bucket) IN (VALUES {', '.join(['(?, ?)'] * len(buckets))})",
+                [self.num_perm, *(v for pair in buckets for v in pair)],
+            ).fetchall()
+            best = None
+            for doc_id, blob, record in rows:
+                score = similarity(signature, array.array("Q", blob))
+                if best is None or score > best[1]:
+                    best = (doc_id, score, record)
+            score = best[1] if best is not None else 0.0  # no shared bucket counts as dissimilar
+            for bound in SIMILARITY_BUCKETS:
+                if score <= bound:
+                    self._stats["best_similarity"][str(bound)] += 1
+                    break
+            if best is None or best[1] < self.threshold:
+                return None
+            self._stats["hits"] += 1
+        return best[0], best[1], json.loads(best[2])
+
+    def add(self, doc_id, signature, record):
+        """Index `record`, the parsed result of the resume with this `signature`."""
+        blob = array.array("Q", signature).tobytes()
+        buckets = list(self._buckets(signature))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM lsh WHERE doc_id = ?", (doc_id,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents (doc_id, num_perm, signature, record, added_at) VALUES (?, ?, ?, ?, ?)",
+                    (doc_id, self.num_perm, blob, json.dumps(record, ensure_ascii=False), time.time()),
+                )
+                self._conn.executemany("INSERT INTO lsh (band, bucket, doc_id) VALUES (?, ?, ?)",
+                                       [(band, bucket, doc_id) for band, bucket in buckets])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def note_contact_update(self):
+        with self._lock:
+            self._stats["contact_updates"] += 1
+
+    def stats(self):
+        """Lookups, hits, hit rate and counts of best-match similarity per bucket (upper bounds)."""
+        with self._lock:
+            stats = json.loads(json.dumps(self._stats))
+        stats["hit_rate"] = round(stats["hits"] / stats["lookups"], 3) if stats["lookups"] else 0.0
+        stats["threshold"] = self.threshold
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_dedupe_index():
+    """The process-wide NearDuplicateIndex at DEDUPE_INDEX_PATH, or None if it is not set."""
+    global _default_index
+    if not DEDUPE_INDEX_PATH:
+        return None
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = NearDuplicateIndex(DEDUPE_INDEX_PATH)
+    return _default_index
@@ -0,0 +1,71 @@
+"""Turning a loaded document into resume text, falling back to OCR."""
+import io
+import logging
+
+from .config import OCR_PAGE_MIN_CHARS, OCR_MIN_COVERAGE
+from .loader import load_document
+from .metrics import span, traced
+from .ocr import ocr_images, get_ocr_cache
+
+log = logging.getLogger(__name__)
+
+
+def images_to_ocr(document):
+    """Pick the images worth OCR, deciding page by page.
+
+    An image is OCR'd when its page's text layer is thinner than
+    OCR_PAGE_MIN_CHARS (a scanned page) or it covers at least
+    OCR_MIN_COVERAGE of the page (a scan behind a sparse text layer). DOCX
+    files are one "page", and a DOCX image's coverage is measured against
+    the page size of the document's first section. Pages with a good text layer keep their logos and
+    photos out of OCR.
+    """
+    selected = []
+    for img in document["images"]:
+        if img["data"] is None:
+            continue
+        if img["page"]:
+            page_text = document["pages"][img["page"] - 1]
+        else:
+            page_text = "\n".join(document["pages"])
+        if len(page_text.strip()) < OCR_PAGE_MIN_CHARS or (img["coverage"] or 0) >= OCR_MIN_COVERAGE:
+            selected.append(img)
+    return selected
+
+
+@traced("extract_text")
+def extract_text(uploaded_file):
+    """Return (text, ocr_used) for an upload or a `load_document` result."""
+    ocr_used = False
+
+    # Step 1️⃣ — Read the upload once: text layer and real images together
+    document = uploaded_file if isinstance(uploaded_file, dict) else load_document(uploaded_file)
+
+    # Step 2️⃣ — Extract normal text, into one buffer rather than by repeated concatenation
+    buffer = io.StringIO()
+    for page_text in document["pages"]:
+        buffer.write("\n")
+        buffer.write(page_text)
+    text = buffer.getvalue().strip()
+
+    # Step 3️⃣ — OCR images on pages whose text layer is missing or thin
+    images = images_to_ocr(document)
+    if images:
+        ocr_used = True
+        log.info("Performing OCR on %d of %d image(s)", len(images), len(document["images"]))
+        ocr_buffer = io.StringIO()
+
+        with span("ocr", images=len(images)):
+            texts = ocr_images([img["data"] for img in images], cache=get_ocr_cache())
+        seen = set()
+        for img, text_from_img in zip(images, texts):
+            text_from_img = text_from_img.strip()
+            # The same logo or letterhead on every page only needs to appear once
+            if text_from_img and text_from_img not in seen:
+                seen.add(text_from_img)
+                label = f"Page {img['page']} Image {img['index']}" if img["page"] else f"Image {img['index']}"
+                ocr_buffer.write(f"\n{label} Text: {text_from_img}")
+
+        text += "\n" + ocr_buffer.getvalue().strip()
+
+    return text.strip(), ocr_used
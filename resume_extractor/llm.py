@@ -0,0 +1,61 @@
+"""OpenAI-compatible chat client used for the extraction call."""
+import os
+
+from .config import LLM_BASE_URL, MODEL, TEMPERATURE
+from .llm_cache import get_llm_cache
+from .metrics import span
+
+EXTRA_HEADERS = {
+    "HTTP-Referer": "<YOUR_SITE_URL>",  # Replace with your site URL
+    "X-Title": "<YOUR_SITE_NAME>",     # Replace with your site name
+}
+
+
+def make_client(api_key=None, base_url=LLM_BASE_URL):
+    """Build a client for OpenRouter (or any OpenAI-compatible endpoint).
+
+    Falls back to the API_KEY environment variable when no key is given.
+    """
+    from openai import OpenAI
+    api_key = api_key or os.environ.get("API_KEY")
+    if not api_key:
+        raise ValueError("API key is missing. Set API_KEY or pass api_key.")
+    return OpenAI(base_url=base_url, api_key=api_key)
+
+
+def record_usage(s, response):
+    """Copy the token counts the API reported (if any) onto span `s`."""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        s.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+
+
+def complete(client, prompt, model=MODEL, temperature=TEMPERATURE, response_cache=None):
+    """Send `prompt` as a single user message and return the reply text.
+
+    With an LLMResponseCache as `response_cache` (default: `get_llm_cache()`),
+    a stored reply is returned without calling the model.
+    """
+    if response_cache is None:
+        response_cache = get_llm_cache()
+    if response_cache is not None and response_cache.reads:
+        reply = response_cache.get(model, temperature, prompt)
+        if reply is not None:
+            return reply
+    with span("llm", model=model) as s:
+        completion = client.chat.completions.create(
+            extra_headers=EXTRA_HEADERS,
+            model=model,
+            temperature=temperature,
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        )
+        record_usage(s, completion)
+    reply = completion.choices[0].message.content
+    if response_cache is not None:
+        response_cache.put(model, temperature, prompt, reply)
+    return reply
@@ -0,0 +1,194 @@
+"""Persistent cache of raw LLM replies, with record and replay modes.
+
+Replies are keyed on (model, temperature, normalised prompt), so a resume
+re-processed after a post-processing change costs no API call: bumping
+PROMPT_VERSION invalidates the result cache, but the prompt, and hence this
+cache, is unchanged. Modes:
+
+- "cache": look up every prompt, call the model on a miss and store the reply
+- "record": always call the model and store (or overwrite) the reply
+- "replay": never call the model; a miss raises CacheMissError, so a run over
+  a recorded corpus makes no network calls and is deterministic
+
+Replies are zlib-compressed in SQLite. Entries older than `ttl` seconds are
+treated as misses (except in replay, which serves whatever was recorded), and
+the least recently used ones are evicted once the stored replies exceed
+`max_bytes`.
+"""
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from .config import LLM_CACHE_PATH, LLM_CACHE_MODE, LLM_CACHE_TTL, LLM_CACHE_MAX_BYTES
+from .metrics import span
+
+log = logging.getLogger(__name__)
+
+MODES = ("cache", "record", "replay")
+
+# The prompts embed today's date; masking it lets a reply recorded yesterday answer today's identical prompt
+_TODAY = re.compile(r"(The current date(?: for calculations)? is )\d{2}-\d{2}-\d{4}")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class CacheMissError(LookupError):
+    """Raised in replay mode when a prompt has no recorded reply."""
+
+
+def normalize_prompt(prompt):
+    """`prompt` with today's date masked and whitespace collapsed, as used in the cache key."""
+    return _WHITESPACE.sub(" ", _TODAY.sub(r"\1<today>", prompt)).strip()
+
+
+def response_cache_key(model, temperature, prompt):
+    """SHA-256 of the model, temperature and normalised prompt."""
+    h = hashlib.sha256(f"{model}\0{float(temperature)!r}\0".encode())
+    h.update(normalize_prompt(prompt).encode())
+    return h.hexdigest()
+
+
+class LLMResponseCache:
+    """Raw LLM replies stored in SQLite; see the module docstring for `mode`.
+
+    Safe to share between threads, and between processes through SQLite
+    locking. `ttl` of 0 keeps entries until they are evicted for space.
+    """
+
+    def __init__(self, path, mode=LLM_CACHE_MODE, ttl=LLM_CACHE_TTL, max_bytes=LLM_CACHE_MAX_BYTES):
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM cache mode {mode!r}; expected one of {', '.join(MODES)}")
+        self.path = path
+        self.mode = mode
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._writes = self._evictions = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT NOT NULL, temperature REAL NOT NULL,"
+                " response BLOB NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+            self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @property
+    def reads(self):
+        """Whether lookups are made (every mode but "record")."""
+        return self.mode != "record"
+
+    def get(self, model, temperature, prompt):
+        """The stored reply to `prompt`, or None (CacheMissError in replay mode)."""
+        key = response_cache_key(model, temperature, prompt)
+        now = time.time()
+        with span("llm_cache") as s, self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl and self.mode != "replay" and now - row[1] > self.ttl:
+                row = None
+            if row is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            s.set(hit=row is not None)
+        if row is None:
+            if self.mode == "replay":
+                raise CacheMissError(f"No recorded LLM reply for prompt {key[:12]} (model {model})")
+            return None
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, model, temperature, prompt, response):
+        """Store the raw reply to `prompt`; a no-op in replay mode."""
+        if self.mode == "replay" or response is None:
+            return
+        key = response_cache_key(model, temperature, prompt)
+        blob = zlib.compress(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, temperature, response, size, created_at, used_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, model, float(temperature), blob, len(blob), now, now),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._writes += 1
+            self._bytes += len(blob) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Caller holds the lock. Expired entries go first, then the least recently
+        # used, down to 90% of max_bytes so eviction does not run on every write
+        self._conn.execute("BEGIN")
+        try:
+            removed = 0
+            if self.ttl:
+                removed += self._conn.execute("DELETE FROM responses WHERE created_at < ?",
+                                              (time.time() - self.ttl,)).rowcount
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            target = int(self.max_bytes * 0.9)
+            if total > target:
+                doomed, freed = [], 0
+                for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY used_at"):
+                    if total - freed <= target:
+                        break
+                    doomed.append((key,))
+                    freed += size
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+                removed += len(doomed)
+                total -= freed
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._bytes = total
+        self._evictions += removed
+        log.info("LLM cache: evicted %d entr%s, %d bytes stored", removed, "y" if removed == 1 else "ies", total)
+
+    def stats(self):
+        """Hit, miss, write and eviction counts for this process, plus the entries and bytes stored."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self._hits + self._misses
+            return {
+                "mode": self.mode,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "writes": self._writes,
+                "evictions": self._evictions,
+                "entries": entries,
+                "bytes": self._bytes,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """The process-wide LLMResponseCache at LLM_CACHE_PATH, or None if it is not set."""
+    global _default_cache
+    if not LLM_CACHE_PATH:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache(LLM_CACHE_PATH)
+    return _default_cache
@@ -0,0 +1,173 @@
+"""Single-pass reading of PDF and DOCX uploads."""
+import io
+import logging
+
+from .config import MAX_FILE_BYTES, MAX_PAGES, MAX_IMAGE_PIXELS, MAX_IMAGE_BYTES
+from .metrics import traced
+
+log = logging.getLogger(__name__)
+
+
+def _upload_size(uploaded_file):
+    uploaded_file.seek(0, io.SEEK_END)
+    size = uploaded_file.tell()
+    uploaded_file.seek(0)
+    return size
+
+
+def iter_pdf_pages(uploaded_file, max_pages=MAX_PAGES, max_image_pixels=MAX_IMAGE_PIXELS,
+                   max_image_bytes=MAX_IMAGE_BYTES):
+    """Yield one dict per PDF page: number, text, real images and warnings.
+
+    Each page's parsed layout objects are freed before the next page is
+    read, so memory stays bounded by one page however long the file is.
+    Images over `max_image_pixels` are skipped before they are decoded, and
+    no more image bytes are kept once `max_image_bytes` have been across the
+    document. After `max_pages` pages a last entry with "truncated" set and
+    only a warning is yielded.
+    """
+    import pdfplumber
+    budget = max_image_bytes
+    with pdfplumber.open(uploaded_file) as pdf:
+        total = len(pdf.pages)
+        for i, page in enumerate(pdf.pages):
+            if i >= max_pages:
+                yield {"number": i + 1, "text": "", "images": [], "truncated": True,
+                       "warnings": [f"Only the first {max_pages} of {total} pages were read"]}
+                return
+            try:
+                result = _read_page(page, i + 1, max_image_pixels, budget)
+            finally:
+                page.close()
+            budget -= sum(len(img["data"]) for img in result["images"] if img["data"] is not None)
+            yield result
+
+
+def _read_page(page, number, max_image_pixels, max_image_bytes):
+    result = {"number": number, "text": (page.extract_text() or "").strip(), "images": [], "warnings": []}
+    page_area = float(page.width * page.height) or 1.0
+    for j, img in enumerate(page.images):
+        # Filter small or layout elements
+        if not (img["width"] > 100 and img["height"] > 100):
+            continue
+        src_width, src_height = img.get("srcsize") or (0, 0)
+        data = None
+        if src_width * src_height > max_image_pixels:
+            result["warnings"].append(
+                f"Image {number}-{j + 1} skipped: {src_width}x{src_height} pixels is over the limit"
+            )
+        else:
+            try:
+                data = img["stream"].get_data()
+            except Exception as e:
+                log.warning("Could not read image %d-%d: %s", number, j + 1, e)
+            if data is not None and len(data) > max_image_bytes:
+                result["warnings"].append(f"Image {number}-{j + 1} skipped: image byte limit reached")
+                data = None
+        if data is not None:
+            max_image_bytes -= len(data)
+        result["images"].append({
+            "page": number,
+            "index": j + 1,
+            "width": img["width"],
+            "height": img["height"],
+            # Share of the page the image covers, as placed
+            "coverage": min(1.0, float(img["width"] * img["height"]) / page_area),
+            "data": data,
+        })
+    return result
+
+
+def _image_pixels(data):
+    # Reads the header only; the image is not decoded
+    from PIL import Image
+    try:
+        with Image.open(io.BytesIO(data)) as im:
+            return im.width * im.height
+    except Exception:
+        return 0
+
+
+@traced("load")
+def load_document(uploaded_file, max_file_bytes=MAX_FILE_BYTES, max_pages=MAX_PAGES,
+                  max_image_pixels=MAX_IMAGE_PIXELS, max_image_bytes=MAX_IMAGE_BYTES):
+    """Open the upload once and collect its text layer and real images.
+
+    Returns a dict with the file extension, the text of each page, metadata
+    plus raw bytes for every image large enough to be worth OCR, and any
+    warnings raised while reading the file. PDFs are read a page at a time
+    (see `iter_pdf_pages`). Files over `max_file_bytes` raise ValueError;
+    pages, image pixels and image bytes past their limits are left out
+    with a warning.
+    """
+    ext = uploaded_file.name.lower().split('.')[-1]
+    document = {"ext": ext, "pages": [], "images": [], "warnings": []}
+
+    size = _upload_size(uploaded_file)
+    if size > max_file_bytes:
+        raise ValueError(f"File is {size / 2**20:.1f} MB; the limit is {max_file_bytes / 2**20:.1f} MB")
+
+    if ext == "pdf":
+        try:
+            for page in iter_pdf_pages(uploaded_file, max_pages, max_image_pixels, max_image_bytes):
+                document["warnings"].extend(page["warnings"])
+                if not page.get("truncated"):
+                    document["pages"].append(page["text"])
+                    document["images"].extend(page["images"])
+        except Exception as e:
+            document["warnings"].append(f"PDF text extraction failed: {e}")
+
+    elif ext == "docx":
+        try:
+            from docx import Document
+            doc = Document(uploaded_file)
+            document["pages"].append("\n".join(para.text for para in doc.paragraphs))
+            budget = max_image_bytes
+            page_area = _docx_page_area(doc)
+            for j, shape in enumerate(doc.inline_shapes):
+                try:
+                    width_cm = shape.width / 360000
+                    height_cm = shape.height / 360000
+                except Exception:
+                    continue
+                if width_cm > 2 or height_cm > 2:
+                    try:
+                        img_rel = shape._inline.graphic.graphicData.pic.blipFill.blip.embed
+                        data = doc.part.related_parts[img_rel].blob
+                    except Exception as e:
+                        log.warning("Could not read DOCX image %d: %s", j + 1, e)
+                        data = None
+                    if data is not None and (len(data) > budget or _image_pixels(data) > max_image_pixels):
+                        document["warnings"].append(f"Image {j + 1} skipped: over the image size limits")
+                        data = None
+                    if data is not None:
+                        budget -= len(data)
+                    document["images"].append({
+                        "page": None,
+                        "index": j + 1,
+                        "width": shape.width,
+                        "height": shape.height,
+                        "coverage": min(1.0, float(shape.width * shape.height) / page_area),
+                        "data": data,
+                    })
+        except Exception as e:
+            document["warnings"].append(f"DOCX text extraction failed: {e}")
+
+    uploaded_file.seek(0)
+    return document
+
+
+def _docx_page_area(doc):
+    # Page area in EMU from the first section's pgSz, US Letter if it is not set
+    section = doc.sections[0] if len(doc.sections) else None
+    width = section.page_width if section is not None and section.page_width else 7772400
+    height = section.page_height if section is not None and section.page_height else 10058400
+    return float(width * height)
+
+
+@traced("count_images")
+def count_real_images(document):
+    """Return number of real images (ignoring small decorative ones)."""
+    if not isinstance(document, dict):
+        document = load_document(document)
+    return len(document["images"])
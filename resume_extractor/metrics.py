@@ -0,0 +1,218 @@
+"""Per-request tracing of pipeline stages, with histogram and JSONL export.
+
+Stages are wrapped in spans (``with span("ocr_image"): ...`` or the
+``@traced("load")`` decorator). While tracing is disabled, the default, a
+span is a shared no-op object, so instrumented code pays for one function
+call and one attribute check. When enabled, every finished span updates a
+per-stage latency histogram, and spans opened inside ``tracer.trace(...)``
+are also collected into that request's trace, which is appended to the
+JSONL trace file when it ends.
+"""
+import bisect
+import contextvars
+import functools
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from .config import METRICS_ENABLED, TRACE_FILE
+
+# Upper bounds in seconds, from fast JSON repair up to slow OCR and LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_current_trace = contextvars.ContextVar("resume_extractor_trace", default=None)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "start", "duration", "error")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.duration = 0.0
+        self.error = None
+
+    def set(self, **attrs):
+        """Attach attributes (e.g. token counts) to the span."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.tracer._finish(self)
+        return False
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Tracer:
+    """Collects spans into histograms and per-request traces."""
+
+    def __init__(self, enabled=False, trace_file=None, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.trace_file = trace_file
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._errors = {}
+            self._tokens = {}
+            self._traces = 0
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attrs)
+
+    @contextmanager
+    def trace(self, name, **attrs):
+        """Group the spans opened inside this block into one request trace."""
+        if not self.enabled:
+            yield None
+            return
+        trace = {"trace_id": uuid.uuid4().hex, "name": name, "attrs": attrs,
+                 "started_at": time.time(), "spans": []}
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+        try:
+            yield trace
+        except BaseException as e:
+            trace["error"] = type(e).__name__
+            raise
+        finally:
+            _current_trace.reset(token)
+            trace["duration"] = round(time.perf_counter() - start, 6)
+            with self._lock:
+                self._traces += 1
+                if self.trace_file:
+                    with open(self.trace_file, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(trace, ensure_ascii=False, default=str) + "\n")
+
+    def _finish(self, span):
+        with self._lock:
+            histogram = self._histograms.get(span.name)
+            if histogram is None:
+                histogram = self._histograms[span.name] = Histogram(self.buckets)
+            histogram.observe(span.duration)
+            if span.error:
+                self._errors[span.name] = self._errors.get(span.name, 0) + 1
+            for key, value in span.attrs.items():
+                if key.endswith("_tokens") and isinstance(value, (int, float)):
+                    self._tokens[key] = self._tokens.get(key, 0) + value
+        trace = _current_trace.get()
+        if trace is not None:
+            record = {"name": span.name, "duration": round(span.duration, 6)}
+            if span.attrs:
+                record["attrs"] = span.attrs
+            if span.error:
+                record["error"] = span.error
+            trace["spans"].append(record)
+
+    def snapshot(self):
+        """Current aggregates as a plain dict."""
+        with self._lock:
+            return {
+                "traces": self._traces,
+                "stages": {
+                    name: {"count": h.count, "sum": round(h.sum, 6), "buckets": dict(zip(self.buckets, h.counts))}
+                    for name, h in self._histograms.items()
+                },
+                "errors": dict(self._errors),
+                "tokens": dict(self._tokens),
+            }
+
+    def prometheus_text(self):
+        """Aggregates in the Prometheus text exposition format."""
+        lines = [
+            "# HELP resume_stage_duration_seconds Time spent in each pipeline stage.",
+            "# TYPE resume_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            for name in sorted(self._histograms):
+                h = self._histograms[name]
+                cumulative = 0
+                for bound, count in zip(self.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'resume_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'resume_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {h.count}')
+                lines.append(f'resume_stage_duration_seconds_sum{{stage="{name}"}} {h.sum:.6f}')
+                lines.append(f'resume_stage_duration_seconds_count{{stage="{name}"}} {h.count}')
+            lines += ["# HELP resume_stage_errors_total Stage executions that raised.",
+                      "# TYPE resume_stage_errors_total counter"]
+            for name in sorted(self._errors):
+                lines.append(f'resume_stage_errors_total{{stage="{name}"}} {self._errors[name]}')
+            lines += ["# HELP resume_llm_tokens_total Tokens reported by the LLM API.",
+                      "# TYPE resume_llm_tokens_total counter"]
+            for key in sorted(self._tokens):
+                lines.append(f'resume_llm_tokens_total{{kind="{key[:-len("_tokens")]}"}} {self._tokens[key]}')
+            lines += ["# HELP resume_traces_total Requests traced.", "# TYPE resume_traces_total counter",
+                      f"resume_traces_total {self._traces}"]
+        return "\n".join(lines) + "\n"
+
+
+tracer = Tracer(enabled=METRICS_ENABLED or bool(TRACE_FILE), trace_file=TRACE_FILE or None)
+
+
+def configure(enabled=True, trace_file=None):
+    """Turn tracing on or off for the process-wide tracer."""
+    tracer.enabled = enabled
+    tracer.trace_file = trace_file
+    return tracer
+
+
+def span(name, **attrs):
+    """A span on the process-wide tracer (a no-op while tracing is off)."""
+    if not tracer.enabled:
+        return NOOP_SPAN
+    return Span(tracer, name, attrs)
+
+
+def traced(name):
+    """Decorator running the whole function inside ``span(name)``."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(tracer, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,165 @@
+"""Concurrent OCR of image blobs with per-image and per-document time limits."""
+import contextvars
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .config import OCR_LANG, OCR_WORKERS, OCR_IMAGE_TIMEOUT, OCR_TOTAL_TIMEOUT, OCR_CACHE_PATH, OCR_THREADS
+from .metrics import span
+
+log = logging.getLogger(__name__)
+
+
+class OCRCache:
+    """OCR text stored in SQLite, keyed by image SHA-256 and language set.
+
+    Logos and template headers recur across thousands of resumes from the
+    same source; with this cache each distinct image is OCR'd once. Safe to
+    share between threads, and between processes through SQLite locking.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr ("
+                " image_hash TEXT NOT NULL, lang TEXT NOT NULL, text TEXT NOT NULL,"
+                " PRIMARY KEY (image_hash, lang))"
+            )
+
+    def get_many(self, hashes, lang):
+        """Return {image_hash: text} for the hashes already in the cache."""
+        hashes = list(hashes)
+        found = {}
+        with self._lock:
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT image_hash, text FROM ocr WHERE lang = ? AND image_hash IN ({','.join('?' * len(chunk))})",
+                    [lang, *chunk],
+                )
+                found.update(rows)
+        return found
+
+    def put_many(self, texts, lang):
+        """Store {image_hash: text} in one transaction."""
+        if not texts:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO ocr (image_hash, lang, text) VALUES (?, ?, ?)",
+                    [(h, lang, text) for h, text in texts.items()],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_ocr_cache():
+    """The process-wide OCRCache at OCR_CACHE_PATH, or None if it is not set."""
+    global _default_cache
+    if not OCR_CACHE_PATH:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = OCRCache(OCR_CACHE_PATH)
+    return _default_cache
+
+
+def _load_pytesseract():
+    import pytesseract
+    import pytesseract.pytesseract as runner
+    # pytesseract starts tesseract with env=runner.environ; the limit goes to those
+    # processes only, once, leaving this process's own environment alone
+    if not isinstance(runner.environ, ChainMap):
+        runner.environ = ChainMap({"OMP_THREAD_LIMIT": str(OCR_THREADS)}, os.environ)
+    return pytesseract
+
+
+def _ocr_one(data, lang, timeout):
+    pytesseract = _load_pytesseract()
+    from PIL import Image
+    pil_img = Image.open(io.BytesIO(data))
+    return pytesseract.image_to_string(pil_img, lang=lang, timeout=timeout)
+
+
+def ocr_images(images, lang=OCR_LANG, workers=OCR_WORKERS,
+               image_timeout=OCR_IMAGE_TIMEOUT, total_timeout=OCR_TOTAL_TIMEOUT, cache=None):
+    """OCR image blobs concurrently and return their texts in input order.
+
+    Each worker thread drives its own tesseract process, so the pool size is
+    the number of tesseract processes running at once. An image that fails,
+    exceeds `image_timeout` seconds or is still queued when `total_timeout`
+    runs out yields "". Identical blobs are OCR'd once; with an OCRCache as
+    `cache`, images seen before are not OCR'd at all.
+    """
+    if not images:
+        return []
+    hashes = [hashlib.sha256(data).hexdigest() for data in images]
+    texts = cache.get_many(set(hashes), lang) if cache is not None else {}
+    todo = {}
+    for h, data in zip(hashes, images):
+        if h not in texts:
+            todo.setdefault(h, data)
+    if todo:
+        ocred = _ocr_unique(list(todo.items()), lang, workers, image_timeout, total_timeout)
+        texts.update(ocred)
+        if cache is not None:
+            cache.put_many(ocred, lang)
+    return [texts.get(h, "") for h in hashes]
+
+
+def _ocr_unique(items, lang, workers, image_timeout, total_timeout):
+    # Returns {image_hash: text} for the images that were OCR'd successfully
+    results = {}
+    deadline = time.monotonic() + total_timeout
+
+    def run(data):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("total OCR time exhausted")
+        with span("ocr_image", bytes=len(data)):
+            return _ocr_one(data, lang, min(image_timeout, remaining))
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(items))))
+    try:
+        # Each task runs in a copy of the caller's context so its span joins the request's trace
+        futures = {pool.submit(contextvars.copy_context().run, run, data): h for h, data in items}
+        pending = set(futures)
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    log.warning("OCR failed for image %s: %s", futures[future][:12], e)
+        for future in pending:
+            future.cancel()
+        if pending:
+            log.warning("OCR time limit reached; skipped %d image(s)", len(pending))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
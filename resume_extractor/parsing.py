@@ -0,0 +1,95 @@
+"""Recovering the JSON object from a free-form model response."""
+import json
+import re
+
+from .metrics import traced
+
+
+def extract_json_block(text: str):
+    start = text.find("{")
+    if start == -1:
+        return None
+    depth = 0
+    in_str = False
+    esc = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+        else:
+            if ch == '"':
+                in_str = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[start:i+1]
+    return None
+
+
+def strip_trailing_commas(s: str) -> str:
+    out, in_str, esc = [], False, False
+    i = 0
+    while i < len(s):
+        ch = s[i]
+        if in_str:
+            out.append(ch)
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+            i += 1
+            continue
+        if ch == '"':
+            in_str = True
+            out.append(ch)
+            i += 1
+            continue
+        if ch == ",":
+            j = i + 1
+            while j < len(s) and s[j] in " \t\r\n":
+                j += 1
+            if j < len(s) and s[j] in "}]" :
+                i += 1
+                continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+class ResponseParseError(ValueError):
+    """The model response did not contain a usable JSON object."""
+
+    def __init__(self, message, text):
+        super().__init__(message)
+        self.text = text
+
+
+@traced("json_parse")
+def parse_llm_json(raw_response):
+    """Pull the JSON object out of a model response and decode it.
+
+    Raises ResponseParseError carrying the offending text when no object is
+    found or it does not decode.
+    """
+    candidate = extract_json_block(raw_response)
+    if not candidate and "```" in raw_response:
+        fenced = re.findall(r"```(?:json)?\s*(\{.*?\})\s*```", raw_response, flags=re.DOTALL)
+        candidate = fenced[0] if fenced else None
+
+    if not candidate:
+        raise ResponseParseError("No valid JSON found in the response", raw_response)
+
+    candidate = strip_trailing_commas(candidate)
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError as e:
+        raise ResponseParseError(f"Invalid JSON format: {e}", candidate) from e
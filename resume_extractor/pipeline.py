@@ -0,0 +1,193 @@
+"""The end-to-end resume pipeline, free of any UI code."""
+import asyncio
+import contextvars
+import functools
+import copy
+import hashlib
+
+from .cache import result_cache_key
+from .chunked import should_chunk, build_section_prompts, complete_sections, acomplete_sections
+from .compact import compact_text
+from .config import MODEL, PROMPT_COMPACTION, RULES_MODE, DEDUPE_RECHECK_CONTACT, CHUNKED_EXTRACTION
+from .extraction import extract_text
+from .llm import complete
+from .loader import load_document, count_real_images
+from .metrics import tracer
+from .parsing import parse_llm_json
+from .postprocess import post_process_json
+from .prompt import build_prompt
+from .rules import pre_extract, confident_fields, apply_rule_fields, rules_record, find_email, find_mobile
+
+
+def parse_response(raw_response, ocr_used=False):
+    """Decode a model response and run post-processing on it."""
+    return post_process_json(parse_llm_json(raw_response), ocr_used=ocr_used)
+
+
+def _annotate(trace, result):
+    if trace is not None:
+        trace["attrs"].update(sha256=result["sha256"], cached=result["cached"], ocr_used=result.get("ocr_used"),
+                              near_duplicate=bool(result.get("near_duplicate")),
+                              sections=len(result.get("sections") or ()))
+
+
+def _reuse_duplicate(result, match, dedupe, ocr_used):
+    # The earlier resume's record, with this file's own contact details when they differ
+    doc_id, score, record = match
+    record = copy.deepcopy(record)
+    record["ocr_used"] = "true" if ocr_used else "false"
+    if DEDUPE_RECHECK_CONTACT:
+        found = {"email": find_email(result["text"]), "mobile_no": find_mobile(result["text"])}
+        changed = {k: v["value"] for k, v in found.items() if v and v["value"] != record.get(k)}
+        if changed:
+            record.update(changed)
+            dedupe.note_contact_update()
+    result["near_duplicate"] = {"of": doc_id, "similarity": round(score, 3)}
+    return record
+
+
+def prepare_resume(uploaded_file, cache=None, model=MODEL, rules_mode=RULES_MODE, dedupe=None,
+                   chunked=CHUNKED_EXTRACTION):
+    """Do everything up to the LLM call for one file.
+
+    Returns (result, prompt, cache_key). On a cache hit, a near-duplicate
+    hit in the `dedupe` index, or when `rules_mode` is "only", the parsed
+    record is already in result["data"] and prompt is None. When `chunked`
+    calls for it (see chunked.py), prompt is a list of (section, prompt)
+    pairs; `call_llm` and `acall_llm` accept either form.
+    """
+    file_bytes = uploaded_file.read()
+    uploaded_file.seek(0)
+    key = result_cache_key(file_bytes, model=model, rules_mode=rules_mode, chunked=chunked)
+    result = {
+        "sha256": hashlib.sha256(file_bytes).hexdigest(),
+        "cached": False,
+    }
+
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            result.update(cached=True, data=cached)
+            return result, None, key
+
+    document = load_document(uploaded_file)
+    resume_text, ocr_used = extract_text(document)
+    result.update(
+        image_count=count_real_images(document),
+        warnings=document["warnings"],
+        text=resume_text,
+        ocr_used=ocr_used,
+    )
+    if not resume_text:
+        raise ValueError("No text could be extracted from the uploaded file. Please check the file content.")
+
+    if dedupe is not None:
+        result["minhash"] = dedupe.signature(resume_text)
+        match = dedupe.find(result["minhash"])
+        if match is not None:
+            parsed_json = _reuse_duplicate(result, match, dedupe, ocr_used)
+            if cache is not None:
+                cache.put(key, parsed_json)
+            result["data"] = parsed_json
+            return result, None, key
+
+    skip_fields = ()
+    if rules_mode != "off":
+        result["rules"] = pre_extract(resume_text)
+        if rules_mode == "only":
+            parsed_json = post_process_json(rules_record(result["rules"]), ocr_used=ocr_used)
+            if cache is not None:
+                cache.put(key, parsed_json)
+            if dedupe is not None:
+                dedupe.add(result["sha256"], result["minhash"], parsed_json)
+            result["data"] = parsed_json
+            return result, None, key
+        skip_fields = tuple(confident_fields(result["rules"]))
+
+    if PROMPT_COMPACTION:
+        resume_text, result["compaction"] = compact_text(resume_text, pages=document["pages"])
+    if should_chunk(resume_text, chunked):
+        prompts = build_section_prompts(resume_text, skip_fields=skip_fields)
+        if prompts is not None:
+            result["sections"] = [section for section, _ in prompts]
+            return result, prompts, key
+    return result, build_prompt(resume_text, skip_fields=skip_fields), key
+
+
+def call_llm(client, prompt, model=MODEL):
+    """The model's reply to a `prepare_resume` prompt: raw text, or the merged object for section prompts."""
+    if isinstance(prompt, list):
+        return complete_sections(client, prompt, model=model)
+    return complete(client, prompt, model=model)
+
+
+async def acall_llm(client, prompt, stream=False, on_event=None):
+    """`call_llm` for an `AsyncExtractionClient`; with `stream`, `on_event` receives fields as they complete."""
+    if isinstance(prompt, list):
+        return await acomplete_sections(client, prompt, stream=stream, on_event=on_event)
+    if stream:
+        return await client.stream_json(prompt, on_event=on_event)
+    return await client.complete(prompt)
+
+
+def finish_resume(result, response, cache=None, cache_key=None, dedupe=None):
+    """Post-process the model response into result["data"] and cache it.
+
+    `response` is the raw reply text, or the object already decoded from a
+    streamed reply. With a `dedupe` index, the record is added to it.
+    """
+    if not isinstance(response, dict):
+        response = parse_llm_json(response)
+    if result.get("rules"):
+        apply_rule_fields(response, result["rules"])
+    parsed_json = post_process_json(response, ocr_used=result["ocr_used"])
+    if cache is not None:
+        cache.put(cache_key, parsed_json)
+    if dedupe is not None and result.get("minhash"):
+        dedupe.add(result["sha256"], result["minhash"], parsed_json)
+    result["data"] = parsed_json
+    return result
+
+
+def parse_resume(uploaded_file, client, cache=None, model=MODEL, rules_mode=RULES_MODE, dedupe=None,
+                 chunked=CHUNKED_EXTRACTION):
+    """Run extraction, the LLM call and post-processing for one file.
+
+    `uploaded_file` is anything with `name`, `read` and `seek`: a Streamlit
+    upload or a file opened in binary mode. Returns a dict with the parsed
+    record under "data" plus the extracted text and diagnostics. `client`
+    may be None when `rules_mode` is "only". With a NearDuplicateIndex as
+    `dedupe`, a resume close enough to an earlier one reuses its record.
+    `chunked` ("off", "auto" or "on") selects section-chunked prompts.
+    """
+    with tracer.trace("resume", file=getattr(uploaded_file, "name", None)) as trace:
+        result, prompt, key = prepare_resume(uploaded_file, cache=cache, model=model, rules_mode=rules_mode,
+                                             dedupe=dedupe, chunked=chunked)
+        _annotate(trace, result)
+        if prompt is None:
+            return result
+        response = call_llm(client, prompt, model=model)
+        return finish_resume(result, response, cache=cache, cache_key=key, dedupe=dedupe)
+
+
+async def aparse_resume(uploaded_file, client, cache=None, executor=None, stream=False, on_event=None,
+                        rules_mode=RULES_MODE, dedupe=None, chunked=CHUNKED_EXTRACTION):
+    """`parse_resume` for an `AsyncExtractionClient`.
+
+    Extraction and OCR run on `executor` (the loop's default when None) so
+    the event loop stays free to drive other files' LLM calls. With
+    `stream`, the reply is streamed and `on_event` receives each field as it
+    completes (see `AsyncExtractionClient.stream_json`).
+    """
+    loop = asyncio.get_running_loop()
+    model = client.model if client is not None else MODEL
+    with tracer.trace("resume", file=getattr(uploaded_file, "name", None)) as trace:
+        # run_in_executor does not carry context over; copy it so spans land in this trace
+        prepare = functools.partial(contextvars.copy_context().run, prepare_resume,
+                                    uploaded_file, cache, model, rules_mode, dedupe, chunked)
+        result, prompt, key = await loop.run_in_executor(executor, prepare)
+        _annotate(trace, result)
+        if prompt is None:
+            return result
+        response = await acall_llm(client, prompt, stream=stream, on_event=on_event)
+        return finish_resume(result, response, cache=cache, cache_key=key, dedupe=dedupe)
@@ -0,0 +1,308 @@
+"""Normalising dates, durations and skills in the model's JSON output."""
+import calendar
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from .config import DATE_CACHE_SIZE
+from .metrics import traced
+from .skills import get_skill_matcher
+
+# Month names and abbreviations (plus "sept") to month numbers
+MONTHS = {name.lower(): i for names in (calendar.month_name, calendar.month_abbr) for i, name in enumerate(names) if name}
+MONTHS["sept"] = 9
+
+YEAR_RANGE_RE = re.compile(r'^\d{4}-\d{4}$')
+DURATION_RE = re.compile(r'(\d+)\s*(year|month)s?', re.IGNORECASE)
+# Strict formats tried before the fuzzy parser: dd-mm-yyyy, [d] Mon YYYY and YYYY
+DMY_RE = re.compile(r'^(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})$')
+MONTH_YEAR_RE = re.compile(r'^(?:(\d{1,2})(?:st|nd|rd|th)?\s+)?([A-Za-z]{3,9})\.?,?\s*(\d{4})$')
+YEAR_RE = re.compile(r'^\d{4}$')
+
+SKILL_SEPARATORS_RE = re.compile(r"[,:;|/\\\-–—]+")
+SPACES_RE = re.compile(r"\s+")
+TRAILING_STOP_RE = re.compile(r"\b(?:and|of|in|to|with|at|for|on|by|the)\s*$", re.I)
+NON_NUMERIC_RE = re.compile(r'[^0-9.]')
+
+TRAILING_STOPS = {"and", "of", "in", "to", "with", "at", "for", "on", "by", "the", "&"}
+LEADING_PHRASES = [
+    "ability to", "knowledge of", "proven", "excellent", "strong",
+    "sound", "high", "good", "demonstrated", "extensive", "solid"
+]
+ACRONYMS = {"ai", "ml", "nlp", "sql", "crm", "sap", "aws", "gcp", "api", "ui", "ux", "etl", "bi"}
+
+
+def _strict_date(date_str):
+    # "dd-mm-yyyy" for the common unambiguous formats, None to fall back to fuzzy parsing
+    s = date_str.strip()
+    m = DMY_RE.match(s)
+    if m:
+        day, month, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        if 1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]:
+            return f"{day:02d}-{month:02d}-{year}"
+        return None
+    m = MONTH_YEAR_RE.match(s)
+    if m:
+        month = MONTHS.get(m.group(2).lower())
+        if not month:
+            return None
+        day, year = int(m.group(1) or 1), int(m.group(3))
+        if not 1 <= day <= calendar.monthrange(year, month)[1]:
+            return None
+        return f"{day:02d}-{month:02d}-{year}"
+    if YEAR_RE.match(s):
+        return f"01-01-{s}"
+    return None
+
+
+# Function to normalize and validate date (returns "dd-mm-yyyy" or "")
+def normalize_date(date_str):
+    if not date_str or not isinstance(date_str, str):
+        return ""
+    return _normalize_date(date_str)
+
+
+# Memoized: the same few thousand date strings recur across a whole corpus
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _normalize_date(date_str):
+    try:
+        # Handle year ranges like "2022-2023" -> assume start of first to start of second
+        if YEAR_RANGE_RE.match(date_str):
+            start_year, end_year = date_str.split('-')
+            if int(end_year) > int(start_year):
+                return f"01-01-{start_year}"
+            return ""
+        strict = _strict_date(date_str)
+        if strict:
+            return strict
+        # Check for duration mentions to flag as invalid date (e.g., "Five years")
+        if DURATION_RE.search(date_str):
+            return ""
+        # Parse various formats; a missing day or month means the first, as the prompt asks
+        import dateutil.parser as date_parser
+        parsed = date_parser.parse(date_str, fuzzy=True, dayfirst=True,
+                                   default=datetime(datetime.now().year, 1, 1))
+        year = parsed.year
+        month = parsed.month
+        # If it's end of month, determine last day (including leap for Feb)
+        if parsed.day == calendar.monthrange(year, month)[1]:
+            day = calendar.monthrange(year, month)[1]  # Handles leap years
+        else:
+            day = parsed.day
+        return f"{day:02d}-{month:02d}-{year}"
+    except:
+        return ""
+
+
+def explicit_duration(text):
+    """Years stated outright in `text` ("2 years", "18 months"), or None."""
+    duration_match = DURATION_RE.search(text)
+    if not duration_match:
+        return None
+    num = int(duration_match.group(1))
+    unit = duration_match.group(2).lower()
+    return num if unit.startswith('year') else num / 12
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_dmy(date_str):
+    try:
+        return datetime.strptime(date_str, "%d-%m-%Y")
+    except (TypeError, ValueError):
+        return None
+
+
+def _years_between(start, end):
+    from dateutil.relativedelta import relativedelta
+    delta = relativedelta(end, start)
+    return delta.years + (delta.months / 12) + (delta.days / 365.25)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _fixed_duration(start_date, end_date):
+    start, end = _parse_dmy(start_date), _parse_dmy(end_date)
+    if start is None or end is None:
+        return 0.0
+    return _years_between(start, end)
+
+
+# Function to calculate experience duration in years
+def calculate_duration(start_date, end_date, is_current=False, exp_text=None):
+    if not start_date or not end_date:
+        if exp_text:
+            # Parse explicit duration from text (e.g., "Five years" or "2 Year")
+            duration = explicit_duration(exp_text)
+            if duration is not None:
+                return duration
+        return 0.0
+    if not isinstance(start_date, str) or not isinstance(end_date, str):
+        return 0.0
+    if end_date == "current_time":
+        # Measured to today, so memoized per day
+        end_date = datetime.now().strftime("%d-%m-%Y")
+    return _fixed_duration(start_date, end_date)
+
+
+# Function to format experience from decimal years to "X years Y months"
+def format_experience(decimal_years):
+    if decimal_years <= 0:
+        return "0 years 0 months"
+    years = int(decimal_years)
+    months = int((decimal_years - years) * 12)
+    return f"{years} years {months} months"
+
+
+def _preserve_acronyms(s: str) -> str:
+    def fix_token(t):
+        return t.upper() if t.lower() in ACRONYMS else t.capitalize()
+    return " ".join(fix_token(t) for t in s.split())
+
+
+# One skill entry cut to 1-3 words, "" if nothing is left; memoized since skills repeat across resumes
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _refine_skill(raw):
+    s = SKILL_SEPARATORS_RE.sub(" ", raw)
+    s = SPACES_RE.sub(" ", s).strip(" .–—,:;")
+
+    low = s.lower()
+    for p in LEADING_PHRASES:
+        if low.startswith(p + " "):
+            s = s[len(p) + 1:]
+            low = s.lower()
+            break
+
+    tokens = low.split()
+    while tokens and tokens[-1] in TRAILING_STOPS:
+        tokens.pop()
+    if not tokens:
+        return ""
+
+    tokens = tokens[:3]
+    phrase = " ".join(tokens)
+    phrase = SPACES_RE.sub(" ", phrase).strip()
+    phrase = TRAILING_STOP_RE.sub("", phrase).strip()
+    if not phrase:
+        return ""
+
+    return _preserve_acronyms(phrase)
+
+
+# Function to refine skills to 1-3 words per entry
+def refine_skills(skills_list):
+    seen = set()
+    out = []
+    for raw in skills_list or []:
+        if not raw:
+            continue
+        c = _refine_skill(str(raw))
+        key = c.lower()
+        if c and key not in seen:
+            seen.add(key)
+            out.append(c)
+    return out
+
+
+def canonical_skills(skills_list, matcher):
+    """(skills, skill_ids): dictionary skills by canonical name, then the rest as refine_skills leaves them."""
+    names, ids, unmatched = matcher.canonicalize(skills_list)
+    seen = {name.lower() for name in names}
+    return names + [s for s in refine_skills(unmatched) if s.lower() not in seen], ids
+
+
+# Function for post-processing the parsed JSON
+@traced("post_process")
+def post_process_json(parsed_json, ocr_used=False):
+    # Fix dates in education
+    for edu in parsed_json.get("education", []):
+        edu["passing_year"] = normalize_date(edu.get("passing_year", ""))
+        # Standardize grade_type
+        grade_type = edu.get("grade_type", "").lower()
+        if '%' in grade_type or '%' in edu.get("grade_value", ""):
+            edu["grade_type"] = "percentage"
+        elif 'cgpa' in grade_type:
+            edu["grade_type"] = "CGPA"
+        # Clean grade_value (remove symbols)
+        edu["grade_value"] = NON_NUMERIC_RE.sub('', edu.get("grade_value", ""))
+
+    # Fix dates and calculate durations in experience
+    total_exp = 0.0
+    flags = []  # rebuilt on every run, so re-processing a record does not repeat them
+    for exp in parsed_json.get("experience", []):
+        exp["start_date"] = normalize_date(exp.get("start_date", ""))
+        if exp.get("end_date", "") not in ["", "current_time"]:
+            exp["end_date"] = normalize_date(exp.get("end_date", ""))
+        # Use original text from resume for duration if dates are missing
+        exp_text = f"{exp.get('job_title', '')} {exp.get('company', '')} {exp.get('location', '')}"
+        duration = calculate_duration(exp["start_date"], exp["end_date"], exp.get("is_current", False), exp_text)
+        exp["total_experience"] = round(duration, 2)
+        # Add formatted experience
+        exp["formatted_experience"] = format_experience(exp["total_experience"])
+        total_exp += duration
+        # Check for conflict and flag
+        calculated_duration = exp["total_experience"]
+        stated = explicit_duration(exp_text)
+        if stated and calculated_duration > 0:
+            if abs(calculated_duration - stated) / stated > 0.2:  # >20% variance
+                flags.append(f"Potential duration inconsistency in entry: {exp.get('company', 'Unknown')}")
+    if flags:
+        parsed_json["experience_flags"] = flags
+    else:
+        parsed_json.pop("experience_flags", None)
+
+    parsed_json["total_work_experience"] = round(total_exp, 2)
+    # Add formatted total work experience
+    parsed_json["formatted_total_experience"] = format_experience(parsed_json["total_work_experience"])
+
+    # Refine skills to 1-3 words per entry; with a skills dictionary, skills get canonical names and IDs
+    matcher = get_skill_matcher()
+    for field in ["skills", "key_responsibilities"]:
+        if field in parsed_json and isinstance(parsed_json[field], list):
+            if field == "skills" and matcher is not None:
+                parsed_json["skills"], parsed_json["skill_ids"] = canonical_skills(parsed_json["skills"], matcher)
+            else:
+                parsed_json[field] = refine_skills(parsed_json[field])
+
+    # Trust LLM-inferred role and role_category, validate as strings
+    parsed_json["role"] = str(parsed_json.get("role", "")).strip()
+    parsed_json["role_category"] = str(parsed_json.get("role_category", "")).strip()
+    
+    # Add ocr_used flag
+    parsed_json["ocr_used"] = "true" if ocr_used else "false"
+
+    # Clean Unicode in degrees/etc.
+    for key in ["full_name", "profile_title", "latest_company_name", "industry", "department"]:
+        if parsed_json.get(key):
+            parsed_json[key] = parsed_json[key].replace("\u2019", "'").replace("\u201c", '"').replace("\u201d", '"')
+
+    for edu in parsed_json.get("education", []):
+        edu["degree"] = edu.get("degree", "").replace("\u2019", "'")
+
+    # Department: If multiple, take the first/primary
+    if ',' in parsed_json.get("department", ""):
+        parsed_json["department"] = parsed_json["department"].split(',')[0].strip()
+
+    return parsed_json
+
+
+def post_process_batch(records, ocr_used=None):
+    """Run `post_process_json` over many records, yielding each in turn.
+
+    Meant for re-normalising stored output: post-processing is idempotent,
+    so a record already processed by the current code comes out unchanged
+    (durations measured to today still grow with the date). With `ocr_used`
+    None, each record keeps its own "ocr_used" flag. Date parsing is
+    memoized, so throughput climbs as the corpus's date strings repeat.
+    """
+    for record in records:
+        flag = ocr_used if ocr_used is not None else str(record.get("ocr_used", "false")).lower() == "true"
+        yield post_process_json(record, ocr_used=flag)
+
+
+def cache_info():
+    """Hit and miss counts of the date and duration memo tables."""
+    return {
+        "normalize_date": _normalize_date.cache_info()._asdict(),
+        "parse_date": _parse_dmy.cache_info()._asdict(),
+        "duration": _fixed_duration.cache_info()._asdict(),
+        "skill": _refine_skill.cache_info()._asdict(),
+    }
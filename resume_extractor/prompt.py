@@ -0,0 +1,131 @@
+"""The extraction prompt sent to the model."""
+from datetime import datetime
+
+from .metrics import traced
+
+# Filled with str.format: doubled braces are literal JSON braces
+PROMPT_TEMPLATE = """
+        Extract and return the candidate's information in the following strict JSON format:
+        {{ "full_name": "", "email": "", "mobile_no": "", "date_of_birth": "dd-mm-yyyy", "father_name": "", "gender": "Male|Female", "address": "", "city": "", "latest_company_name": "", "industry": "", "department": "", "key_responsibilities": [], "profile_title": "", "education": [ {{ "degree": "", "branch_or_board": "", "school_or_institute": "", "passing_year": "dd-mm-yyyy", "grade_type": "", "grade_value": "" }} ], "total_work_experience": 0.0, "current_ctc": "", "experience": [ {{ "job_title": "", "company": "", "start_date": "dd-mm-yyyy", "end_date": "dd-mm-yyyy" | "current_time", "is_current": "true" | "false", "location": "", "total_experience": 0.0 }} ], "skills": [], "languages": [], "hobbies": [], "role": "", "role_category": "", "ocr_used": "false" | "true" }}
+        Rules:
+        1. All dates must be in dd-mm-yyyy format. If a date is not found or cannot be accurately converted, leave it as an empty string "". **For experience dates specifically:**
+           - If only years are given (e.g., "2020-2024"), interpret start as "01-01-YYYY1" (first day of start year) and end as "01-01-YYYY2" (first day of end year) for the range YYYY1-YYYY2.
+           - If month-year is given (e.g., "July 2020 - June 2024" or "Jul 2020-Aug 2021"), interpret start as "01-MM-YYYY" (first day of start month) and end as the last day of the end month (e.g., "30-06-2024" for June, "31-07-YYYY" for July, "28-02-YYYY" or "29-02-YYYY" for February accounting for leap years if possible; use 28 if undetermined).
+           - If full dates are given (e.g., "15 July 2020 - 30 June 2024" or "15-07-2020 - 30-06-2024"), convert directly to "dd-mm-yyyy".
+           - For current roles (e.g., "since 2020" or "present"), set start_date based on the given info, end_date to "current_time", and is_current to "true"; do not assume an end date. The current date for calculations is {today}.
+           - If only a duration is provided without any dates or years (e.g., "3 years experience" or "Five years of experience"), leave start_date and end_date as ""; do not assume dates. Post-processing will calculate based on the explicit duration.
+           - Handle variations like "Jul 2020" (abbreviated months), "2020/2024" (slashes), or "from 2020 to present". Always prioritize accuracy—leave blank if ambiguous. Do not fabricate dates.
+        2. Return only valid JSON. Do NOT use markdown (no triple backticks), comments, or extra explanation — just the pure JSON object.
+        3. If the industry or department is not explicitly mentioned, infer them from company names or job titles where appropriate (e.g., 'HDFC Bank' -> industry 'Banking', department from job_title like 'Sales Executive' -> 'Sales'). If inference is not possible or uncertain, leave as empty string "". For department, select only the primary one; do not list multiple.
+        4. For any field or sub-field that is missing or not mentioned in the resume text, leave it as an empty string "", null, 0.0 (for numbers), false (for booleans), or empty array [] as appropriate. Do NOT invent or provide any dummy data, placeholders, or assumptions. Ensure all personal info like name, email is extracted if present.
+        5. If no relevant information is found for a field, strictly adhere to leaving it empty as specified above. Do not fabricate any data.
+        6. Only extract information directly from or reasonably inferred from the provided resume text. Do not add external knowledge or guesses.
+        7. For grade_type, standardize to 'percentage' if '%' is used, 'CGPA' for scales like /10; clean grade_value to numbers only (e.g., '57%' -> '57').
+        8. For experience, extract raw dates without calculating durations here; set total_experience to 0.0 initially; if an explicit duration is provided (e.g., "2 months" or "Five years"), use it to inform the experience entry, but set total_experience to 0.0 here—post-processing will calculate accurately based on dates or flag inconsistencies.
+        9. If experience entries have missing job_titles or companies, still include them if partial data is available, but ensure consistency.
+        10. If dates are missing but an explicit duration is given (e.g., "3 years at CompanyX" or "2 Year Experience"), extract the entry with start_date and end_date as "", and rely on post-processing to compute total_experience from the duration text if possible. Do not infer dates unless a range or month is explicitly mentioned.
+        11. Infer 'role' as a single specific job title (e.g., 'Front End Developer', 'Sales Officer') and 'role_category' as a single broad group (e.g., 'Developer', 'Sales') based on the latest job_title in experience, overall experience, and skills. Use intelligent reasoning to determine the most fitting role and category, prioritizing recency and relevance. If no clear inference is possible or the information is insufficient, leave both as empty string "". Do not fabricate or use external knowledge—base solely on the resume text.
+        12. The resume text may include OCR-extracted parts (marked as 'Page X Image Text'), which could contain typos or formatting artifacts. Prioritize structured data (e.g., job titles, skills) over noisy OCR text, but use OCR text to supplement if standard text is insufficient. Set 'ocr_used' to 'true' if any OCR text is included, otherwise 'false'.
+
+        Examples:
+        - If resume has "Worked at HDFC 2020-2021 as Sales Exec", infer industry "Banking", department "Sales", start_date "01-01-2020", end_date "01-01-2021", role "Sales Executive", role_category "Sales".
+        - If education has "B.A. May 2013, 57%", set passing_year "01-05-2013", grade_type "percentage", grade_value "57".
+        - If experience has "Sales Executive at CompanyX, July 2020 - June 2024", set start_date "01-07-2020", end_date "30-06-2024", role "Sales Executive", role_category "Sales".
+        - If experience has "Five years of experience as Sales Executive", set start_date "", end_date "", total_experience 0.0, role "Sales Executive", role_category "Sales".
+        - If skills include 'JavaScript, HTML, CSS' and experience mentions web development, infer role 'Front End Developer', role_category 'Developer'.
+        - If resume has "Page 1 Image Text: Sales Officer at SBI", infer role "Sales Officer", role_category "Sales", ocr_used "true".{known_fields}
+
+        Resume Text:
+        {resume_text}
+        """
+
+
+KNOWN_FIELDS_NOTE = """
+
+        Note: these fields have already been extracted separately. Do not extract them; return them as empty strings: {fields}."""
+
+
+@traced("prompt_build")
+def build_prompt(resume_text, skip_fields=()):
+    """Return the full extraction prompt for `resume_text`.
+
+    `skip_fields` names fields filled by rule-based extraction; the model is
+    told to leave them empty.
+    """
+    known_fields = KNOWN_FIELDS_NOTE.format(fields=", ".join(skip_fields)) if skip_fields else ""
+    return PROMPT_TEMPLATE.format(
+        today=datetime.now().strftime("%d-%m-%Y"),
+        known_fields=known_fields,
+        resume_text=resume_text,
+    )
+
+
+# Section-specific prompts (see chunked.py): each asks for its own slice of the schema
+SECTION_PROMPT_TEMPLATE = """
+        Extract the following fields from this part of a resume and return them in this strict JSON format:
+        {{ {schema} }}
+        Rules:
+        1. Return only valid JSON. Do NOT use markdown (no triple backticks), comments, or extra explanation — just the pure JSON object.
+        2. For any field that is missing or not mentioned in the text, leave it as an empty string "", 0.0 (for numbers) or empty array [] as appropriate. Do NOT invent or provide any dummy data, placeholders, or assumptions.
+        3. Only extract information directly from or reasonably inferred from the provided text. Do not add external knowledge or guesses.
+        4. The text may include OCR-extracted parts (marked as 'Page X Image Text'), which could contain typos or formatting artifacts; use them only to supplement clean text.{rules}{known_fields}
+
+        Resume Text ({section}):
+        {resume_text}
+        """
+
+SECTION_SCHEMAS = {
+    "profile": '"full_name": "", "email": "", "mobile_no": "", "date_of_birth": "dd-mm-yyyy", "father_name": "", '
+               '"gender": "Male|Female", "address": "", "city": "", "profile_title": "", "current_ctc": "", '
+               '"languages": [], "hobbies": []',
+    "experience": '"latest_company_name": "", "industry": "", "department": "", "key_responsibilities": [], '
+                  '"experience": [ {{ "job_title": "", "company": "", "start_date": "dd-mm-yyyy", '
+                  '"end_date": "dd-mm-yyyy" | "current_time", "is_current": "true" | "false", "location": "", '
+                  '"total_experience": 0.0 }} ], "role": "", "role_category": ""',
+    "education": '"education": [ {{ "degree": "", "branch_or_board": "", "school_or_institute": "", '
+                 '"passing_year": "dd-mm-yyyy", "grade_type": "", "grade_value": "" }} ]',
+    "skills": '"skills": []',
+}
+
+SECTION_RULES = {
+    "profile": [
+        "date_of_birth must be in dd-mm-yyyy format; leave it empty if it cannot be converted accurately.",
+    ],
+    "experience": [
+        "All dates must be in dd-mm-yyyy format. Years only (\"2020-2024\"): start \"01-01-2020\", end "
+        "\"01-01-2024\". Month-year: start on the first day of the start month, end on the last day of the end "
+        "month. For current roles (\"present\", \"since 2020\"), set end_date to \"current_time\" and is_current "
+        "to \"true\". The current date is {today}. If only a duration is given, leave both dates empty. Leave "
+        "ambiguous dates empty; do not fabricate dates.",
+        "Set total_experience to 0.0; post-processing calculates it.",
+        "If the industry or department is not explicitly mentioned, infer them from company names or job titles "
+        "where appropriate; otherwise leave them empty. Select only the primary department.",
+        "Infer 'role' as a single specific job title and 'role_category' as a single broad group from the latest "
+        "job_title, overall experience and the skills listed for context. Leave both empty if unclear.",
+        "Include experience entries with missing job_titles or companies if partial data is available.",
+    ],
+    "education": [
+        "passing_year must be in dd-mm-yyyy format (\"May 2013\" -> \"01-05-2013\", \"2013\" -> \"01-01-2013\").",
+        "Standardize grade_type to 'percentage' if '%' is used, 'CGPA' for scales like /10; clean grade_value "
+        "to numbers only (e.g., '57%' -> '57').",
+    ],
+    "skills": [
+        "List each skill as a short phrase of 1-3 words.",
+    ],
+}
+
+
+@traced("prompt_build")
+def build_section_prompt(section, resume_text, skip_fields=()):
+    """Return the prompt asking for `section`'s fields ("profile", "experience", "education" or "skills")."""
+    today = datetime.now().strftime("%d-%m-%Y")
+    rules = "".join(f"\n        {i}. {rule.format(today=today)}"
+                    for i, rule in enumerate(SECTION_RULES[section], start=5))
+    known_fields = KNOWN_FIELDS_NOTE.format(fields=", ".join(skip_fields)) if skip_fields else ""
+    return SECTION_PROMPT_TEMPLATE.format(
+        schema=SECTION_SCHEMAS[section].format(),
+        rules=rules,
+        known_fields=known_fields,
+        section=section,
+        resume_text=resume_text,
+    )
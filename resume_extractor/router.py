@@ -0,0 +1,285 @@
+"""Latency-aware routing of LLM calls across several models or endpoints.
+
+Each endpoint keeps a rolling window of call latencies and outcomes. A call
+goes first to the endpoint with the lowest expected cost, its cost weight
+times its p50 latency divided by its success rate; endpoints not yet tried
+go first, in configuration order, so every one gets measured. If the call is
+still running when the endpoint's p95 latency has passed, a hedged request
+goes to the next endpoint, and whichever returns valid JSON first wins; the
+other is cancelled. An endpoint that fails or returns unparseable JSON hands
+the call to the next one.
+
+Only the network time of a completed request goes into an endpoint's
+window, as its client reports it: waits for an in-flight slot or the rate
+limiter, replies served from the LLM cache and cancelled hedge losers
+would all skew the p95 that decides when to hedge.
+
+A free-tier model's slow tail then costs one extra request for about one
+call in twenty, instead of stalling a batch.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+
+from .async_llm import AsyncExtractionClient
+from .config import (
+    LLM_BASE_URL,
+    LLM_ENDPOINTS,
+    ROUTER_WINDOW,
+    ROUTER_MIN_SAMPLES,
+    ROUTER_HEDGE_DELAY,
+    ROUTER_HEDGE,
+)
+from .parsing import parse_llm_json
+
+log = logging.getLogger(__name__)
+
+
+class Endpoint:
+    """One model at one OpenAI-compatible endpoint, with rolling latency and error statistics.
+
+    The API key is read from the `api_key_env` environment variable unless
+    `api_key` is given. `cost` weights the endpoint's expected latency when
+    ranking, so a paid model can be kept as the fallback for a free one.
+    """
+
+    def __init__(self, model, base_url=LLM_BASE_URL, api_key=None, api_key_env="API_KEY", cost=1.0, name=None,
+                 window=ROUTER_WINDOW):
+        self.name = name or model
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key or os.environ.get(api_key_env)
+        self.cost = float(cost)
+        self.client = None
+        self.requests = self.errors = self.wins = self.hedges = 0
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+
+    def record(self, seconds=None, ok=True):
+        """Note a finished call: its latency (None for a failure) and whether it succeeded."""
+        if seconds is not None:
+            self._latencies.append(seconds)
+        self._outcomes.append(ok)
+        if not ok:
+            self.errors += 1
+
+    @property
+    def samples(self):
+        return len(self._latencies)
+
+    def quantile(self, q):
+        """The `q` latency quantile over the window, or None before any call has finished."""
+        latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def error_rate(self):
+        outcomes = list(self._outcomes)
+        return outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+    def score(self, default_latency):
+        """Expected cost of a call here; lower is better, 0 for an endpoint not tried yet.
+
+        An endpoint that has only lost hedge races has no latencies yet, and
+        counts as taking `default_latency`.
+        """
+        if not self._outcomes and not self.hedges:
+            return 0.0
+        latency = self.quantile(0.5)
+        if latency is None:
+            latency = default_latency
+        return self.cost * latency / max(1.0 - self.error_rate(), 0.05)
+
+    def stats(self):
+        p50, p95 = self.quantile(0.5), self.quantile(0.95)
+        return {
+            "name": self.name,
+            "model": self.model,
+            "cost": self.cost,
+            "requests": self.requests,
+            "wins": self.wins,
+            "hedges": self.hedges,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate(), 4),
+            "p50": None if p50 is None else round(p50, 4),
+            "p95": None if p95 is None else round(p95, 4),
+        }
+
+
+def load_endpoints(spec=LLM_ENDPOINTS):
+    """Endpoints from `spec`, a JSON list of Endpoint settings or the path of a file holding one."""
+    if not spec:
+        return []
+    if not spec.lstrip().startswith("["):
+        with open(spec, encoding="utf-8") as f:
+            spec = f.read()
+    entries = json.loads(spec)
+    if not isinstance(entries, list) or not all(isinstance(e, dict) and e.get("model") for e in entries):
+        raise ValueError('LLM endpoints must be a JSON list of objects, each with a "model"')
+    try:
+        return [Endpoint(**entry) for entry in entries]
+    except TypeError as e:
+        raise ValueError(f"Bad LLM endpoint settings: {e}") from e
+
+
+class ModelRouter:
+    """Drop-in for `AsyncExtractionClient` that routes and hedges across `endpoints`.
+
+    Each endpoint gets its own AsyncExtractionClient built from
+    `client_options` (max_in_flight, requests_per_second, response_cache, ...),
+    so rate limits and retries apply per endpoint. Until an endpoint has
+    `min_samples` finished calls, its hedge delay is `hedge_delay` rather than
+    its p95. `complete` returns the decoded object, like `stream_json`.
+    """
+
+    def __init__(self, endpoints, hedge=ROUTER_HEDGE, hedge_delay=ROUTER_HEDGE_DELAY, min_samples=ROUTER_MIN_SAMPLES,
+                 api_key=None, **client_options):
+        if not endpoints:
+            raise ValueError("ModelRouter needs at least one endpoint")
+        client_options.pop("model", None)  # each endpoint names its own
+        client_options.pop("base_url", None)
+        self.endpoints = list(endpoints)
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.min_samples = min_samples
+        for endpoint in self.endpoints:
+            endpoint.client = AsyncExtractionClient(api_key=endpoint.api_key or api_key, base_url=endpoint.base_url,
+                                                    model=endpoint.model, **client_options)
+        self.model = self.endpoints[0].model
+
+    async def close(self):
+        for endpoint in self.endpoints:
+            await endpoint.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def ranked(self):
+        """Endpoints in the order they would be tried now."""
+        return sorted(self.endpoints, key=lambda e: e.score(self.hedge_delay))
+
+    def _hedge_after(self, endpoint):
+        if endpoint.samples < self.min_samples:
+            return self.hedge_delay
+        return endpoint.quantile(0.95)
+
+    async def _route(self, attempt):
+        # Runs `attempt(endpoint, on_latency)` on the best endpoint, hedging once and failing over as needed
+        waiting = self.ranked()
+        pending = {}
+        hedged = False
+        error = None
+
+        def launch():
+            endpoint = waiting.pop(0)
+            endpoint.requests += 1
+            latency = []  # the client's network time, left empty by a cached reply
+            pending[asyncio.ensure_future(attempt(endpoint, latency.append))] = (endpoint, time.monotonic(), latency)
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if self.hedge and not hedged and waiting and len(pending) == 1:
+                    primary, started, _ = next(iter(pending.values()))
+                    timeout = max(0.0, started + self._hedge_after(primary) - time.monotonic())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    primary.hedges += 1
+                    log.info("%s is past its latency budget; hedging to %s", primary.name, waiting[0].name)
+                    launch()
+                    continue
+                winner = None
+                for task in done:
+                    endpoint, _, latency = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        endpoint.record(ok=False)
+                        log.warning("LLM call to %s failed: %s", endpoint.name, e)
+                        error = e
+                        continue
+                    if latency:
+                        endpoint.record(latency[-1])
+                    if winner is None:
+                        winner = endpoint, result
+                if winner is not None:
+                    winner[0].wins += 1
+                    return winner[1]
+                if not pending and waiting:
+                    launch()
+            raise error
+        finally:
+            # Losers are not recorded: how long they would have taken is unknown
+            for task in pending:
+                task.cancel()
+
+    async def complete(self, prompt, model=None, deadline=None):
+        """The decoded JSON object of the first valid reply to `prompt`."""
+        async def attempt(endpoint, on_latency):
+            return parse_llm_json(await endpoint.client.complete(prompt, deadline=deadline, on_latency=on_latency))
+
+        return await self._route(attempt)
+
+    async def stream_json(self, prompt, on_event=None, model=None, deadline=None):
+        """`AsyncExtractionClient.stream_json` across the endpoints.
+
+        `on_event` only receives the events of the first attempt to produce
+        any, so a hedged call does not report every field twice; the
+        returned object is the winner's.
+        """
+        leader = None
+
+        async def attempt(endpoint, on_latency):
+            def forward(event):
+                nonlocal leader
+                if leader is None:
+                    leader = endpoint
+                if leader is endpoint and on_event is not None:
+                    on_event(event)
+
+            return await endpoint.client.stream_json(prompt, on_event=forward, deadline=deadline,
+                                                     on_latency=on_latency)
+
+        return await self._route(attempt)
+
+    def stats(self):
+        return {"endpoints": [endpoint.stats() for endpoint in self.endpoints]}
+
+    def prometheus_text(self):
+        """Per-endpoint request, error and latency figures in Prometheus text format."""
+        lines = []
+        for metric, kind, key in (("requests_total", "counter", "requests"), ("wins_total", "counter", "wins"),
+                                  ("hedges_total", "counter", "hedges"), ("errors_total", "counter", "errors"),
+                                  ("error_rate", "gauge", "error_rate")):
+            lines.append(f"# TYPE resume_llm_endpoint_{metric} {kind}")
+            lines += [f'resume_llm_endpoint_{metric}{{endpoint="{s["name"]}"}} {s[key]}'
+                      for s in self.stats()["endpoints"]]
+        lines.append("# TYPE resume_llm_endpoint_latency_seconds gauge")
+        for s in self.stats()["endpoints"]:
+            for key, quantile in (("p50", "0.5"), ("p95", "0.95")):
+                if s[key] is not None:
+                    lines.append(f'resume_llm_endpoint_latency_seconds{{endpoint="{s["name"]}",'
+                                 f'quantile="{quantile}"}} {s[key]}')
+        return "\n".join(lines) + "\n"
+
+
+def make_async_client(endpoints=None, hedge=ROUTER_HEDGE, **client_options):
+    """A ModelRouter over `endpoints` (a list, or a spec for `load_endpoints`; default LLM_ENDPOINTS).
+
+    With no endpoints configured, a single `AsyncExtractionClient` built from
+    `client_options`.
+    """
+    if endpoints is None or isinstance(endpoints, str):
+        endpoints = load_endpoints(LLM_ENDPOINTS if endpoints is None else endpoints)
+    if not endpoints:
+        return AsyncExtractionClient(**client_options)
+    return ModelRouter(endpoints, hedge=hedge, **client_options)
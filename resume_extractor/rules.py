@@ -0,0 +1,229 @@
+"""Rule-based extraction of structured fields, run before (or instead of) the LLM."""
+import calendar
+import re
+
+from .config import RULES_MIN_CONFIDENCE
+from .metrics import traced
+from .postprocess import MONTHS as MONTH_NAMES, normalize_date
+
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_abbr) if name}
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?<![\d+])(\+?91[\s.-]*|0)?([6-9](?:[\s.-]?\d){9})(?!\d)")
+PHONE_LABEL_RE = re.compile(r"\b(mobile|mob|phone|ph|contact|cell|tel)\b", re.IGNORECASE)
+DOB_RE = re.compile(r"\b(?:d\.?\s*o\.?\s*b\.?|date\s+of\s+birth|birth\s*date)\s*[:\-–]?\s*(.{6,30})", re.IGNORECASE)
+YEAR_RE = re.compile(r"\b(19[5-9]\d|20[0-4]\d)\b")
+MONTH_YEAR_RE = re.compile(r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?,?\s*'?(19[5-9]\d|20[0-4]\d)\b", re.IGNORECASE)
+PERCENT_RE = re.compile(r"(\d{2}(?:\.\d{1,2})?)\s*%")
+CGPA_RE = re.compile(r"(?:c\.?g\.?p\.?a|gpa|cpi|sgpa)\s*[:\-]?\s*(\d{1,2}(?:\.\d{1,2})?)|\b(\d(?:\.\d{1,2})?)\s*/\s*10\b"
+                     r"|\b(\d{1,2}(?:\.\d{1,2})?)\s*(?:c\.?g\.?p\.?a|gpa|cpi|sgpa)\b", re.IGNORECASE)
+# A date with day, month and year all written: dd-mm-yyyy, "12 Mar 1990", "12th March, 1990" or "March 12, 1990"
+FULL_DATE_RE = re.compile(
+    r"(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})\b"
+    r"|(\d{1,2})(?:st|nd|rd|th)?\s+([a-z]{3,9})\.?,?\s*(\d{4})\b"
+    r"|([a-z]{3,9})\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s*(\d{4})\b",
+    re.IGNORECASE,
+)
+# B.E., M.E., B.A. and M.A. must be dotted or capitalised: "be", "me" and "ma" are ordinary words
+DEGREE_RE = re.compile(
+    r"\b(ph\.?\s?d|m\.?\s?tech|b\.?\s?tech|[bm]\.\s?[ea]|(?-i:[BM][EA])|mba|bba|bca|mca|b\.?\s?com|m\.?\s?com|"
+    r"b\.?\s?sc|m\.?\s?sc|pgdm|llb|mbbs|diploma|12th|10th|hsc|ssc|intermediate|matriculation|high\s+school)\b\.?",
+    re.IGNORECASE,
+)
+_DATE = (r"(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?,?\s*'?(?:19|20)\d{2}"
+         r"|\d{1,2}[/.-](?:19|20)\d{2}|(?:19|20)\d{2})")
+RANGE_RE = re.compile(
+    rf"(?<![\w/.-])({_DATE})\s*(?:-|–|—|to|till|until)\s*({_DATE}|present|current|till\s+date|to\s+date|now|date)",
+    re.IGNORECASE,
+)
+CURRENT_RE = re.compile(r"present|current|date|now", re.IGNORECASE)
+
+# Scalar fields the LLM can be told to skip once rules found them confidently
+SCALAR_FIELDS = ("email", "mobile_no", "date_of_birth")
+
+
+def _field(value, confidence):
+    return {"value": value, "confidence": confidence}
+
+
+def _range_bound(token, end=False):
+    """Convert one side of a date range to dd-mm-yyyy per the prompt's rules.
+
+    Month-year starts map to the first of the month and ends to its last day;
+    bare years map to 01-01-YYYY.
+    """
+    token = token.strip()
+    m = MONTH_YEAR_RE.match(token)
+    if m:
+        month, year = MONTHS[m.group(1).lower()[:3]], int(m.group(2))
+    else:
+        m = re.match(r"(\d{1,2})[/.-](\d{4})$", token)
+        if m:
+            month, year = int(m.group(1)), int(m.group(2))
+            if not 1 <= month <= 12:
+                return ""
+        elif re.match(r"\d{4}$", token):
+            return f"01-01-{token}"
+        else:
+            return ""
+    day = calendar.monthrange(year, month)[1] if end else 1
+    return f"{day:02d}-{month:02d}-{year}"
+
+
+def find_email(text):
+    emails = list(dict.fromkeys(e.strip(".").lower() for e in EMAIL_RE.findall(text)))
+    if not emails:
+        return None
+    return _field(emails[0], 0.99 if len(emails) == 1 else 0.8)
+
+
+def find_mobile(text):
+    numbers = []
+    labelled = False
+    for line in text.split("\n"):
+        for prefix, digits in PHONE_RE.findall(line):
+            number = re.sub(r"\D", "", digits)
+            if number not in numbers:
+                numbers.append(number)
+            labelled = labelled or bool(prefix) or bool(PHONE_LABEL_RE.search(line))
+    if not numbers:
+        return None
+    confidence = 0.95 if labelled else 0.85
+    if len(numbers) > 1:
+        confidence -= 0.15
+    return _field(numbers[0], confidence)
+
+
+def _full_date(token):
+    """The date `token` starts with as dd-mm-yyyy if its day, month and year are all written, else None."""
+    m = FULL_DATE_RE.match(token)
+    if not m:
+        return None
+    if m.group(1):
+        day, month, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
+    else:
+        day, name, year = (m.group(4), m.group(5), m.group(6)) if m.group(4) else (m.group(8), m.group(7), m.group(9))
+        day, month, year = int(day), MONTH_NAMES.get(name.lower(), 0), int(year)
+    if not 1 <= month <= 12 or not 1 <= day <= calendar.monthrange(year, month)[1]:
+        return None
+    return f"{day:02d}-{month:02d}-{year}"
+
+
+def find_date_of_birth(text):
+    m = DOB_RE.search(text)
+    if not m:
+        return None
+    token = m.group(1).split("\n")[0].strip()
+    value = _full_date(token)
+    if value:
+        return _field(value, 0.95)
+    # A partial or fuzzy date ("May 1990", "1990") stays below RULES_MIN_CONFIDENCE, so the model still
+    # reads the field; without a year in the text the parser would invent one, so there is no value
+    if not YEAR_RE.search(token):
+        return None
+    value = normalize_date(token)
+    return _field(value, 0.6) if value else None
+
+
+def find_education(lines):
+    rows = []
+    for line in lines:
+        degree = DEGREE_RE.search(line)
+        years = YEAR_RE.findall(line)
+        if not degree or not years:
+            continue
+        month_year = MONTH_YEAR_RE.search(line)
+        row = {
+            "degree": degree.group(0).strip(),
+            "branch_or_board": "",
+            "school_or_institute": "",
+            "passing_year": _range_bound(month_year.group(0)) if month_year else f"01-01-{years[-1]}",
+            "grade_type": "",
+            "grade_value": "",
+        }
+        percent = PERCENT_RE.search(line)
+        cgpa = CGPA_RE.search(line)
+        if percent:
+            row.update(grade_type="percentage", grade_value=percent.group(1))
+        elif cgpa:
+            row.update(grade_type="CGPA", grade_value=cgpa.group(1) or cgpa.group(2) or cgpa.group(3))
+        rows.append(_field(row, 0.85 if row["grade_value"] else 0.75))
+    return rows
+
+
+def find_experience_dates(lines):
+    entries = []
+    for line in lines:
+        if DEGREE_RE.search(line):
+            continue
+        for start, end in RANGE_RE.findall(line):
+            is_current = bool(CURRENT_RE.fullmatch(end.strip().split()[-1]))
+            entry = {
+                "start_date": _range_bound(start),
+                "end_date": "current_time" if is_current else _range_bound(end, end=True),
+                "is_current": "true" if is_current else "false",
+                "line": line.strip(),
+            }
+            if entry["start_date"] and entry["end_date"] and (
+                    is_current or entry["start_date"][-4:] <= entry["end_date"][-4:]):
+                entries.append(_field(entry, 0.8))
+    return entries
+
+
+@traced("rules")
+def pre_extract(text):
+    """Pull contact details, DOB, education rows and experience date ranges.
+
+    Returns {field: {"value": ..., "confidence": 0..1}} for scalar fields
+    and lists of such entries for "education" and "experience".
+    """
+    lines = text.split("\n")
+    fields = {
+        "email": find_email(text),
+        "mobile_no": find_mobile(text),
+        "date_of_birth": find_date_of_birth(text),
+    }
+    fields = {k: v for k, v in fields.items() if v}
+    fields["education"] = find_education(lines)
+    fields["experience"] = find_experience_dates(lines)
+    return fields
+
+
+def confident_fields(fields, min_confidence=RULES_MIN_CONFIDENCE):
+    """The scalar fields found with at least `min_confidence`, as {field: value}."""
+    return {
+        name: fields[name]["value"]
+        for name in SCALAR_FIELDS
+        if name in fields and fields[name]["confidence"] >= min_confidence
+    }
+
+
+def apply_rule_fields(parsed_json, fields, min_confidence=RULES_MIN_CONFIDENCE):
+    """Overwrite the model's values with confidently rule-extracted ones."""
+    parsed_json.update(confident_fields(fields, min_confidence))
+    return parsed_json
+
+
+def empty_record():
+    """A record in the prompt's schema with every field left empty."""
+    return {
+        "full_name": "", "email": "", "mobile_no": "", "date_of_birth": "", "father_name": "", "gender": "",
+        "address": "", "city": "", "latest_company_name": "", "industry": "", "department": "",
+        "key_responsibilities": [], "profile_title": "", "education": [], "total_work_experience": 0.0,
+        "current_ctc": "", "experience": [], "skills": [], "languages": [], "hobbies": [],
+        "role": "", "role_category": "", "ocr_used": "false",
+    }
+
+
+def rules_record(fields):
+    """Build a full record from rule output alone (no LLM call)."""
+    record = empty_record()
+    record.update({name: fields[name]["value"] for name in SCALAR_FIELDS if name in fields})
+    record["education"] = [dict(row["value"]) for row in fields.get("education", [])]
+    for entry in fields.get("experience", []):
+        value = entry["value"]
+        record["experience"].append({
+            "job_title": "", "company": "", "start_date": value["start_date"], "end_date": value["end_date"],
+            "is_current": value["is_current"], "location": "", "total_experience": 0.0,
+        })
+    return record
@@ -0,0 +1,423 @@
+"""Local HTTP extraction service: uploads become jobs on a bounded queue.
+
+Jobs pass through two worker pools. CPU workers (threads) load the file,
+extract text and run OCR up to the prompt; I/O workers (coroutines on one
+event loop) make the LLM calls through a shared `AsyncExtractionClient`, so
+its rate limiting and retries cover every job. The two pools are sized
+separately. Both queues are bounded: when the LLM side falls behind, CPU
+workers wait to hand over their jobs, the intake queue fills, and uploads
+get 429 until there is room.
+
+CPU workers are threads in one process. Tesseract runs as a subprocess and
+overlaps freely, but pdfplumber and python-docx parsing is pure Python and
+holds the GIL, so text-layer extraction does not speed up with more CPU
+workers; run several service processes behind a load balancer to scale it.
+
+    POST /jobs?filename=cv.pdf   body: file bytes   -> 202 {"job_id", "status"}
+    GET  /jobs/<id>                                 -> job status (with "data" once done)
+    GET  /jobs/<id>/result                          -> 200 record, 202 still running, 422 failed
+    GET  /healthz                                   -> queue depths and job counts
+    GET  /metrics                                   -> Prometheus text (stage histograms, queue depths, endpoint latency)
+"""
+import asyncio
+import io
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .config import (
+    MODEL, RULES_MODE, SERVICE_CPU_WORKERS, SERVICE_LLM_WORKERS, SERVICE_QUEUE_SIZE, SERVICE_MAX_UPLOAD_BYTES,
+    SERVICE_JOB_TTL, SERVICE_URL, CHUNKED_EXTRACTION, MAX_FILE_BYTES,
+)
+from .metrics import tracer
+from .parsing import ResponseParseError
+from .pipeline import prepare_resume, finish_resume, acall_llm
+from .router import ModelRouter, make_async_client
+
+log = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+# Fields of a pipeline result returned to clients (the record itself is "data")
+RESULT_FIELDS = ("sha256", "cached", "ocr_used", "image_count", "warnings", "text", "compaction", "near_duplicate",
+                 "sections")
+
+
+class QueueFullError(Exception):
+    """The intake queue is full; the client should retry later."""
+
+
+class Job:
+    """One uploaded file and its progress through the service."""
+
+    def __init__(self, name, data):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.data = data
+        self.status = "queued"  # queued -> extracting -> waiting_llm -> calling_llm -> done | error
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.result = None
+        self.partial = {}
+        self.error = None
+        self.prompt = None
+        self.cache_key = None
+
+    def to_dict(self):
+        info = {"job_id": self.id, "file": self.name, "status": self.status, "submitted_at": self.submitted_at,
+                "finished_at": self.finished_at}
+        if self.status == "calling_llm" and self.partial:
+            info["partial"] = dict(self.partial)
+        if self.result is not None:
+            info.update({k: self.result.get(k) for k in RESULT_FIELDS if k in self.result})
+            if "data" in self.result:
+                info["data"] = self.result["data"]
+        if self.error is not None:
+            info["error"] = self.error
+        return info
+
+
+class ExtractionService:
+    """The job queue and worker pools behind the HTTP service.
+
+    Usable without HTTP: `submit` returns a job ID and `job` its status.
+    `client` is an `AsyncExtractionClient` or `ModelRouter`, or None to build
+    one with `make_async_client(**client_options)` (api_key, max_in_flight,
+    endpoints, ...) at `start`; no client is needed when `rules_mode` is
+    "only".
+    """
+
+    def __init__(self, cpu_workers=SERVICE_CPU_WORKERS, llm_workers=SERVICE_LLM_WORKERS, queue_size=SERVICE_QUEUE_SIZE,
+                 cache=None, store=None, dedupe=None, model=MODEL, rules_mode=RULES_MODE, stream=True,
+                 chunked=CHUNKED_EXTRACTION, job_ttl=SERVICE_JOB_TTL, client=None, **client_options):
+        self.cpu_workers = cpu_workers
+        self.llm_workers = llm_workers
+        self.queue_size = queue_size
+        self.cache = cache
+        self.store = store
+        self.dedupe = dedupe
+        self.model = model
+        self.rules_mode = rules_mode
+        self.stream = stream
+        self.chunked = chunked
+        self.job_ttl = job_ttl
+        self._client = client
+        self._owns_client = False
+        self._client_options = dict(client_options, model=model)
+        self._intake = queue.Queue(maxsize=queue_size)
+        self._jobs = {}
+        self._jobs_lock = threading.Lock()
+        self._threads = []
+        self._loop = None
+        self._llm_queue = None
+        self._ready = threading.Event()
+        self._stopping = threading.Event()
+
+    def start(self):
+        if self.rules_mode != "only":
+            if self._client is None:
+                # Built here so a missing API key fails at startup, not in the loop thread
+                self._client = make_async_client(**self._client_options)
+                self._owns_client = True
+            self._loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=self._run_loop, name="llm-loop", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+            self._ready.wait()
+        for i in range(self.cpu_workers):
+            thread = threading.Thread(target=self._cpu_worker, name=f"cpu-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        log.info("Service started: %d CPU worker(s), %d LLM worker(s), queue of %d",
+                 self.cpu_workers, 0 if self._loop is None else self.llm_workers, self.queue_size)
+        return self
+
+    def stop(self):
+        """Stop taking jobs and let the workers exit; queued jobs are dropped."""
+        self._stopping.set()
+        while True:
+            try:
+                job = self._intake.get_nowait()
+            except queue.Empty:
+                break
+            self._fail(job, RuntimeError("Service stopped before the job ran"))
+        if self._loop is not None:
+            for _ in range(self.llm_workers):
+                asyncio.run_coroutine_threadsafe(self._llm_queue.put(None), self._loop)
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def submit(self, name, data):
+        """Queue a file for extraction and return its job ID.
+
+        Raises ValueError for unsupported files and QueueFullError when
+        the intake queue has no room.
+        """
+        if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise ValueError(f"Unsupported file type: {name} (expected PDF or DOCX)")
+        if not data:
+            raise ValueError("Empty upload")
+        if self._stopping.is_set():
+            raise QueueFullError("Service is shutting down")
+        job = Job(name, data)
+        with self._jobs_lock:
+            self._prune()
+            self._jobs[job.id] = job
+        try:
+            self._intake.put_nowait(job)
+        except queue.Full:
+            with self._jobs_lock:
+                del self._jobs[job.id]
+            raise QueueFullError(f"{self.queue_size} job(s) already queued") from None
+        return job.id
+
+    def job(self, job_id):
+        """Status dict of `job_id`, or None if it is unknown or expired."""
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def _prune(self):
+        cutoff = time.time() - self.job_ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._jobs_lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "intake_queue": self._intake.qsize(),
+            "llm_queue": self._llm_queue.qsize() if self._llm_queue is not None else 0,
+            "queue_size": self.queue_size,
+            "cpu_workers": self.cpu_workers,
+            "llm_workers": self.llm_workers if self._loop is not None else 0,
+            "jobs": counts,
+        }
+
+    def prometheus_text(self):
+        stats = self.stats()
+        lines = [
+            "# TYPE resume_service_queue_depth gauge",
+            f'resume_service_queue_depth{{queue="intake"}} {stats["intake_queue"]}',
+            f'resume_service_queue_depth{{queue="llm"}} {stats["llm_queue"]}',
+            "# TYPE resume_service_jobs gauge",
+        ]
+        lines += [f'resume_service_jobs{{status="{status}"}} {n}' for status, n in sorted(stats["jobs"].items())]
+        text = tracer.prometheus_text() + "\n".join(lines) + "\n"
+        if isinstance(self._client, ModelRouter):
+            text += self._client.prometheus_text()
+        return text
+
+    def _finish(self, job, result=None, error=None):
+        with self._jobs_lock:
+            job.result = result
+            job.error = error
+            job.status = "error" if error is not None else "done"
+            job.finished_at = time.time()
+            job.data = job.prompt = None
+        if error is None and self.store is not None:
+            # A cached result has no text; the store then keeps the text it already indexed
+            self.store.add(result["data"], sha256=result["sha256"], file=job.name, text=result.get("text", ""))
+
+    def _fail(self, job, e):
+        log.warning("Job %s (%s) failed: %s", job.id, job.name, e)
+        error = {"type": type(e).__name__, "message": str(e)}
+        if isinstance(e, ResponseParseError):
+            error["text"] = e.text
+        self._finish(job, error=error)
+
+    def _cpu_worker(self):
+        while not self._stopping.is_set():
+            try:
+                job = self._intake.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            job.status = "extracting"
+            try:
+                upload = io.BytesIO(job.data)
+                upload.name = job.name
+                result, prompt, key = prepare_resume(upload, cache=self.cache, model=self.model,
+                                                     rules_mode=self.rules_mode, dedupe=self.dedupe,
+                                                     chunked=self.chunked)
+            except Exception as e:
+                self._fail(job, e)
+                continue
+            if prompt is None:
+                self._finish(job, result)
+                continue
+            job.result, job.prompt, job.cache_key = result, prompt, key
+            job.status = "waiting_llm"
+            # Blocks while the LLM queue is full, which is what backs up the intake queue
+            asyncio.run_coroutine_threadsafe(self._llm_queue.put(job), self._loop).result()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._llm_main())
+        finally:
+            self._loop.close()
+
+    async def _llm_main(self):
+        self._llm_queue = asyncio.Queue(maxsize=self.queue_size)
+        self._ready.set()
+        try:
+            await asyncio.gather(*(self._llm_worker(self._client) for _ in range(self.llm_workers)))
+        finally:
+            if self._owns_client:
+                await self._client.close()
+
+    async def _llm_worker(self, client):
+        while True:
+            job = await self._llm_queue.get()
+            if job is None:
+                return
+            job.status = "calling_llm"
+            try:
+                response = await acall_llm(client, job.prompt, stream=self.stream,
+                                           on_event=lambda event: _track(job, event))
+                result = finish_resume(job.result, response, cache=self.cache, cache_key=job.cache_key,
+                                       dedupe=self.dedupe)
+            except Exception as e:
+                self._fail(job, e)
+                continue
+            self._finish(job, result)
+
+
+def _track(job, event):
+    # Streamed fields, so status polls can show the record as it fills in
+    if event["type"] == "item":
+        job.partial.setdefault(event["key"], []).append(event["value"])
+    else:
+        job.partial[event["key"]] = event["value"]
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """HTTP front end of an `ExtractionService` (set as the `service` class attribute)."""
+
+    service = None
+    # Files the loader would refuse anyway are turned away before their body is read
+    max_upload_bytes = min(SERVICE_MAX_UPLOAD_BYTES, MAX_FILE_BYTES)
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        log.debug("%s %s", self.address_string(), format % args)
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        payload = body if isinstance(body, bytes) else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            return self._send(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            return self._send(400, {"error": "invalid Content-Length"})
+        if length > self.max_upload_bytes:
+            self.close_connection = True  # the body is left unread
+            return self._send(413, {"error": f"upload larger than {self.max_upload_bytes} bytes"})
+        data = self.rfile.read(length)
+        name = urllib.parse.parse_qs(url.query).get("filename", [""])[0] or self.headers.get("X-Filename", "")
+        try:
+            job_id = self.service.submit(name, data)
+        except QueueFullError as e:
+            return self._send(429, {"error": str(e)}, headers={"Retry-After": "1"})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        self._send(202, {"job_id": job_id, "status": "queued"}, headers={"Location": f"/jobs/{job_id}"})
+
+    def do_GET(self):
+        parts = [p for p in urllib.parse.urlsplit(self.path).path.split("/") if p]
+        if parts == ["healthz"]:
+            return self._send(200, self.service.stats())
+        if parts == ["metrics"]:
+            return self._send(200, self.service.prometheus_text().encode("utf-8"), content_type="text/plain; version=0.0.4")
+        if len(parts) in (2, 3) and parts[0] == "jobs" and parts[2:] in ([], ["result"]):
+            job = self.service.job(parts[1])
+            if job is None:
+                return self._send(404, {"error": "unknown job"})
+            if len(parts) == 2:
+                return self._send(200, job)
+            if job["status"] == "done":
+                return self._send(200, job["data"])
+            if job["status"] == "error":
+                return self._send(422, job["error"])
+            return self._send(202, {"job_id": job["job_id"], "status": job["status"]})
+        self._send(404, {"error": "not found"})
+
+
+def serve(service, host="127.0.0.1", port=8765):
+    """Start `service` and answer HTTP requests on host:port until interrupted."""
+    handler = type("Handler", (ServiceHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    service.start()
+    log.info("Listening on http://%s:%d", *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+class ServiceClient:
+    """Minimal client of the extraction service, for the Streamlit app and scripts."""
+
+    def __init__(self, url=SERVICE_URL, timeout=30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method, path, data=None):
+        request = urllib.request.Request(self.url + path, data=data, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read() or b"{}")
+
+    def submit(self, name, data):
+        """Upload a file; returns the job ID. Raises QueueFullError on 429 and ValueError on other refusals."""
+        status, body = self._request("POST", "/jobs?" + urllib.parse.urlencode({"filename": name}), data)
+        if status == 429:
+            raise QueueFullError(body.get("error", "queue full"))
+        if status != 202:
+            raise ValueError(body.get("error", f"HTTP {status}"))
+        return body["job_id"]
+
+    def status(self, job_id):
+        status, body = self._request("GET", f"/jobs/{job_id}")
+        if status != 200:
+            raise KeyError(job_id)
+        return body
+
+    def wait(self, job_id, on_update=None, interval=0.5, timeout=None):
+        """Poll until the job is done or failed and return its final status dict."""
+        started = time.monotonic()
+        while True:
+            job = self.status(job_id)
+            if on_update is not None:
+                on_update(job)
+            if job["status"] in ("done", "error"):
+                return job
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise TimeoutError(f"job {job_id} still {job['status']} after {timeout}s")
+            time.sleep(interval)
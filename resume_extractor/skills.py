@@ -0,0 +1,222 @@
+"""Canonical skill IDs from a user-supplied skills and synonyms dictionary.
+
+The dictionary is a JSON object ``{"node_js": {"name": "Node.js", "aliases":
+["nodejs", "node"]}, ...}`` or a CSV file with ``id,name,alias`` columns
+(one alias per row; repeat the id for more). Every name and alias is
+tokenised ("Node.js" -> node js) and compiled into an Aho-Corasick
+automaton over tokens, so a skill string or a whole paragraph is matched
+in one pass over its tokens. Multi-token aliases are also added squashed
+("nodejs"), which is what makes "Node.js", "NodeJS" and "node js" one
+skill. The compiled automaton is cached beside the dictionary
+(``<dictionary>.compiled``) and rebuilt when the dictionary changes.
+"""
+import csv
+import hashlib
+import json
+import logging
+import marshal
+import os
+import re
+import sys
+import threading
+from collections import deque
+
+from .config import SKILLS_DICTIONARY
+
+log = logging.getLogger(__name__)
+
+COMPILED_FORMAT = 1
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def tokenize(text):
+    """Lowercase word tokens; punctuation other than + and # separates them."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def load_dictionary(path):
+    """Read a JSON or CSV dictionary into {skill_id: {"name": ..., "aliases": [...]}}."""
+    if path.lower().endswith(".csv"):
+        entries = {}
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                skill_id = (row.get("id") or "").strip()
+                if not skill_id:
+                    continue
+                entry = entries.setdefault(skill_id, {"name": (row.get("name") or skill_id).strip(), "aliases": []})
+                alias = (row.get("alias") or "").strip()
+                if alias:
+                    entry["aliases"].append(alias)
+        return entries
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    return {
+        str(skill_id): {"name": entry.get("name") or str(skill_id), "aliases": list(entry.get("aliases", []))}
+        for skill_id, entry in raw.items()
+    }
+
+
+class SkillMatcher:
+    """Token-level Aho-Corasick automaton mapping skill mentions to canonical IDs."""
+
+    def __init__(self, ids, names, goto, fail, out, out_link, depth, digest=""):
+        self.ids = ids
+        self.names = names
+        self._index = {skill_id: i for i, skill_id in enumerate(ids)}
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        self._out_link = out_link
+        self._depth = depth
+        self.digest = digest
+
+    @classmethod
+    def build(cls, dictionary, digest=""):
+        """Compile {skill_id: {"name", "aliases"}} into a matcher."""
+        ids = list(dictionary)
+        names = [dictionary[skill_id]["name"] for skill_id in ids]
+        goto, out, depth = [{}], [-1], [0]
+        conflicts = 0
+
+        def add(tokens, index):
+            nonlocal conflicts
+            node = 0
+            for token in tokens:
+                child = goto[node].get(token)
+                if child is None:
+                    child = len(goto)
+                    goto[node][token] = child
+                    goto.append({})
+                    out.append(-1)
+                    depth.append(depth[node] + 1)
+                node = child
+            if out[node] == -1:
+                out[node] = index
+            elif out[node] != index:
+                conflicts += 1  # the first entry to claim an alias keeps it
+
+        for index, skill_id in enumerate(ids):
+            entry = dictionary[skill_id]
+            for phrase in [entry["name"], *entry["aliases"]]:
+                tokens = tokenize(phrase)
+                if not tokens:
+                    continue
+                add(tokens, index)
+                if len(tokens) > 1:
+                    add(["".join(tokens)], index)
+        if conflicts:
+            log.warning("%d skill alias(es) claimed by more than one id; kept the first", conflicts)
+
+        # Failure links breadth-first, plus a link to the nearest terminal on the failure chain
+        fail = [0] * len(goto)
+        out_link = [-1] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and token not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(token, 0) if goto[f].get(token, 0) != child else 0
+                target = fail[child]
+                out_link[child] = target if out[target] != -1 else out_link[target]
+        return cls(ids, names, goto, fail, out, out_link, depth, digest)
+
+    @classmethod
+    def from_file(cls, path, use_cache=True):
+        """Load the dictionary at `path`, using its compiled cache when current."""
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        compiled_path = path + ".compiled"
+        header = (COMPILED_FORMAT, digest, tuple(sys.version_info[:2]))
+        if use_cache:
+            try:
+                with open(compiled_path, "rb") as f:
+                    data = marshal.loads(f.read())
+                if tuple(data[0]) == header:
+                    return cls(*data[1:], digest=digest)
+            except (OSError, EOFError, ValueError, TypeError, IndexError):
+                pass
+        matcher = cls.build(load_dictionary(path), digest=digest)
+        if use_cache:
+            tmp = f"{compiled_path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    marshal.dump((header, matcher.ids, matcher.names, matcher._goto, matcher._fail,
+                                  matcher._out, matcher._out_link, matcher._depth), f)
+                os.replace(tmp, compiled_path)
+            except OSError as e:
+                log.warning("Could not write compiled skills dictionary %s: %s", compiled_path, e)
+        return matcher
+
+    def __len__(self):
+        return len(self.ids)
+
+    def matches(self, text):
+        """Leftmost-longest, non-overlapping matches as (skill_id, start, end) token spans."""
+        tokens = tokenize(text)
+        goto, fail, out, out_link, depth = self._goto, self._fail, self._out, self._out_link, self._depth
+        found = []
+        node = 0
+        for i, token in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            hit = node if out[node] != -1 else out_link[node]
+            while hit != -1:
+                found.append((i + 1 - depth[hit], i + 1, out[hit]))
+                hit = out_link[hit]
+        found.sort(key=lambda m: (m[0], m[0] - m[1]))
+        result = []
+        end = 0
+        for start, stop, index in found:
+            if start >= end:
+                result.append((self.ids[index], start, stop))
+                end = stop
+        return result
+
+    def find(self, text):
+        """Distinct canonical skill IDs mentioned in `text`, in order of first mention."""
+        return list(dict.fromkeys(skill_id for skill_id, _, _ in self.matches(text)))
+
+    def canonicalize(self, skills_list):
+        """Map raw skill strings to canonical skills.
+
+        An entry is mapped only when dictionary skills account for all of
+        its tokens ("Node.js", "Python/SQL"). One that merely mentions a skill
+        ("Objective C", "SQL queries and reporting") is a different skill or
+        a description, and is kept as it is. Returns (names, ids, unmatched):
+        canonical names and their IDs without duplicates, and the raw entries
+        left unmatched.
+        """
+        names, ids, unmatched = [], [], []
+        for raw in skills_list or []:
+            if not raw:
+                continue
+            text = str(raw)
+            found = self.matches(text)
+            if not found or sum(stop - start for _, start, stop in found) < len(tokenize(text)):
+                unmatched.append(raw)
+                continue
+            for skill_id in dict.fromkeys(skill_id for skill_id, _, _ in found):
+                if skill_id not in ids:
+                    ids.append(skill_id)
+                    names.append(self.names[self._index[skill_id]])
+        return names, ids, unmatched
+
+
+_default_matcher = None
+_default_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """The process-wide matcher for SKILLS_DICTIONARY, or None if it is not set."""
+    global _default_matcher
+    if not SKILLS_DICTIONARY:
+        return None
+    with _default_matcher_lock:
+        if _default_matcher is None:
+            _default_matcher = SkillMatcher.from_file(SKILLS_DICTIONARY)
+    return _default_matcher
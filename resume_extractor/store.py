@@ -0,0 +1,268 @@
+"""Local SQLite store of parsed candidates with full-text and structured search."""
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+from .config import STORE_BATCH_SIZE
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT UNIQUE,
+    file TEXT,
+    full_name TEXT,
+    email TEXT,
+    mobile_no TEXT,
+    city TEXT,
+    role TEXT,
+    role_category TEXT,
+    profile_title TEXT,
+    total_work_experience REAL,
+    data TEXT NOT NULL,
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS candidates_experience ON candidates (total_work_experience);
+CREATE INDEX IF NOT EXISTS candidates_city ON candidates (city COLLATE NOCASE, total_work_experience);
+CREATE INDEX IF NOT EXISTS candidates_role_category ON candidates (role_category COLLATE NOCASE, total_work_experience);
+CREATE TABLE IF NOT EXISTS education (
+    candidate_id INTEGER NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+    degree TEXT,
+    passing_year INTEGER
+);
+CREATE INDEX IF NOT EXISTS education_passing_year ON education (passing_year, candidate_id);
+CREATE INDEX IF NOT EXISTS education_candidate ON education (candidate_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5 (
+    skills, role, profile_title, raw_text,
+    tokenize = "unicode61 tokenchars '+#'"
+);
+"""
+
+# Searches whose terms match at most this many candidates start from the full-text index
+FTS_DRIVEN_MAX_HITS = 5000
+
+QUERY_SEPARATOR_RE = re.compile(r"\s+\+\s+|\s*,\s*")
+# A range like "2015-2018" is years of passing, not of experience
+MAX_EXPERIENCE_YEARS = 60
+EXPERIENCE_RANGE_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*(?:-|to)\s*(\d+(?:\.\d+)?)\s*(?:years?|yrs?)?$", re.IGNORECASE)
+EXPERIENCE_MIN_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?)$", re.IGNORECASE)
+YEAR_RE = re.compile(r"^(?:passed\s+|passing\s+)?((?:19|20)\d{2})$", re.IGNORECASE)
+
+
+def _year(date_str):
+    m = re.search(r"(19|20)\d{2}$", date_str or "")
+    return int(m.group(0)) if m else None
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+class CandidateStore:
+    """Parsed resumes in SQLite, searchable by skills, text and structured fields.
+
+    Records are upserted by document SHA-256; an upsert without resume text
+    keeps the text already indexed for that document. `add` buffers rows and
+    writes every `batch_size` of them in one transaction; call `flush` (or
+    `close`) to write the rest. Safe to share between threads.
+    """
+
+    def __init__(self, path, batch_size=STORE_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = []
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # WAL with synchronous=NORMAL fsyncs at checkpoints, not on every commit
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+
+    def add(self, record, sha256=None, file=None, text=""):
+        """Queue one post-processed record (and its resume text) for writing."""
+        with self._pending_lock:
+            self._pending.append((record, sha256, file, text))
+            if len(self._pending) < self.batch_size:
+                return
+            pending, self._pending = self._pending, []
+        self._write(pending)
+
+    def add_many(self, entries):
+        """Write (record, sha256, file, text) tuples, one transaction per batch."""
+        batch = []
+        count = 0
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                count += self._write(batch)
+                batch = []
+        return count + self._write(batch)
+
+    def flush(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        return self._write(pending)
+
+    def _write(self, entries):
+        if not entries:
+            return 0
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for record, sha256, file, text in entries:
+                    self._insert(record, sha256, file, text, now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(entries)
+
+    def _insert(self, record, sha256, file, text, now):
+        conn = self._conn
+        if sha256:
+            row = conn.execute("SELECT id FROM candidates WHERE sha256 = ?", (sha256,)).fetchone()
+            if row:
+                if not text:
+                    # A cached result or an import carries no resume text; keep the indexed one
+                    old = conn.execute("SELECT raw_text FROM candidates_fts WHERE rowid = ?", row).fetchone()
+                    text = old[0] if old else ""
+                conn.execute("DELETE FROM candidates_fts WHERE rowid = ?", row)
+                conn.execute("DELETE FROM candidates WHERE id = ?", row)
+        cursor = conn.execute(
+            "INSERT INTO candidates (sha256, file, full_name, email, mobile_no, city, role, role_category,"
+            " profile_title, total_work_experience, data, added_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                sha256, file, record.get("full_name"), record.get("email"), record.get("mobile_no"),
+                (record.get("city") or "").strip() or None, record.get("role") or None,
+                record.get("role_category") or None, record.get("profile_title") or None,
+                float(record.get("total_work_experience") or 0.0),
+                json.dumps(record, ensure_ascii=False), now,
+            ),
+        )
+        candidate_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT INTO education (candidate_id, degree, passing_year) VALUES (?, ?, ?)",
+            [(candidate_id, edu.get("degree"), _year(edu.get("passing_year")))
+             for edu in record.get("education") or [] if isinstance(edu, dict)],
+        )
+        skills = " ".join(str(s) for s in record.get("skills") or [])
+        skill_ids = " ".join(str(s) for s in record.get("skill_ids") or [])
+        conn.execute(
+            "INSERT INTO candidates_fts (rowid, skills, role, profile_title, raw_text) VALUES (?, ?, ?, ?, ?)",
+            (candidate_id, f"{skills} {skill_ids}".strip(), record.get("role") or "",
+             record.get("profile_title") or "", text or ""),
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def get(self, candidate_id):
+        """The stored record for `candidate_id`, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM candidates WHERE id = ?", (candidate_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _has_value(self, column, value):
+        # column is one of our own names, never user input
+        return self._conn.execute(
+            f"SELECT 1 FROM candidates WHERE {column} = ? COLLATE NOCASE LIMIT 1", (value,)
+        ).fetchone() is not None
+
+    def parse_query(self, query):
+        """Turn "Python + 3-5 years + Pune" into keyword arguments for `search`.
+
+        Terms are separated by " + " or commas. A term is an experience
+        range ("3-5 years"), a minimum ("5+ years"), a passing year
+        ("2018"), a city or role category already in the store, or else a
+        search term matched against skills, role, profile title and resume
+        text.
+        """
+        filters = {"terms": []}
+        for term in QUERY_SEPARATOR_RE.split(query):
+            term = term.strip()
+            if not term:
+                continue
+            m = EXPERIENCE_RANGE_RE.match(term)
+            if m and float(m.group(2)) <= MAX_EXPERIENCE_YEARS:
+                filters["min_experience"], filters["max_experience"] = float(m.group(1)), float(m.group(2))
+                continue
+            m = EXPERIENCE_MIN_RE.match(term)
+            if m:
+                filters["min_experience"] = float(m.group(1))
+                continue
+            m = YEAR_RE.match(term)
+            if m:
+                filters["passing_year"] = int(m.group(1))
+                continue
+            with self._lock:
+                if "city" not in filters and self._has_value("city", term):
+                    filters["city"] = term
+                    continue
+                if "role_category" not in filters and self._has_value("role_category", term):
+                    filters["role_category"] = term
+                    continue
+            filters["terms"].append(term)
+        return filters
+
+    def search(self, terms=(), min_experience=None, max_experience=None, city=None, role_category=None,
+               passing_year=None, limit=20):
+        """Candidates matching every term and filter, most experienced first.
+
+        Returns dicts with id, file, full_name, city, role, role_category
+        and total_work_experience.
+        """
+        where, params = [], []
+        if min_experience is not None:
+            where.append("c.total_work_experience >= ?")
+            params.append(min_experience)
+        if max_experience is not None:
+            where.append("c.total_work_experience <= ?")
+            params.append(max_experience)
+        if city:
+            where.append("c.city = ? COLLATE NOCASE")
+            params.append(city)
+        if role_category:
+            where.append("c.role_category = ? COLLATE NOCASE")
+            params.append(role_category)
+        if passing_year:
+            where.append("EXISTS (SELECT 1 FROM education e WHERE e.passing_year = ? AND e.candidate_id = c.id)")
+            params.append(passing_year)
+        with self._lock:
+            if terms:
+                match = " AND ".join(_fts_phrase(t) for t in terms)
+                # SQLite cannot estimate how selective a MATCH is, so pick the plan here: few hits
+                # drive the query from the full-text index, many hits walk the B-tree indexes and
+                # probe the full-text index per row
+                hits = self._conn.execute(
+                    "SELECT COUNT(*) FROM (SELECT rowid FROM candidates_fts WHERE candidates_fts MATCH ? LIMIT ?)",
+                    (match, FTS_DRIVEN_MAX_HITS + 1),
+                ).fetchone()[0]
+                if hits <= FTS_DRIVEN_MAX_HITS:
+                    where.append("c.id IN (SELECT rowid FROM candidates_fts WHERE candidates_fts MATCH ?)")
+                else:
+                    where.append("EXISTS (SELECT 1 FROM candidates_fts f WHERE f.rowid = c.id AND candidates_fts MATCH ?)")
+                params.append(match)
+            sql = ("SELECT c.id, c.file, c.full_name, c.city, c.role, c.role_category, c.total_work_experience"
+                   f" FROM candidates c{' WHERE ' + ' AND '.join(where) if where else ''}"
+                   " ORDER BY c.total_work_experience DESC LIMIT ?")
+            cursor = self._conn.execute(sql, params + [limit])
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+
+    def query(self, query, limit=20):
+        """`search` driven by a free-form query string (see `parse_query`)."""
+        return self.search(limit=limit, **self.parse_query(query))
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,157 @@
+"""Incremental JSON scanning of streamed model output."""
+import json
+
+from .parsing import ResponseParseError
+
+
+class IncrementalJSONScanner:
+    """Find the first top-level JSON object in text that arrives in pieces.
+
+    Works like `extract_json_block` followed by `strip_trailing_commas`, but
+    one chunk at a time: a comma is held back until the next significant
+    character shows whether it is a trailing one, and `done` turns true as
+    soon as the top-level object closes so the caller can stop reading.
+
+    `feed` returns events for values that have just completed:
+    ``{"type": "field", "key": k, "value": v}`` for each top-level member and
+    ``{"type": "item", "key": k, "index": i, "value": v}`` for each element of
+    a top-level array (e.g. one experience entry).
+    """
+
+    def __init__(self):
+        self.done = False
+        self._started = False
+        self._buf = []
+        self._stack = []  # "{" or "[" for every open container
+        self._in_str = False
+        self._esc = False
+        self._comma = False  # a comma is pending
+        self._comma_ws = []  # whitespace seen after the pending comma
+        self._member_start = None
+        self._array_key = None
+        self._item_start = None
+        self._item_index = 0
+
+    @property
+    def text(self):
+        """The repaired object text consumed so far."""
+        return "".join(self._buf)
+
+    def result(self):
+        """Return the decoded object, or None if it has not closed yet.
+
+        Raises ResponseParseError carrying the text when the object closed
+        but does not decode (a missing comma, say).
+        """
+        if not self.done:
+            return None
+        try:
+            return json.loads(self.text)
+        except json.JSONDecodeError as e:
+            raise ResponseParseError(f"Invalid JSON format: {e}", self.text) from e
+
+    def feed(self, chunk):
+        events = []
+        for ch in chunk:
+            if self.done:
+                break
+            self._step(ch, events)
+        return events
+
+    def _step(self, ch, events):
+        buf = self._buf
+        if not self._started:
+            if ch == "{":
+                self._started = True
+                self._stack.append("{")
+                buf.append(ch)
+            return
+
+        if self._in_str:
+            buf.append(ch)
+            if self._esc:
+                self._esc = False
+            elif ch == "\\":
+                self._esc = True
+            elif ch == '"':
+                self._in_str = False
+            return
+
+        if ch in " \t\r\n":
+            (self._comma_ws if self._comma else buf).append(ch)
+            return
+
+        if self._comma:
+            # Drop trailing commas; otherwise put the comma back
+            if ch not in "}]":
+                buf.append(",")
+            buf.extend(self._comma_ws)
+            self._comma = False
+            self._comma_ws = []
+
+        depth = len(self._stack)
+        if ch == ",":
+            self._comma = True
+            if depth == 1:
+                self._finish_member(events)
+            elif depth == 2 and self._stack[1] == "[":
+                self._finish_item(events)
+            return
+
+        if ch in "}]":
+            if depth == 2 and self._stack[1] == "[":
+                self._finish_item(events)
+                self._array_key = None
+            buf.append(ch)
+            self._stack.pop()
+            if not self._stack:
+                self._finish_member(events, closing=True)
+                self.done = True
+            return
+
+        # Start of a value or key: note where members and array items begin
+        if depth == 1 and self._member_start is None:
+            self._member_start = len(buf)
+        elif depth == 2 and self._stack[1] == "[" and self._item_start is None:
+            self._item_start = len(buf)
+
+        buf.append(ch)
+        if ch == '"':
+            self._in_str = True
+        elif ch in "{[":
+            if depth == 1 and ch == "[":
+                self._array_key = self._member_key()
+                self._item_index = 0
+            self._stack.append(ch)
+
+    def _member_key(self):
+        head = "".join(self._buf[self._member_start:])
+        try:
+            return json.loads(head[:head.rindex(":")])
+        except ValueError:
+            return None
+
+    def _finish_member(self, events, closing=False):
+        if self._member_start is None:
+            return
+        end = len(self._buf) - 1 if closing else len(self._buf)
+        segment = "".join(self._buf[self._member_start:end])
+        self._member_start = None
+        try:
+            member = json.loads("{" + segment + "}")
+        except ValueError:
+            return
+        for key, value in member.items():
+            events.append({"type": "field", "key": key, "value": value})
+
+    def _finish_item(self, events):
+        if self._item_start is None:
+            return
+        segment = "".join(self._buf[self._item_start:])
+        self._item_start = None
+        try:
+            value = json.loads(segment)
+        except ValueError:
+            return
+        events.append({"type": "item", "key": self._array_key, "index": self._item_index, "value": value})
+        self._item_index += 1
@@ -0,0 +1,92 @@
+"""Preloading heavy dependencies for long-lived workers.
+
+pdfplumber, python-docx, Pillow, pytesseract, openai and dateutil are
+imported on first use, so a short-lived job (a DOCX-only batch, a
+rules-only run) pays only for what it touches. A worker that serves many
+requests calls `warmup()` once at start instead, so the first request is
+not the slow one, and learns straight away if Tesseract or one of the
+OCR_LANG language packs is missing.
+"""
+import importlib
+import logging
+import time
+
+from .config import OCR_LANG
+
+log = logging.getLogger(__name__)
+
+PRELOAD_MODULES = {
+    "pdf": ("pdfplumber",),
+    "docx": ("docx",),
+    "ocr": ("PIL.Image", "pytesseract"),
+    "llm": ("openai",),
+    "dates": ("dateutil.parser", "dateutil.relativedelta"),
+}
+
+
+def check_tesseract(lang=OCR_LANG):
+    """(version, missing): the Tesseract version and the languages in `lang` it has no data for.
+
+    Raises RuntimeError if the tesseract binary cannot be run.
+    """
+    import pytesseract
+    try:
+        version = str(pytesseract.get_tesseract_version())
+        available = set(pytesseract.get_languages(config=""))
+    except (pytesseract.TesseractNotFoundError, OSError) as e:
+        raise RuntimeError(f"Tesseract is not installed or not on PATH: {e}") from e
+    return version, [code for code in lang.split("+") if code and code not in available]
+
+
+def warmup(ocr=True, llm=True, lang=OCR_LANG, strict=False):
+    """Import the heavy dependencies and open the process-wide caches now.
+
+    Returns a report with the seconds each import took, the Tesseract
+    version and any missing OCR languages, plus a list of problems. With
+    `strict`, any problem raises RuntimeError; otherwise problems are logged.
+    Skip OCR or LLM dependencies a worker will never use with `ocr=False` or
+    `llm=False`.
+    """
+    from .dedupe import get_dedupe_index
+    from .llm_cache import get_llm_cache
+    from .ocr import get_ocr_cache
+    from .skills import get_skill_matcher
+
+    report = {"imports": {}, "problems": []}
+    groups = [g for g in PRELOAD_MODULES if (ocr or g != "ocr") and (llm or g != "llm")]
+    for group in groups:
+        for name in PRELOAD_MODULES[group]:
+            started = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                report["problems"].append(f"cannot import {name}: {e}")
+                continue
+            report["imports"][name] = round(time.perf_counter() - started, 4)
+
+    for name, opener in (("skills dictionary", get_skill_matcher), ("OCR cache", get_ocr_cache),
+                         ("near-duplicate index", get_dedupe_index), ("LLM reply cache", get_llm_cache)):
+        try:
+            opener()
+        except Exception as e:
+            report["problems"].append(f"cannot open {name}: {e}")
+
+    if ocr:
+        try:
+            report["tesseract"], report["missing_languages"] = check_tesseract(lang)
+        except RuntimeError as e:
+            report["problems"].append(str(e))
+        else:
+            if report["missing_languages"]:
+                report["problems"].append(
+                    f"Tesseract has no data for {'+'.join(report['missing_languages'])} (OCR_LANG={lang})"
+                )
+
+    report["seconds"] = round(sum(report["imports"].values()), 4)
+    if report["problems"]:
+        if strict:
+            raise RuntimeError("; ".join(report["problems"]))
+        for problem in report["problems"]:
+            log.warning("Warm-up: %s", problem)
+    log.info("Warm-up imported %d module(s) in %.2fs", len(report["imports"]), report["seconds"])
+    return report
@@ -0,0 +1,13 @@
+import json
+import os
+
+import pytest
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+@pytest.fixture
+def recorded_replies():
+    """Model replies recorded from a real run: model, temperature, prompt, raw response and the decoded object."""
+    with open(os.path.join(FIXTURES, "llm_replies.json"), encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,241 @@
+import asyncio
+import email.utils
+import time
+from types import SimpleNamespace
+
+import pytest
+
+openai = pytest.importorskip("openai")
+
+from resume_extractor import async_llm
+from resume_extractor.async_llm import AsyncExtractionClient, TokenBucket, is_retryable, retry_after_seconds
+from resume_extractor.chunked import acomplete_sections
+from resume_extractor.llm_cache import LLMResponseCache
+from resume_extractor.parsing import ResponseParseError
+
+REQUEST = SimpleNamespace(method="POST", url="http://llm.invalid/v1/chat/completions")
+
+
+def status_error(status, headers=None):
+    response = SimpleNamespace(request=REQUEST, status_code=status, headers=headers or {})
+    return openai.APIStatusError(f"HTTP {status}", response=response, body=None)
+
+
+class FakeClock:
+    """monotonic() and asyncio.sleep() for async_llm: sleeping advances the clock instead of waiting."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(async_llm, "time", SimpleNamespace(monotonic=clock.monotonic, time=time.time))
+    monkeypatch.setattr(async_llm, "asyncio", SimpleNamespace(**{**vars(asyncio), "sleep": clock.sleep}))
+    return clock
+
+
+class ScriptedCompletions:
+    """chat.completions for the client: each call takes the next outcome, raising it if it is an exception."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def scripted_client(outcomes, **options):
+    client = AsyncExtractionClient(api_key="test", requests_per_second=0, backoff_base=1, backoff_max=4, **options)
+    completions = ScriptedCompletions(outcomes)
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client, completions
+
+
+def completion(text="{}"):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))], usage=None)
+
+
+def test_token_bucket_allows_a_burst_then_paces(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+
+    async def run():
+        for _ in range(4):
+            await bucket.acquire()
+
+    asyncio.run(run())
+    assert clock.sleeps == [0.5, 0.5]
+    assert clock.now == pytest.approx(1001.0)
+
+
+def test_token_bucket_without_a_rate_never_waits(clock):
+    asyncio.run(TokenBucket(rate=0).acquire())
+    assert clock.sleeps == []
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "3"}, 3.0),
+    ({"retry-after": "-2"}, 0.0),
+    ({"retry-after": "soon"}, None),
+    ({}, None),
+])
+def test_retry_after_seconds(headers, expected):
+    assert retry_after_seconds(status_error(429, headers)) == expected
+
+
+def test_retry_after_http_date():
+    when = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 <= retry_after_seconds(status_error(503, {"retry-after": when})) <= 30
+
+
+def test_retry_after_needs_a_response():
+    assert retry_after_seconds(ValueError("no response")) is None
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (status_error(429), True),
+    (status_error(408), True),
+    (status_error(503), True),
+    (status_error(400), False),
+    (status_error(401), False),
+    (openai.APITimeoutError(request=REQUEST), True),
+    (openai.APIConnectionError(request=REQUEST), True),
+    (asyncio.TimeoutError(), True),
+    (ValueError("bad prompt"), False),
+])
+def test_is_retryable(error, retryable):
+    assert is_retryable(error) is retryable
+
+
+def test_call_retries_transient_errors(clock):
+    client, completions = scripted_client([status_error(503), openai.APITimeoutError(request=REQUEST),
+                                           completion('{"a": 1}')])
+    assert asyncio.run(client.complete("prompt")) == '{"a": 1}'
+    assert completions.calls == 3
+    assert len(clock.sleeps) == 2 and all(0 <= s <= 4 for s in clock.sleeps)
+
+
+def test_call_does_not_retry_client_errors(clock):
+    client, completions = scripted_client([status_error(400), completion()])
+    with pytest.raises(openai.APIStatusError):
+        asyncio.run(client.complete("prompt"))
+    assert completions.calls == 1
+
+
+def test_call_gives_up_after_max_retries(clock):
+    client, completions = scripted_client([status_error(502)] * 3, max_retries=2, deadline=600)
+    with pytest.raises(openai.APIStatusError):
+        asyncio.run(client.complete("prompt"))
+    assert completions.calls == 3
+
+
+def test_call_honours_retry_after(clock):
+    client, completions = scripted_client([status_error(429, {"retry-after": "5"}), completion()], deadline=60)
+    asyncio.run(client.complete("prompt"))
+    assert completions.calls == 2
+    assert clock.sleeps[0] >= 5
+    assert client._resume_at >= 1005
+
+
+def test_call_stops_when_the_deadline_would_pass(clock):
+    client, completions = scripted_client([status_error(429, {"retry-after": "30"}), completion()], deadline=10)
+    with pytest.raises(TimeoutError):
+        asyncio.run(client.complete("prompt"))
+    assert completions.calls == 1
+    assert clock.sleeps == []
+
+
+def test_on_latency_reports_network_time_only(clock):
+    client = AsyncExtractionClient(api_key="test", requests_per_second=1, burst=1)
+
+    async def create(**kwargs):
+        await clock.sleep(0.25)  # the request itself
+        return completion()
+
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    latencies = []
+
+    async def run():
+        await client.complete("first", on_latency=latencies.append)
+        await client.complete("second", on_latency=latencies.append)  # waits for the rate limiter first
+
+    asyncio.run(run())
+    assert latencies == [pytest.approx(0.25), pytest.approx(0.25)]
+    assert sum(clock.sleeps) > 1.0
+
+
+def test_on_latency_is_not_called_for_cached_replies(tmp_path, clock):
+    cache = LLMResponseCache(str(tmp_path / "llm.db"))
+    client, completions = scripted_client([completion('{"a": 1}')], response_cache=cache)
+    latencies = []
+    for _ in range(2):
+        assert asyncio.run(client.complete("prompt", on_latency=latencies.append)) == '{"a": 1}'
+    assert completions.calls == 1
+    assert len(latencies) == 1
+    cache.close()
+
+
+class FakeStream:
+    """A streamed completion yielding `chunks` as content deltas."""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.chunks:
+            raise StopAsyncIteration
+        delta = SimpleNamespace(content=self.chunks.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+
+    async def close(self):
+        self.closed = True
+
+
+def streaming_client(replies):
+    # `replies` maps prompt -> chunks of the streamed reply
+    client = AsyncExtractionClient(api_key="test", requests_per_second=0)
+
+    async def create(messages, **kwargs):
+        return FakeStream(replies[messages[0]["content"]])
+
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client
+
+
+def test_stream_json_decodes_and_closes_early():
+    client = streaming_client({"p": ['Here: {"a": ', '1, "b": [2,', ']} and more', " chatter"]})
+    assert asyncio.run(client.stream_json("p")) == {"a": 1, "b": [2]}
+
+
+def test_stream_json_malformed_closed_object_raises_response_parse_error():
+    reply = ['Sure: {"a": 1 ', '"b": 2}', " thanks"]
+    client = streaming_client({"p": reply})
+    with pytest.raises(ResponseParseError) as info:
+        asyncio.run(client.stream_json("p"))
+    assert '"a": 1 "b": 2' in info.value.text
+
+
+def test_malformed_streamed_section_is_left_empty():
+    client = streaming_client({"profile": ['{"full_name": "Asha"}'], "skills": ['{"skills": ["SQL"] "x": 1}']})
+    record = asyncio.run(acomplete_sections(client, [("profile", "profile"), ("skills", "skills")], stream=True))
+    assert (record["full_name"], record["skills"]) == ("Asha", [])
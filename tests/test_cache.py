@@ -0,0 +1,54 @@
+import json
+import os
+
+from resume_extractor.cache import ResultCache
+
+
+def record(i):
+    return {"full_name": f"Candidate {i}", "skills": ["Python"] * 20}
+
+
+def entry_size(i):
+    return len(json.dumps(record(i), ensure_ascii=False).encode("utf-8"))
+
+
+def cached_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    ResultCache(directory=str(tmp_path)).put("a", record(1))
+    assert ResultCache(directory=str(tmp_path)).get("a") == record(1)
+
+
+def test_directory_is_scanned_only_when_over_the_limit(tmp_path, monkeypatch):
+    cache = ResultCache(directory=str(tmp_path), max_bytes=entry_size(0) * 5)
+    scans = []
+    original = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or original())
+    for i in range(5):
+        cache.put(f"k{i}", record(i))
+    cache.put("k0", record(0))  # overwriting does not grow the total
+    assert scans == []
+    cache.put("k5", record(5))
+    assert len(scans) == 1
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    size = entry_size(0)
+    cache = ResultCache(max_entries=1, directory=str(tmp_path), max_bytes=size * 4)
+    for i in range(4):
+        cache.put(f"k{i}", record(i))
+        os.utime(tmp_path / f"k{i}.json", (1000 + i, 1000 + i))
+    os.utime(tmp_path / "k0.json", (2000, 2000))  # read recently
+    cache.put("k4", record(4))
+    # Down to 90% of the limit: the two least recently used files go
+    assert cached_files(tmp_path) == ["k0.json", "k3.json", "k4.json"]
+    assert cache._bytes == sum(os.path.getsize(tmp_path / name) for name in cached_files(tmp_path))
+
+
+def test_running_total_starts_from_existing_files(tmp_path):
+    first = ResultCache(directory=str(tmp_path))
+    first.put("a", record(1))
+    first.put("b", record(2))
+    assert ResultCache(directory=str(tmp_path))._bytes == entry_size(1) + entry_size(2)
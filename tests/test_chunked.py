@@ -0,0 +1,69 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from resume_extractor.chunked import _merge_replies, complete_sections, merge_sections
+from resume_extractor.parsing import ResponseParseError
+from resume_extractor.rules import empty_record
+
+
+def test_fields_come_from_their_owning_section():
+    record = merge_sections({
+        "profile": {"full_name": "Asha Rao", "role": "Student", "skills": ["Typing"]},
+        "experience": {"role": "Data Analyst", "experience": [{"company": "Acme"}]},
+        "skills": {"skills": ["Python", "SQL"]},
+    })
+    assert record["full_name"] == "Asha Rao"
+    assert record["role"] == "Data Analyst"
+    assert record["skills"] == ["Python", "SQL"]
+    assert record["experience"] == [{"company": "Acme"}]
+
+
+def test_empty_owner_falls_back_to_other_sections_in_order():
+    record = merge_sections({
+        "profile": {"city": "", "role": ""},
+        "experience": {"city": "Pune", "role": ""},
+        "skills": {"city": "Mumbai", "role": "Analyst"},
+    })
+    assert record["city"] == "Pune"
+    assert record["role"] == "Analyst"
+
+
+def test_merged_record_has_the_full_schema():
+    record = merge_sections({"education": {"education": [{"degree": "B.Tech"}]}, "skills": None})
+    assert set(record) == set(empty_record())
+    assert record["education"] == [{"degree": "B.Tech"}]
+    assert record["full_name"] == "" and record["skills"] == []
+
+
+def test_ocr_used_if_any_section_used_it():
+    assert merge_sections({"profile": {"ocr_used": "false"}, "skills": {"ocr_used": "true"}})["ocr_used"] == "true"
+    assert merge_sections({"profile": {}})["ocr_used"] == "false"
+
+
+def test_unparseable_section_is_left_empty():
+    prompts = [("profile", "p"), ("skills", "s")]
+    record = _merge_replies(prompts, ['{"full_name": "Asha",}', "Sorry, I cannot help with that."])
+    assert record["full_name"] == "Asha"
+    assert record["skills"] == []
+
+
+def test_all_sections_unparseable_raises():
+    with pytest.raises(ResponseParseError):
+        _merge_replies([("profile", "p"), ("skills", "s")], ["no json", ResponseParseError("stream ended", "")])
+
+
+def test_complete_sections_sends_prompts_concurrently():
+    replies = {"profile prompt": {"full_name": "Asha"}, "skills prompt": {"skills": ["Python"]}}
+    barrier = threading.Barrier(len(replies), timeout=5)
+
+    def create(messages, **kwargs):
+        barrier.wait()  # only passes if both sections are in flight at once
+        content = json.dumps(replies[messages[0]["content"]])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    record = complete_sections(client, [("profile", "profile prompt"), ("skills", "skills prompt")])
+    assert (record["full_name"], record["skills"]) == ("Asha", ["Python"])
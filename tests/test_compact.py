@@ -0,0 +1,43 @@
+import pytest
+
+from resume_extractor.compact import compact_text, is_ocr_noise
+
+HINDI = ["मेरा नाम राहुल है", "मैं पुणे में रहता हूँ", "शिक्षा: बी.ए. 2015"]
+
+
+@pytest.mark.parametrize("line", HINDI + ["Python developer", "B.Com 2015 67%"])
+def test_real_text_is_not_noise(line):
+    assert not is_ocr_noise(line)
+
+
+@pytest.mark.parametrize("line", ["~~|| ;; ..", "i l | ! ,, ;;", "—— •• ——"])
+def test_symbol_runs_are_noise(line):
+    assert is_ocr_noise(line)
+
+
+def test_devanagari_ocr_lines_survive_compaction():
+    text = "Image 1 Text:\n" + "\n".join(HINDI) + "\n~~|| ;; .."
+    compacted, stats = compact_text(text, budget=0)
+    assert compacted.split("\n")[1:] == HINDI
+    assert stats["lines_dropped"] == 1
+
+
+def test_ocr_only_resume_is_trimmed_like_the_kept_sections():
+    ocr = [f"Rahul Verma line {i} of the scanned profile page" for i in range(30)]
+    experience = [f"Sales Officer at Bank {i}, handled retail accounts" for i in range(60)]
+    text = "Image 1 Text:\n" + "\n".join(ocr) + "\nExperience\n" + "\n".join(experience)
+    compacted, stats = compact_text(text, budget=900)
+    assert stats["truncated"]
+    # The longer experience section gives up its tail first; the scanned profile stays whole
+    assert all(line in compacted for line in ocr)
+    assert experience[-1] not in compacted
+
+
+def test_ocr_after_a_text_layer_is_still_trimmed_first():
+    header = ["Rahul Verma", "rahul@example.com"]
+    experience = [f"Sales Officer at Bank {i}, handled retail accounts" for i in range(40)]
+    ocr = [f"Logo caption {i} scanned from the letterhead image" for i in range(30)]
+    text = "\n".join(header) + "\nExperience\n" + "\n".join(experience) + "\nImage 1 Text:\n" + "\n".join(ocr)
+    compacted, _ = compact_text(text, budget=500)
+    assert experience[-1] in compacted
+    assert ocr[-1] not in compacted
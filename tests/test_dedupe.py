@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from resume_extractor.dedupe import NearDuplicateIndex, minhash, shingles, similarity
+
+WORDS = ("python sql pune engineer managed team built data pipelines bank sales client reports "
+         "delivered migration cloud services university degree project lead analyst operations").split()
+
+
+def resume_text(seed, length=400):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def edited(text, changes, seed=0):
+    # The same text with `changes` words replaced, as a second export of a resume might differ
+    rng = random.Random(seed)
+    words = text.split()
+    for i in rng.sample(range(len(words)), changes):
+        words[i] = f"edit{i}"
+    return " ".join(words)
+
+
+def jaccard(a, b):
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_signature_ignores_case_spacing_and_ocr_labels():
+    text = resume_text(1)
+    noisy = "Page 1 image 1 text:\n" + text.upper().replace(" ", "  \n")
+    assert minhash(noisy) == minhash(text)
+    assert minhash("") is None
+
+
+@pytest.mark.parametrize("changes", [2, 10, 40])
+def test_similarity_estimates_jaccard(changes):
+    a = resume_text(2)
+    b = edited(a, changes)
+    assert similarity(minhash(a), minhash(b)) == pytest.approx(jaccard(a, b), abs=0.1)
+
+
+def test_index_finds_near_duplicates_only():
+    index = NearDuplicateIndex(threshold=0.8)
+    original = resume_text(3)
+    index.add("original", index.signature(original), {"full_name": "Asha"})
+    index.add("other", index.signature(resume_text(4)), {"full_name": "Kabir"})
+
+    doc_id, score, record = index.find(index.signature(edited(original, 3)))
+    assert (doc_id, record) == ("original", {"full_name": "Asha"})
+    assert score >= 0.8
+    assert index.find(index.signature(resume_text(5))) is None
+    assert index.find(index.signature(edited(original, 150))) is None
+
+    stats = index.stats()
+    assert (stats["lookups"], stats["hits"]) == (3, 1)
+    assert sum(stats["best_similarity"].values()) == 3
+    index.close()
+
+
+def test_readding_a_document_replaces_it():
+    index = NearDuplicateIndex(threshold=0.9)
+    text = resume_text(6)
+    index.add("doc", index.signature(resume_text(7)), {"v": 1})
+    index.add("doc", index.signature(text), {"v": 2})
+    assert index.find(index.signature(text))[2] == {"v": 2}
+    assert index.find(index.signature(resume_text(7))) is None
+    index.close()
+
+
+def test_index_persists_and_ignores_other_signature_sizes(tmp_path):
+    path = str(tmp_path / "dedupe.db")
+    text = resume_text(8)
+    index = NearDuplicateIndex(path, num_perm=128, bands=32)
+    index.add("doc", index.signature(text), {"full_name": "Riya"})
+    index.close()
+
+    reopened = NearDuplicateIndex(path, num_perm=128, bands=32)
+    assert reopened.find(reopened.signature(text))[0] == "doc"
+    reopened.close()
+    resized = NearDuplicateIndex(path, num_perm=64, bands=16)
+    assert resized.find(resized.signature(text)) is None
+    resized.close()
+
+
+def test_bands_must_divide_num_perm():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_perm=100, bands=32)
@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from resume_extractor.async_llm import AsyncExtractionClient
+from resume_extractor.llm import complete
+from resume_extractor.llm_cache import CacheMissError, LLMResponseCache
+from resume_extractor.parsing import parse_llm_json
+
+
+class FakeClient:
+    """Stands in for the OpenAI client: answers from `replies` by prompt and counts calls."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.replies[messages[0]["content"]])
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def _redated(prompt):
+    # The same prompt built on another day
+    return prompt.replace("03-02-2025", "18-10-2026")
+
+
+@pytest.fixture
+def replay_cache(tmp_path, recorded_replies):
+    path = str(tmp_path / "llm.db")
+    recorder = LLMResponseCache(path, mode="record")
+    for entry in recorded_replies:
+        recorder.put(entry["model"], entry["temperature"], entry["prompt"], entry["response"])
+    recorder.close()
+    cache = LLMResponseCache(path, mode="replay")
+    yield cache
+    cache.close()
+
+
+def test_replay_returns_recorded_reply_without_a_client(replay_cache, recorded_replies):
+    for entry in recorded_replies:
+        reply = complete(None, _redated(entry["prompt"]), model=entry["model"], temperature=entry["temperature"],
+                         response_cache=replay_cache)
+        assert reply == entry["response"]
+    assert replay_cache.stats()["hits"] == len(recorded_replies)
+
+
+def test_replay_miss_raises(replay_cache, recorded_replies):
+    entry = recorded_replies[0]
+    with pytest.raises(CacheMissError):
+        complete(None, entry["prompt"] + "\nOne more line", model=entry["model"], temperature=entry["temperature"],
+                 response_cache=replay_cache)
+    with pytest.raises(CacheMissError):
+        replay_cache.get("another/model", entry["temperature"], entry["prompt"])
+    assert replay_cache.stats()["misses"] == 2
+
+
+def test_replayed_replies_decode_including_repair(replay_cache, recorded_replies):
+    for entry in recorded_replies:
+        reply = replay_cache.get(entry["model"], entry["temperature"], entry["prompt"])
+        assert parse_llm_json(reply) == entry["expected"]
+
+
+def test_cache_mode_calls_the_model_once(tmp_path, recorded_replies):
+    entry = recorded_replies[1]
+    client = FakeClient({entry["prompt"]: entry["response"]})
+    cache = LLMResponseCache(str(tmp_path / "llm.db"))
+    first = complete(client, entry["prompt"], model=entry["model"], temperature=entry["temperature"],
+                     response_cache=cache)
+    second = complete(client, entry["prompt"], model=entry["model"], temperature=entry["temperature"],
+                      response_cache=cache)
+    assert first == second == entry["response"]
+    assert client.calls == 1
+    assert cache.stats()["hits"] == 1
+    cache.close()
+
+
+def test_async_client_replays_without_an_api_key(monkeypatch, replay_cache, recorded_replies):
+    monkeypatch.delenv("API_KEY", raising=False)
+    entry = recorded_replies[1]
+    events = []
+
+    async def run():
+        async with AsyncExtractionClient(model=entry["model"], response_cache=replay_cache) as client:
+            text = await client.complete(entry["prompt"])
+            streamed = await client.stream_json(entry["prompt"], on_event=events.append)
+            return text, streamed
+
+    text, streamed = asyncio.run(run())
+    assert text == entry["response"]
+    assert streamed == entry["expected"]
+    assert events
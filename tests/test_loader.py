@@ -0,0 +1,44 @@
+import io
+
+import pytest
+
+docx = pytest.importorskip("docx")
+Image = pytest.importorskip("PIL.Image")
+
+from docx.shared import Cm
+
+from resume_extractor.extraction import images_to_ocr
+from resume_extractor.loader import load_document
+
+
+def _png(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "white").save(buffer, format="PNG")
+    buffer.seek(0)
+    return buffer
+
+
+def _mixed_docx():
+    # A text layer well over OCR_PAGE_MIN_CHARS, a small logo and a full-page scan
+    document = docx.Document()
+    document.add_picture(_png(200, 80), width=Cm(5))
+    for _ in range(20):
+        document.add_paragraph("Senior engineer with ten years of backend experience.")
+    document.add_picture(_png(850, 1200), width=Cm(17))
+    upload = io.BytesIO()
+    document.save(upload)
+    upload.seek(0)
+    upload.name = "mixed.docx"
+    return upload
+
+
+def test_docx_image_coverage_is_measured_against_the_page():
+    images = load_document(_mixed_docx())["images"]
+    assert [img["index"] for img in images] == [1, 2]
+    assert images[0]["coverage"] < 0.1
+    assert images[1]["coverage"] > 0.5
+
+
+def test_full_page_docx_image_is_ocrd_despite_a_text_layer():
+    selected = images_to_ocr(load_document(_mixed_docx()))
+    assert [img["index"] for img in selected] == [2]
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+pytest.importorskip("pytesseract")
+
+import pytesseract.pytesseract as runner
+
+from resume_extractor.config import OCR_THREADS
+from resume_extractor.ocr import _load_pytesseract
+
+
+def test_thread_limit_is_passed_to_tesseract_only(monkeypatch):
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    monkeypatch.setattr(runner, "environ", os.environ)
+    _load_pytesseract()
+    _load_pytesseract()
+    env = runner.subprocess_args()["env"]
+    assert env["OMP_THREAD_LIMIT"] == str(OCR_THREADS)
+    assert "OMP_THREAD_LIMIT" not in os.environ
+    # Later changes to this process's environment still reach tesseract
+    monkeypatch.setenv("TESSDATA_PREFIX", "/opt/tessdata")
+    assert env["TESSDATA_PREFIX"] == "/opt/tessdata"
+    assert len(env.maps) == 2
@@ -0,0 +1,34 @@
+import copy
+
+from resume_extractor.postprocess import post_process_batch, post_process_json
+
+
+def _record():
+    return {
+        "full_name": "Asha Rao",
+        "department": "Engineering, Platform",
+        "skills": ["Python programming", "MS-Excel", "sql"],
+        "education": [{"degree": "B.Tech", "passing_year": "2015", "grade_type": "CGPA", "grade_value": "8.2/10"}],
+        "experience": [
+            {"job_title": "Engineer (5 years)", "company": "Acme", "start_date": "Jan 2018", "end_date": "Jan 2020"},
+            {"job_title": "Analyst", "company": "Initech", "start_date": "Mar 2020", "end_date": "01-06-2021"},
+        ],
+    }
+
+
+def test_duration_inconsistency_is_flagged():
+    record = post_process_json(_record())
+    assert record["experience_flags"] == ["Potential duration inconsistency in entry: Acme"]
+    assert record["experience"][0]["start_date"] == "01-01-2018"
+
+
+def test_post_processing_twice_gives_the_same_record():
+    once = post_process_json(_record())
+    twice = post_process_json(copy.deepcopy(once))
+    assert twice == once
+
+
+def test_batch_keeps_each_records_ocr_flag():
+    records = [post_process_json(_record(), ocr_used=True), post_process_json(_record())]
+    expected = copy.deepcopy(records)
+    assert list(post_process_batch(records)) == expected
@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("openai")
+
+from benchmarks.stub_llm import start_stub_server
+from resume_extractor.router import Endpoint, ModelRouter
+
+
+class FakeClient:
+    """An endpoint's client: replies after `delay` seconds, reporting `network` seconds of it as network time."""
+
+    def __init__(self, name, delay, network=None, cached=False, error=None):
+        self.name = name
+        self.delay = delay
+        self.network = delay if network is None else network
+        self.cached = cached
+        self.error = error
+        self.cancelled = 0
+
+    async def complete(self, prompt, deadline=None, on_latency=None):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        if not self.cached and on_latency is not None:
+            on_latency(self.network)
+        return json.dumps({"from": self.name})
+
+    async def close(self):
+        pass
+
+
+def fake_router(*clients, hedge_delay=0.05):
+    endpoints = [Endpoint(client.name, api_key="test") for client in clients]
+    router = ModelRouter(endpoints, hedge_delay=hedge_delay, min_samples=100)
+    for endpoint, client in zip(endpoints, clients):
+        endpoint.client = client
+    return router, endpoints
+
+
+def test_hedge_loser_is_cancelled_and_not_recorded():
+    slow, fast = FakeClient("slow", 1.0), FakeClient("fast", 0.01)
+    router, (slow_endpoint, fast_endpoint) = fake_router(slow, fast)
+    assert asyncio.run(router.complete("prompt")) == {"from": "fast"}
+    assert slow.cancelled == 1
+    assert (slow_endpoint.hedges, slow_endpoint.samples, slow_endpoint.errors) == (1, 0, 0)
+    assert (fast_endpoint.wins, fast_endpoint.samples) == (1, 1)
+    # Having lost a hedge race, the slow endpoint no longer counts as untried
+    assert router.ranked()[0] is fast_endpoint
+
+
+def test_only_network_time_is_recorded():
+    router, (endpoint,) = fake_router(FakeClient("queued", 0.1, network=0.02))
+    asyncio.run(router.complete("prompt"))
+    assert endpoint.quantile(0.95) == 0.02
+
+
+def test_cached_replies_are_not_recorded():
+    router, (endpoint,) = fake_router(FakeClient("cached", 0.0, cached=True))
+    assert asyncio.run(router.complete("prompt")) == {"from": "cached"}
+    assert (endpoint.wins, endpoint.samples, endpoint.error_rate()) == (1, 0, 0.0)
+    assert endpoint.score(10.0) == 0.0
+
+
+def test_failed_endpoint_hands_over():
+    router, (broken, working) = fake_router(FakeClient("broken", 0.0, error=RuntimeError("503")),
+                                            FakeClient("working", 0.0), hedge_delay=5)
+    assert asyncio.run(router.complete("prompt")) == {"from": "working"}
+    assert (broken.errors, broken.error_rate(), broken.samples) == (1, 1.0, 0)
+    assert working.samples == 1
+
+
+@pytest.fixture
+def stub_endpoints():
+    servers = [start_stub_server(latency=1.0), start_stub_server(latency=0.05)]
+    yield [Endpoint("slow", base_url=url, api_key="test") for _, url in servers]
+    for server, _ in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_hedging_past_a_slow_stub_endpoint(stub_endpoints):
+    slow, fast = stub_endpoints
+    fast.name = "fast"
+
+    async def run():
+        async with ModelRouter(stub_endpoints, hedge_delay=0.2, min_samples=100, requests_per_second=0) as router:
+            return await router.complete("Resume Text: test")
+
+    record = asyncio.run(run())
+    assert record["full_name"] == "Aarav Sharma"
+    assert (slow.hedges, slow.samples, fast.wins, fast.samples) == (1, 0, 1, 1)
+    assert fast.quantile(0.5) < 0.5
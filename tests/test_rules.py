@@ -0,0 +1,56 @@
+import pytest
+
+from resume_extractor.config import RULES_MIN_CONFIDENCE
+from resume_extractor.rules import confident_fields, find_date_of_birth, find_education, find_experience_dates
+
+
+@pytest.mark.parametrize("text, value", [
+    ("Date of Birth: 12-05-1990", "12-05-1990"),
+    ("DOB: 12th March, 1990  Gender: Male", "12-03-1990"),
+    ("D.O.B: March 12, 1990", "12-03-1990"),
+])
+def test_full_date_of_birth_is_confident(text, value):
+    assert find_date_of_birth(text) == {"value": value, "confidence": 0.95}
+
+
+@pytest.mark.parametrize("text, value", [
+    ("D.O.B. - 1990", "01-01-1990"),
+    ("DOB: May 1990", "01-05-1990"),
+])
+def test_partial_date_of_birth_stays_below_the_override_threshold(text, value):
+    field = find_date_of_birth(text)
+    assert field["value"] == value
+    assert field["confidence"] < RULES_MIN_CONFIDENCE
+    assert confident_fields({"date_of_birth": field}) == {}
+
+
+def test_date_of_birth_without_a_year_is_dropped():
+    assert find_date_of_birth("Date of birth : Twelfth of May") is None
+
+
+@pytest.mark.parametrize("line", ["B.Tech 2015 CGPA: 8.2", "B.Tech 2015 8.2/10", "B.Tech 2015 8.2 CGPA"])
+def test_cgpa_in_any_order(line):
+    row = find_education([line])[0]["value"]
+    assert (row["grade_type"], row["grade_value"]) == ("CGPA", "8.2")
+
+
+@pytest.mark.parametrize("line, start, end", [
+    ("Tasks assigned to me 2016 - 2018 at Foo Ltd", "01-01-2016", "01-01-2018"),
+    ("Proud to be part of Acme 2019 - 2021", "01-01-2019", "01-01-2021"),
+    ("Helped ma and pa shops go online 2015 - 2017", "01-01-2015", "01-01-2017"),
+])
+def test_ordinary_words_are_not_degrees(line, start, end):
+    assert find_education([line]) == []
+    dates = [(e["value"]["start_date"], e["value"]["end_date"]) for e in find_experience_dates([line])]
+    assert dates == [(start, end)]
+
+
+@pytest.mark.parametrize("line, degree", [
+    ("B.E. Mechanical, 2015, 72%", "B.E."),
+    ("BE (Computer) 2014", "BE"),
+    ("M.A. English 2012", "M.A."),
+    ("BA History 2010", "BA"),
+    ("m.e. structures 2018", "m.e."),
+])
+def test_short_degrees_in_dotted_or_capitalised_form(line, degree):
+    assert find_education([line])[0]["value"]["degree"] == degree
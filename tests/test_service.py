@@ -0,0 +1,51 @@
+import io
+import time
+
+import pytest
+
+docx = pytest.importorskip("docx")
+
+from resume_extractor.cache import ResultCache
+from resume_extractor.service import ExtractionService
+from resume_extractor.store import CandidateStore
+
+
+def resume_docx():
+    document = docx.Document()
+    for line in ("Asha Rao", "asha.rao@example.com", "Mobile: 9876543210", "Experience",
+                 "Built reconciliation pipelines for treasury desks 2016 - 2020"):
+        document.add_paragraph(line)
+    upload = io.BytesIO()
+    document.save(upload)
+    return upload.getvalue()
+
+
+def wait_for(service, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = service.job(job_id)
+        if job["status"] in ("done", "error"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.fixture
+def service(tmp_path):
+    store = CandidateStore(str(tmp_path / "candidates.db"), batch_size=1)
+    service = ExtractionService(cpu_workers=1, rules_mode="only", cache=ResultCache(), store=store).start()
+    yield service
+    service.stop()
+    store.close()
+
+
+def test_resubmitted_upload_keeps_its_indexed_text(service):
+    data = resume_docx()
+    first = wait_for(service, service.submit("asha.docx", data))
+    assert (first["status"], first["cached"]) == ("done", False)
+    assert [r["file"] for r in service.store.query("reconciliation pipelines")] == ["asha.docx"]
+
+    again = wait_for(service, service.submit("asha.docx", data))
+    assert (again["status"], again["cached"]) == ("done", True)
+    assert [r["file"] for r in service.store.query("reconciliation pipelines")] == ["asha.docx"]
+    assert len(service.store) == 1
@@ -0,0 +1,37 @@
+from resume_extractor.postprocess import canonical_skills
+from resume_extractor.skills import SkillMatcher
+
+DICTIONARY = {
+    "node_js": {"name": "Node.js", "aliases": ["node", "node js"]},
+    "c": {"name": "C", "aliases": []},
+    "sql": {"name": "SQL", "aliases": []},
+    "python": {"name": "Python", "aliases": ["python3"]},
+}
+
+
+def test_whole_string_aliases_map_to_one_id():
+    matcher = SkillMatcher.build(DICTIONARY)
+    names, ids, unmatched = matcher.canonicalize(["Node.js", "NodeJS", "node js", "Python3", "python"])
+    assert (names, ids, unmatched) == (["Node.js", "Python"], ["node_js", "python"], [])
+
+
+def test_skills_made_only_of_dictionary_skills_are_split():
+    matcher = SkillMatcher.build(DICTIONARY)
+    assert matcher.canonicalize(["Python/SQL"]) == (["Python", "SQL"], ["python", "sql"], [])
+
+
+def test_partial_match_keeps_the_raw_skill():
+    matcher = SkillMatcher.build(DICTIONARY)
+    raw = ["Objective C", "SQL queries and reporting"]
+    assert matcher.canonicalize(raw) == ([], [], raw)
+
+
+def test_find_still_scans_free_text():
+    matcher = SkillMatcher.build(DICTIONARY)
+    assert matcher.find("Wrote SQL reports in Python and Objective C") == ["sql", "python", "c"]
+
+
+def test_canonical_skills_lists_dictionary_names_first():
+    skills, ids = canonical_skills(["Objective C", "node"], SkillMatcher.build(DICTIONARY))
+    assert ids == ["node_js"]
+    assert skills[0] == "Node.js" and "Objective C" in skills
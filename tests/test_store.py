@@ -0,0 +1,65 @@
+import pytest
+
+from resume_extractor.store import CandidateStore
+
+
+def candidate(name, city, category, years, skills, passing_year="01-06-2015"):
+    return {"full_name": name, "city": city, "role": f"{category} Engineer", "role_category": category,
+            "profile_title": "", "total_work_experience": years, "skills": skills,
+            "education": [{"degree": "B.Tech", "passing_year": passing_year}]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    store.add_many([
+        (candidate("Asha", "Pune", "Engineering", 4.0, ["Python", "SQL"]), "a", "asha.pdf", "Backend work"),
+        (candidate("Kabir", "Mumbai", "Engineering", 7.5, ["Python", "C++"], "01-06-2010"), "b", "kabir.pdf", ""),
+        (candidate("Riya", "Pune", "Sales", 2.0, ["CRM"]), "c", "riya.pdf", "Sales in Pune"),
+    ])
+    yield store
+    store.close()
+
+
+def test_parse_query_recognises_each_kind_of_term(store):
+    assert store.parse_query("Python + 3-5 years + Pune + Sales + 2015") == {
+        "terms": ["Python"], "min_experience": 3.0, "max_experience": 5.0,
+        "city": "Pune", "role_category": "Sales", "passing_year": 2015,
+    }
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("5+ years", {"terms": [], "min_experience": 5.0}),
+    ("2 to 4 yrs, c++", {"terms": ["c++"], "min_experience": 2.0, "max_experience": 4.0}),
+    ("passed 2010", {"terms": [], "passing_year": 2010}),
+    ("Delhi", {"terms": ["Delhi"]}),
+])
+def test_parse_query_terms(store, query, expected):
+    assert store.parse_query(query) == expected
+
+
+def test_city_and_category_are_matched_case_insensitively(store):
+    assert store.parse_query("pune + engineering") == {"terms": [], "city": "pune", "role_category": "engineering"}
+
+
+def test_query_combines_filters_and_orders_by_experience(store):
+    assert [r["full_name"] for r in store.query("Python")] == ["Kabir", "Asha"]
+    assert [r["full_name"] for r in store.query("Python + 3-5 years + Pune")] == ["Asha"]
+    assert [r["full_name"] for r in store.query("Pune")] == ["Asha", "Riya"]
+    assert [r["full_name"] for r in store.query("passed 2010")] == ["Kabir"]
+    assert store.query("Python + Sales") == []
+
+
+def test_readding_without_text_keeps_the_indexed_text(store):
+    assert [r["full_name"] for r in store.query("Backend work")] == ["Asha"]
+    updated = candidate("Asha", "Pune", "Engineering", 4.5, ["Python", "SQL"])
+    store.add_many([(updated, "a", "asha.pdf", "")])  # a cached result or an import: no text
+    assert [r["full_name"] for r in store.query("Backend work")] == ["Asha"]
+    assert store.get(store.query("Backend work")[0]["id"])["total_work_experience"] == 4.5
+    assert len(store) == 3
+
+
+def test_readding_with_text_replaces_it(store):
+    store.add_many([(candidate("Asha", "Pune", "Engineering", 4.0, ["Python"]), "a", "asha.pdf", "Frontend work")])
+    assert store.query("Backend work") == []
+    assert [r["full_name"] for r in store.query("Frontend work")] == ["Asha"]
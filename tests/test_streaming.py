@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from resume_extractor.parsing import ResponseParseError, parse_llm_json
+from resume_extractor.streaming import IncrementalJSONScanner
+
+SLOPPY = ('Here is the JSON:\n{"full_name": "Asha Rao", "skills": ["Python", "SQL",],\n'
+          ' "experience": [{"company": "Acme", "start_date": "2019"},], "note": "a } in a \\"string\\"",}\n'
+          'Anything else?')
+
+
+def feed_in_chunks(text, size):
+    scanner = IncrementalJSONScanner()
+    events = []
+    for i in range(0, len(text), size):
+        events += scanner.feed(text[i:i + size])
+    return scanner, events
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, len(SLOPPY)])
+def test_result_matches_parse_llm_json_for_any_chunking(size):
+    scanner, _ = feed_in_chunks(SLOPPY, size)
+    assert scanner.done
+    assert scanner.result() == parse_llm_json(SLOPPY)
+
+
+def test_events_report_fields_and_array_items_as_they_complete():
+    _, events = feed_in_chunks(SLOPPY, 5)
+    assert [(e["type"], e["key"], e.get("index")) for e in events] == [
+        ("field", "full_name", None),
+        ("item", "skills", 0),
+        ("item", "skills", 1),
+        ("field", "skills", None),
+        ("item", "experience", 0),
+        ("field", "experience", None),
+        ("field", "note", None),
+    ]
+    assert events[4]["value"] == {"company": "Acme", "start_date": "2019"}
+    assert events[-1]["value"] == 'a } in a "string"'
+
+
+def test_scanner_stops_at_the_end_of_the_object():
+    scanner = IncrementalJSONScanner()
+    scanner.feed('{"a": 1}')
+    assert scanner.done
+    assert scanner.feed(' {"b": 2}') == []
+    assert scanner.result() == {"a": 1}
+
+
+def test_unfinished_object_has_no_result():
+    scanner, events = feed_in_chunks('{"a": 1, "b": [1, 2', 4)
+    assert not scanner.done
+    assert scanner.result() is None
+    assert events == [{"type": "field", "key": "a", "value": 1}, {"type": "item", "key": "b", "index": 0, "value": 1}]
+
+
+def test_nested_objects_emit_one_top_level_field():
+    value = {"address": {"city": "Pune", "lines": ["12 MG Road", "Camp"]}}
+    _, events = feed_in_chunks(json.dumps(value), 2)
+    assert events == [{"type": "field", "key": "address", "value": value["address"]}]
+
+
+def test_closed_but_malformed_object_raises_response_parse_error():
+    scanner, _ = feed_in_chunks('Sure: {"a": 1 "b": 2} done', 4)
+    assert scanner.done
+    with pytest.raises(ResponseParseError) as info:
+        scanner.result()
+    assert info.value.text == '{"a": 1 "b": 2}'